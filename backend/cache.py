@@ -0,0 +1,144 @@
+import hashlib
+import select
+import threading
+import time
+from collections import OrderedDict
+
+from backend.render import compress
+from database.db_utils import get_connection, STANDINGS_CHANNEL
+
+# CONFIG
+CACHE_MAX_ENTRIES = 64
+CACHE_TTL_SECONDS = 300
+
+
+class CacheEntry:
+    def __init__(self, body, media_type="application/json"):
+        self.body = body
+        self.media_type = media_type
+        # Strong validator: identical bytes <=> identical ETag
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.created = time.monotonic()
+        self._encoded = {}   # content coding -> compressed body, built on first request
+
+    def encoded(self, encoding):
+        """Body in a content coding ('br', 'gzip'); compressed once, then served from the entry."""
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = self._encoded[encoding] = compress(self.body, encoding)
+        return body
+
+    def etag_for(self, encoding):
+        """Each coding is a different representation, so it gets its own strong ETag."""
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of rendered response bodies with a TTL.
+
+    Keys are built by the caller, e.g. (season_id, max(date), model_version),
+    so a new ETL snapshot or a new model naturally misses. invalidate() drops
+    everything and is called when the ETL sends a NOTIFY.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.created > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get_or_set(self, key, factory):
+        """Returns the cached entry for key, building it with factory() on a miss."""
+        entry = self.get(key)
+        if entry is None:
+            entry = self.put(key, factory())
+        return entry
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+
+def etag_matches(if_none_match, etag):
+    """Implements the If-None-Match comparison (list of tags or '*')."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+
+class NotifyListener:
+    """Background thread that LISTENs on a Postgres channel and runs callbacks on each NOTIFY."""
+
+    def __init__(self, channel=STANDINGS_CHANNEL, poll_interval=5.0):
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.callbacks = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, callback):
+        self.callbacks.append(callback)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"listen-{self.channel}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                conn = get_connection()
+            except Exception as e:
+                print(f"NOTIFY listener could not connect: {e}")
+                self._stop.wait(30)
+                continue
+            try:
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {self.channel};")
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    conn.poll()
+                    payloads = []
+                    while conn.notifies:
+                        payloads.append(conn.notifies.pop(0).payload)
+                    if payloads:
+                        for callback in self.callbacks:
+                            callback(payloads)
+            except Exception as e:
+                print(f"NOTIFY listener error: {e}")
+                self._stop.wait(5)
+            finally:
+                conn.close()
@@ -1,9 +1,52 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager, nullcontext
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from backend.routers import nhl
+from backend.cache import NotifyListener
+from database.db_utils import init_pool, close_pool
+from database.async_db import init_async_pool, close_async_pool
+from metrics import REGISTRY, HTTP_LATENCY, HTTP_ERRORS, PROFILER, PROFILE_SLOW_MS, attach_task
 import uvicorn
 
-app = FastAPI(title="Sports Dashboard API")
+@asynccontextmanager
+async def lifespan(app):
+    # Open DB pools once per worker instead of connecting on every request
+    try:
+        init_pool()
+        await init_async_pool()
+    except Exception as e:
+        print(f"DB pool unavailable, falling back to per-request connections: {e}")
+
+    # Load the model before the first request instead of during it, then follow the registry.
+    # The store swaps its prediction column before the caches are dropped
+    nhl.live_model.subscribe(nhl.store.set_version)
+    nhl.live_model.subscribe(nhl.invalidate_caches)
+    nhl.live_model.subscribe(nhl.broadcaster.notify)
+    await run_in_threadpool(nhl.live_model.start)
+    try:
+        await run_in_threadpool(nhl.store.load)
+    except Exception as e:
+        print(f"Standings store unavailable, serving from the database: {e}")
+
+    # Apply new standings to the store whenever the ETL NOTIFYs, then drop cached
+    # responses and push the changes to open standings streams
+    nhl.broadcaster.start()
+    listener = NotifyListener()
+    listener.subscribe(nhl.store.on_notify)
+    listener.subscribe(nhl.invalidate_caches)
+    listener.subscribe(nhl.broadcaster.notify)
+    listener.start()
+    yield
+    listener.stop()
+    nhl.live_model.stop()
+    await close_async_pool()
+    close_pool()
+
+# attach_task lets the slow-request profiler sample the endpoint's task on the event loop
+app = FastAPI(title="Sports Dashboard API", lifespan=lifespan, dependencies=[Depends(attach_task)])
 
 app.add_middleware(
     CORSMiddleware,
@@ -11,15 +54,55 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# (router, prefix) pairs mounted on the app; route_label needs the prefix back
+ROUTERS = [(nhl.router, "/api/nhl", ["nhl"])]
+ROUTE_PREFIXES = {id(route): prefix for router, prefix, _ in ROUTERS for route in router.routes}
+
+def route_label(request):
+    # Full route template (e.g. /api/nhl/teams/{abbrev}/history) keeps label cardinality bounded.
+    # Routes of an included router match with their router-relative path, so the prefix is re-added.
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    return request.scope.get("root_path", "") + ROUTE_PREFIXES.get(id(route), "") + route.path
+
+@app.middleware("http")
+async def instrument_requests(request: Request, call_next):
+    """Per-route latency histogram, error counts and (opt-in) profiles of slow requests."""
+    start = time.perf_counter()
+    status = 500
+    with (PROFILER.session() if PROFILER else nullcontext()) as samples:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+        except Exception as e:
+            HTTP_ERRORS.inc(route_label(request), type(e).__name__)
+            print(f"Unhandled error on {request.method} {request.url.path}: {e!r}")
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_LATENCY.observe(elapsed, request.method, route_label(request), str(status))
+    if samples is not None and elapsed * 1000 >= PROFILE_SLOW_MS:
+        path = PROFILER.dump(samples, f"{request.method}{request.url.path}")
+        print(f"Slow request {request.method} {request.url.path} ({elapsed * 1000:.0f} ms), profile: {path}")
+    return response
+
 # Include routers for different sports
-app.include_router(nhl.router, prefix="/api/nhl", tags=["nhl"])
+for router, prefix, tags in ROUTERS:
+    app.include_router(router, prefix=prefix, tags=tags)
 
 @app.get("/")
 def health_check():
     return {"status": "ok", "message": "Sports Dashboard API is running"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint (per worker process)."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     # Allow running this file directly for debugging
     uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True)
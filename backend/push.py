@@ -0,0 +1,184 @@
+import asyncio
+import time
+from collections import deque
+
+from backend.render import dumps
+from metrics import PUSH_CLIENTS, PUSH_EVENTS
+
+# CONFIG
+HEARTBEAT_SECONDS = 15      # SSE comment sent to idle clients so proxies keep the connection open
+CLIENT_QUEUE_SIZE = 16      # Events buffered per client before it is resynced with a full snapshot
+REPLAY_EVENTS = 32          # Recent deltas kept for clients reconnecting with Last-Event-ID
+RETRY_MS = 5000             # Client reconnect delay advertised to EventSource
+
+
+def encode_event(event, data, event_id=None):
+    """One Server-Sent Events frame, encoded once and shared by every client."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: ".encode("utf-8") + dumps(data) + b"\n\n"
+
+
+def diff_teams(old, new, key="abbrev"):
+    """Per-team changed fields between two standings lists, plus the keys that disappeared."""
+    before = {t[key]: t for t in old}
+    changed = {}
+    for team in new:
+        prev = before.pop(team[key], None)
+        fields = {k: v for k, v in team.items() if prev is None or prev.get(k) != v}
+        if fields:
+            changed[team[key]] = fields
+    return changed, sorted(before)
+
+
+class Subscriber:
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.resync = False
+
+
+class StandingsBroadcaster:
+    """Fans standings updates out to every open stream from one in-process snapshot.
+
+    loader() is awaited once per update (NOTIFY from the ETL, or a model swap)
+    and returns (snapshot_date, teams); the difference to the previous snapshot is
+    encoded once and queued for all subscribers. Clients that fall behind are resynced
+    with a full snapshot instead of buffering without bound. Nothing is read while no
+    one is connected.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.subscribers = set()
+        self.date = None
+        self.teams = None
+        self.seq = 0
+        self.epoch = int(time.time())   # Event ids are "<epoch>-<seq>" so ids from a previous process never match
+        self.recent = deque(maxlen=REPLAY_EVENTS)   # (seq, encoded delta)
+        self._loop = None
+        self._lock = None
+        self._pending = False
+
+    def start(self):
+        """Binds to the running event loop; call from the app's lifespan."""
+        self._loop = asyncio.get_running_loop()
+        self._lock = asyncio.Lock()
+
+    def notify(self, payloads=None):
+        """NotifyListener / model swap callback (runs on their thread)."""
+        if self._loop is None:
+            return
+        if not self.subscribers:
+            # Reload lazily on the next connect
+            self._loop.call_soon_threadsafe(self._drop_snapshot)
+            return
+        asyncio.run_coroutine_threadsafe(self.refresh(), self._loop)
+
+    def _drop_snapshot(self):
+        if not self.subscribers:
+            self.teams = None
+
+    @property
+    def event_id(self):
+        return f"{self.epoch}-{self.seq}"
+
+    def snapshot_event(self):
+        return encode_event("snapshot", {"date": self.date, "teams": self.teams}, self.event_id)
+
+    async def refresh(self):
+        """Reloads the snapshot and broadcasts the delta; bursts of NOTIFYs coalesce into one read."""
+        if self._lock.locked():
+            self._pending = True
+            return
+        async with self._lock:
+            try:
+                await self._reload()
+            except Exception as e:
+                print(f"Push refresh failed: {e}")
+
+    async def _reload(self):
+        # Caller holds the lock; NOTIFYs arriving meanwhile set _pending and trigger one more pass
+        while True:
+            self._pending = False
+            date, teams = await self.loader()
+            if self.teams is None:
+                self.date, self.teams = date, teams
+                self.seq += 1
+                self._broadcast(self.snapshot_event(), snapshot=True)
+            else:
+                changed, removed = diff_teams(self.teams, teams)
+                if changed or removed or date != self.date:
+                    self.seq += 1
+                    self.date, self.teams = date, teams
+                    frame = encode_event("delta", {"date": date, "teams": changed, "removed": removed}, self.event_id)
+                    self.recent.append((self.seq, frame))
+                    self._broadcast(frame)
+            if not self._pending:
+                return
+
+    def _broadcast(self, frame, snapshot=False):
+        if snapshot:
+            self.recent.clear()
+        PUSH_EVENTS.inc("snapshot" if snapshot else "delta")
+        for sub in self.subscribers:
+            if sub.resync:
+                continue
+            try:
+                sub.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                sub.resync = True
+
+    async def subscribe(self, last_event_id=None):
+        """Registers a client; returns it with the frames that bring it up to date.
+
+        Raises if there is no snapshot and it cannot be loaded.
+        """
+        if self.teams is None:
+            async with self._lock:
+                if self.teams is None:
+                    await self._reload()
+        sub = Subscriber()
+        self.subscribers.add(sub)
+        PUSH_CLIENTS.set(len(self.subscribers))
+        return sub, self._catch_up(last_event_id)
+
+    def _catch_up(self, last_event_id):
+        # A reconnecting client only needs the deltas it missed, if they are still buffered
+        try:
+            epoch, last = (int(part) for part in last_event_id.split("-"))
+        except (AttributeError, ValueError):
+            return [self.snapshot_event()]
+        if epoch != self.epoch:
+            return [self.snapshot_event()]
+        if last == self.seq:
+            return []
+        if self.recent and self.recent[0][0] <= last + 1 and last < self.seq:
+            return [frame for seq, frame in self.recent if seq > last]
+        return [self.snapshot_event()]
+
+    def unsubscribe(self, sub):
+        self.subscribers.discard(sub)
+        PUSH_CLIENTS.set(len(self.subscribers))
+
+    async def stream(self, request, sub, frames):
+        """Async generator of SSE frames for one subscribed client."""
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            for frame in frames:
+                yield frame
+            while True:
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": ping\n\n"
+                    continue
+                if sub.resync:
+                    # Fell behind: discard the backlog and start over from the current snapshot
+                    while not sub.queue.empty():
+                        sub.queue.get_nowait()
+                    sub.resync = False
+                    frame = self.snapshot_event()
+                yield frame
+        finally:
+            self.unsubscribe(sub)
@@ -0,0 +1,158 @@
+import argparse
+import gzip
+import json
+import math
+import os
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+# orjson and brotli are optional: without them responses use stdlib json and gzip
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# CONFIG
+COMPRESS_MIN_BYTES = 1024    # Smaller bodies are sent as-is (headers would eat the saving)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9           # Paid once per cache entry, not per response
+FORMATS = ("records", "columnar")
+
+
+def _default(obj):
+    # Types orjson doesn't know natively (e.g. Decimal from NUMERIC columns)
+    return jsonable_encoder(obj)
+
+
+def _finite(obj):
+    # NaN/inf -> None, as orjson writes them, so both paths return the same body
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def dumps(content):
+    """
+    JSON bytes for a response body. orjson serializes dicts, lists, dates and numpy values
+    directly, skipping jsonable_encoder's per-value walk. NaN/inf become null either way.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(_finite(jsonable_encoder(content)), ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def columnar(rows, fields=None):
+    """List of row dicts -> one array per field: {"abbrev": [...], "points": [...], ...}."""
+    fields = fields or (list(rows[0]) if rows else [])
+    return {f: [r[f] for r in rows] for f in fields}
+
+
+def shape(rows, format, fields=None):
+    """Rows in the requested response format ('records' or 'columnar')."""
+    return columnar(rows, fields) if format == "columnar" else rows
+
+
+def accepted_encodings(accept_encoding):
+    """Content codings the client accepts (q > 0) from an Accept-Encoding header."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def negotiate_encoding(accept_encoding, size):
+    """'br', 'gzip' or None (identity) for a body of `size` bytes."""
+    if size < COMPRESS_MIN_BYTES:
+        return None
+    accepted = accepted_encodings(accept_encoding)
+    if BROTLI_AVAILABLE and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        # mtime=0 keeps the output (and so its ETag) deterministic
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported encoding '{encoding}'")
+
+
+def benchmark(n_days=180, repeat=5):
+    """Serialization time and body size of a season of history rows, per format and encoding."""
+    from datetime import date
+
+    from benchmarks.synthetic import make_seasons
+
+    df = make_seasons(1)[0].frame().drop(columns=["made_playoffs"])
+    df["date"] = [date.fromisoformat(d) for d in df["date"]]
+    df["playoff_prob"] = 0.5
+    rows = df[df["date"] <= sorted(set(df["date"]))[min(n_days, df["date"].nunique()) - 1]].to_dict("records")
+    rows = [{k: (v.item() if hasattr(v, "item") else v) for k, v in r.items()} for r in rows]
+
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            out = fn()
+            times.append(time.perf_counter() - start)
+        return min(times), out
+
+    stdlib = lambda c: json.dumps(jsonable_encoder(c), ensure_ascii=False, allow_nan=False,
+                                  separators=(",", ":")).encode("utf-8")
+    results = {}
+    for label, serialize, content in (
+        ("stdlib records", stdlib, rows),
+        ("records", dumps, rows),
+        ("columnar", dumps, columnar(rows)),
+    ):
+        seconds, body = best(lambda: serialize(content))
+        sizes = {"identity": len(body), "gzip": len(compress(body, "gzip"))}
+        if BROTLI_AVAILABLE:
+            sizes["br"] = len(compress(body, "br"))
+        results[label] = {"ms": round(seconds * 1000, 2), "bytes": sizes}
+    return {"rows": len(rows), "orjson": ORJSON_AVAILABLE, "brotli": BROTLI_AVAILABLE, "formats": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time response serialization and compare body sizes.")
+    parser.add_argument("--days", type=int, default=180, help="Days of 32-team history in the payload")
+    args = parser.parse_args()
+
+    out = benchmark(args.days)
+    print(f"{out['rows']} rows (orjson: {out['orjson']}, brotli: {out['brotli']})")
+    for label, r in out["formats"].items():
+        sizes = ", ".join(f"{k} {v / 1024:,.1f} KiB" for k, v in r["bytes"].items())
+        print(f"  {label:<15} {r['ms']:8.2f} ms   {sizes}")
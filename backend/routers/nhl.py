@@ -1,10 +1,21 @@
-from fastapi import APIRouter, HTTPException
-import pandas as pd
-import joblib
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import os
 import sys
-import numpy as np
-from database.db_utils import get_connection
+import threading
+import time
+from datetime import date, timedelta
+from typing import Optional
+from database.async_db import fetch_all, fetch_val
+from database.db_utils import pooled_connection
+from models.registry import LiveModel
+from models.simulation import DEFAULT_SIMS, simulate
+from backend.cache import ResponseCache, CacheEntry, etag_matches, CACHE_TTL_SECONDS
+from backend.push import StandingsBroadcaster
+from backend.store import StandingsStore
+from backend.render import FORMATS, dumps, negotiate_encoding, shape
+from metrics import profiled, span
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(os.path.dirname(current_dir))
@@ -12,113 +23,639 @@ if project_root not in sys.path:
     sys.path.append(project_root)
 
 router = APIRouter()
-_model = None
+CURRENT_SEASON_ID = 20252026
+FORMAT_PATTERN = f"^({'|'.join(FORMATS)})$"
 
-def get_model():
-    """Singleton pattern to load model only once."""
-    global _model
-    if _model is None:
-        model_path = os.path.join(project_root, 'models', 'playoff_predictor.pkl')
-        try:
-            _model = joblib.load(model_path)
-            print(f"Model loaded from {model_path}")
-        except FileNotFoundError:
-            print(f"Error: Model not found at {model_path}")
-            return None
-    return _model
+response_cache = ResponseCache()
+_latest_dates = {}  # (season_id, as_of) -> (snapshot_date, fetched_at), cleared alongside the response cache
+_latest_lock = threading.Lock()
+_group_levels = {}  # lower(name) -> (level, name) of a division/conference, cleared alongside the response cache
 
-@router.get("/standings")
-def get_nhl_standings():
+# Serving model: loaded and warmed at startup, hot-swapped when the registry's CURRENT changes
+live_model = LiveModel()
+
+def model_version():
+    """Version of the model being served; predictions and cache keys are tied to it."""
+    return live_model.version
+
+# Typed in-memory copy of the standings, schedule and predictions; reads fall back to SQL until it loads
+store = StandingsStore(model_version)
+
+async def latest_date(season_id, as_of=None):
     """
-    Fetches current standings, calculates stats (including advanced leading indicators),
-    and applies the ML model to predict playoff chances.
+    Snapshot date for a season: the latest one, or the latest on/before as_of.
+    Memoized until the cache is invalidated or the TTL passes.
     """
-    conn = get_connection()
+    if store.ready:
+        return store.latest_date(season_id, as_of)
+    memo_key = (season_id, as_of)
+    with _latest_lock:
+        cached = _latest_dates.get(memo_key)
+        if cached and time.monotonic() - cached[1] < CACHE_TTL_SECONDS:
+            return cached[0]
     try:
-        # Fetch Data (Latest available date for current season)
-        query = """
-        WITH LatestDate AS (
-            SELECT max(date) as max_date 
-            FROM daily_standings 
-            WHERE season_id = 20252026
+        if as_of is None:
+            max_date = await fetch_val("SELECT max(date) FROM daily_standings WHERE season_id = %s", (season_id,))
+        else:
+            max_date = await fetch_val(
+                "SELECT max(date) FROM daily_standings WHERE season_id = %s AND date <= %s", (season_id, as_of)
+            )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    with _latest_lock:
+        _latest_dates[memo_key] = (max_date, time.monotonic())
+    return max_date
+
+async def season_for_date(as_of):
+    """Season of the most recent snapshot on/before a date (uses the (date, team_id) unique index)."""
+    if store.ready:
+        return store.season_for_date(as_of)
+    try:
+        return await fetch_val(
+            "SELECT season_id FROM daily_standings WHERE date <= %s ORDER BY date DESC LIMIT 1", (as_of,)
         )
-        SELECT
-            t.name,
-            t.abbrev,
-            t.conference,
-            t.division,
-            t.logo_url,
-            ds.games_played,
-            ds.wins,
-            ds.losses,
-            ds.ot_losses,
-            ds.points,
-            ds.goals_for,
-            ds.goals_against,
-            ds.l10_points,
-            ds.streak_code,
-            ds.streak_count
-        FROM daily_standings ds
-        JOIN teams t ON ds.team_id = t.team_id
-        JOIN LatestDate ld ON ds.date = ld.max_date
-        WHERE ds.season_id = 20252026;
-        """
-        df = pd.read_sql(query, conn)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    finally:
-        conn.close()
 
-    if df.empty:
+def invalidate_caches(payloads=None):
+    """Called when the ETL NOTIFYs that new standings were committed."""
+    with _latest_lock:
+        _latest_dates.clear()
+        _group_levels.clear()
+    response_cache.invalidate()
+
+def render_json(content):
+    # Serialized once per cache entry, bypassing FastAPI's jsonable_encoder (see backend/render.py)
+    return CacheEntry(dumps(content))
+
+def cached_response(request, entry):
+    """
+    Serves a cache entry, answering 304 when the client already holds it. Bodies are sent
+    br/gzip-compressed when the client accepts it; the compressed bytes are cached with the entry.
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), len(entry.body))
+    etag = entry.etag_for(encoding)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, etag) or etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    if encoding is None:
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(content=entry.encoded(encoding), media_type=entry.media_type, headers=headers)
+
+STANDINGS_FIELDS = [
+    'name', 'abbrev', 'conference', 'division', 'logo_url',
+    'games_played', 'wins', 'losses', 'ot_losses', 'points',
+    'goals_for', 'goals_against', 'l10_points', 'streak_code', 'streak_count', 'playoff_prob'
+]
+
+# Standings for one date joined to its stored trend features and the predictions stored at
+# ingestion time for the current model
+STANDINGS_QUERY = """
+    SELECT
+        ds.date,
+        ds.season_id,
+        ds.team_id,
+        t.name,
+        t.abbrev,
+        t.conference,
+        t.division,
+        t.logo_url,
+        ds.games_played,
+        ds.wins,
+        ds.losses,
+        ds.ot_losses,
+        ds.points,
+        ds.goals_for,
+        ds.goals_against,
+        ds.l10_points,
+        ds.streak_code,
+        ds.streak_count,
+        fs.gd_trend,
+        fs.form_delta,
+        fs.pace_vs_cutline,
+        dp.playoff_prob
+    FROM daily_standings ds
+    JOIN teams t ON ds.team_id = t.team_id
+    LEFT JOIN daily_features fs ON fs.date = ds.date AND fs.team_id = ds.team_id
+    LEFT JOIN daily_predictions dp
+      ON dp.date = ds.date AND dp.team_id = ds.team_id AND dp.model_version = %s
+    WHERE ds.season_id = %s AND ds.date = %s;
+"""
+
+@router.get("/standings")
+async def get_nhl_standings(
+    request: Request,
+    season: Optional[int] = Query(None, description="Season ID, e.g. 20232024 (defaults to the current season)"),
+    as_of: Optional[date] = Query(None, description="Show the standings as they were on this date"),
+    fmt: str = Query("records", alias="format", pattern=FORMAT_PATTERN,
+                     description="records (one object per row) or columnar (one array per field)"),
+):
+    """
+    Serves the standings + playoff predictions, cached per (season, snapshot date, model version).
+    Predictions are read from daily_predictions; supports If-None-Match so unchanged data costs a 304.
+    """
+    season_id = season
+    if season_id is None:
+        season_id = (await season_for_date(as_of) if as_of else None) or CURRENT_SEASON_ID
+    with span("standings", "snapshot_date"):
+        max_date = await latest_date(season_id, as_of)
+    if max_date is None:
         return []
+    version = model_version()
+    key = ("standings", season_id, max_date, version, fmt)
+    entry = response_cache.get(key)
+    if entry is None:
+        rows = await standings_rows(season_id, max_date, version)
+        with span("standings", "serialize"):
+            entry = response_cache.put(key, render_json(shape(format_standings(rows), fmt, STANDINGS_FIELDS)))
+    return cached_response(request, entry)
 
-    # Feature Engineering
-    df['goal_diff'] = df['goals_for'] - df['goals_against']
-    # Avoid division by zero
-    df['win_pct'] = df.apply(lambda x: x['wins'] / x['games_played'] if x['games_played'] > 0 else 0, axis=1)
-    
-    # Interaction Term
-    df['points_win_interaction'] = df['points'] * df['win_pct']
-
-    # Normalize L10 Points (Max is 20 points in 10 games)
-    df['l10_pct'] = df['l10_points'] / 20.0
-
-    # Calculate Numeric Streak
-    def calculate_streak(row):
-        code = row.get('streak_code', 'N')
-        count = row.get('streak_count', 0)
-        if code == 'W': return count
-        if code in ['L', 'OT']: return -count
-        return 0
-    
-    df['streak_numeric'] = df.apply(calculate_streak, axis=1)
-
-    # Prepare Feature Matrix for Prediction
-    # Match order of these columns in models/train.py
-    features = ['games_played', 'points', 'win_pct', 'goal_diff', 'points_win_interaction', 'l10_pct', 'streak_numeric']
-    
-    # Handle NaNs
-    df[features] = df[features].fillna(0)
-
-    # Predict
-    model = get_model()
-    if model:
+async def standings_rows(season_id, max_date, version, route="standings"):
+    """Standings joined to stored predictions for one snapshot; missing predictions are scored."""
+    with span(route, "store"):
+        rows = store.snapshot(season_id, max_date, version)
+    if rows is None:
         try:
-            X = df[features]
-            if hasattr(model, "predict_proba"):
-                # predict_proba returns [prob_class_0, prob_class_1]
-                # We want prob_class_1 (Probability of making playoffs)
-                probs = model.predict_proba(X)[:, 1]
-            else:
-                probs = model.predict(X).astype(float)
-            
-            df['playoff_prob'] = np.clip(probs, 0.0, 1.0)
+            with span(route, "db_query"):
+                rows = await fetch_all(STANDINGS_QUERY, (version, season_id, max_date))
         except Exception as e:
-            print(f"Prediction error: {e}")
-            df['playoff_prob'] = 0.0
-    else:
-        df['playoff_prob'] = 0.0 # Default if model fails
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    if version is not None and any(r['playoff_prob'] is None for r in rows):
+        # Not materialized yet (e.g. a model trained since the last ETL run): score and store them now
+        with span(route, "score_missing"):
+            rows = await run_in_threadpool(profiled(score_missing), rows)
+    return rows
+
+async def live_standings():
+    """Push stream loader: (snapshot date, formatted standings) of the current season."""
+    max_date = await latest_date(CURRENT_SEASON_ID)
+    if max_date is None:
+        return None, []
+    rows = await standings_rows(CURRENT_SEASON_ID, max_date, model_version(), route="standings_stream")
+    return max_date, format_standings(rows)
 
-    # Format for Frontend (Return all original cols + prediction)
-    result = df.to_dict(orient="records")
+# One snapshot per worker, read once per update however many dashboards are connected
+broadcaster = StandingsBroadcaster(live_standings)
+
+@router.get("/standings/stream")
+async def stream_nhl_standings(request: Request, last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events: a full `snapshot` event on connect, then `delta` events carrying only
+    the per-team fields that changed when new standings or predictions land.
+    """
+    try:
+        sub, frames = await broadcaster.subscribe(last_event_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Standings stream unavailable: {str(e)}")
+    return StreamingResponse(
+        broadcaster.stream(request, sub, frames),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def format_standings(rows):
+    """Shapes joined rows for the frontend; teams without a prediction get 0.0."""
+    result = []
+    for r in rows:
+        item = {k: r[k] for k in STANDINGS_FIELDS}
+        if item['playoff_prob'] is None:
+            item['playoff_prob'] = 0.0
+        result.append(item)
     return result
+
+def score_missing(rows):
+    """
+    Fallback for rows without a stored prediction: calculates features, applies the
+    ML model and writes the predictions through to daily_predictions.
+    """
+    # Heavy imports stay off the API's import path; this fallback is rare
+    import pandas as pd
+    from models.features import SOURCE_COLUMNS, feature_matrix
+    from models.predictions import predict_playoff_probs, write_predictions
+
+    model, version = live_model.get()
+    if model is None:
+        return rows
+
+    df = pd.DataFrame(rows)
+    try:
+        probs = predict_playoff_probs(model, feature_matrix(df[SOURCE_COLUMNS].copy()))
+    except Exception as e:
+        print(f"Prediction error: {e}")
+        return rows
+
+    scored = [dict(r, playoff_prob=float(p)) for r, p in zip(rows, probs)]
+    try:
+        with pooled_connection() as conn:
+            write_predictions(conn.cursor(), [
+                (r['date'], r['season_id'], r['team_id'], version, r['playoff_prob']) for r in scored
+            ])
+            conn.commit()
+    except Exception as e:
+        print(f"Could not store predictions: {e}")
+    store.put_predictions(version, scored)
+    return scored
+
+SIMULATION_TEAMS_QUERY = """
+    SELECT t.abbrev, t.name, t.conference, t.division, ds.points, ds.wins, ds.games_played, dp.playoff_prob
+    FROM daily_standings ds
+    JOIN teams t ON ds.team_id = t.team_id
+    LEFT JOIN daily_predictions dp
+      ON dp.date = ds.date AND dp.team_id = ds.team_id AND dp.model_version = %s
+    WHERE ds.season_id = %s AND ds.date = %s;
+"""
+
+# Every game after the snapshot, whatever its state: games already played since then are not
+# in the standings yet, so they are simulated too (a stale snapshot must not shorten the season)
+REMAINING_GAMES_QUERY = """
+    SELECT h.abbrev AS home, a.abbrev AS away
+    FROM schedule s
+    JOIN teams h ON h.team_id = s.home_team_id
+    JOIN teams a ON a.team_id = s.away_team_id
+    WHERE s.season_id = %s AND s.date > %s
+    ORDER BY s.date, s.game_id;
+"""
+
+@router.get("/simulation")
+async def get_nhl_simulation(
+    request: Request,
+    sims: int = Query(DEFAULT_SIMS, ge=1_000, le=1_000_000),
+    seed: Optional[int] = None,
+    fmt: str = Query("records", alias="format", pattern=FORMAT_PATTERN,
+                     description="records (one object per row) or columnar (one array per field)"),
+):
+    """
+    Monte Carlo playoff odds: simulates the remaining schedule from the latest standings,
+    seeding team strength from the stored model predictions when available.
+    """
+    season_id = CURRENT_SEASON_ID
+    with span("simulation", "snapshot_date"):
+        max_date = await latest_date(season_id)
+    version = model_version()
+    key = ("simulation", season_id, max_date, version, sims, seed, fmt)
+    entry = response_cache.get(key)
+    if entry is None:
+        with span("simulation", "store"):
+            teams = store.snapshot(season_id, max_date, version) if max_date else []
+            games = store.pending_games(season_id, max_date, include_final=True) if teams else []
+        if teams is None or games is None:
+            try:
+                with span("simulation", "db_query"):
+                    teams = await fetch_all(SIMULATION_TEAMS_QUERY, (version, season_id, max_date))
+                    games = await fetch_all(REMAINING_GAMES_QUERY, (season_id, max_date))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        model_probs = {t['abbrev']: t['playoff_prob'] for t in teams if t['playoff_prob'] is not None}
+        results = []
+        if teams:
+            with span("simulation", "simulate"):
+                results = await run_in_threadpool(
+                    profiled(simulate), teams, [(g['home'], g['away']) for g in games],
+                    n_sims=sims, seed=seed, model_probs=model_probs
+                )
+        names = {t['abbrev']: t for t in teams}
+        for r in results:
+            t = names[r['abbrev']]
+            r.update(name=t['name'], conference=t['conference'], division=t['division'], points=t['points'])
+        payload = {
+            "season_id": season_id,
+            "as_of": max_date,
+            "simulations": sims,
+            "remaining_games": len(games),
+            "model_seeded": bool(teams) and len(model_probs) == len(teams),
+            "teams": shape(sorted(results, key=lambda r: -r['playoff_prob']), fmt),
+        }
+        with span("simulation", "serialize"):
+            entry = response_cache.put(key, render_json(payload))
+    return cached_response(request, entry)
+
+NEXT_GAMES_QUERY = """
+    SELECT h.abbrev AS home, a.abbrev AS away, s.date
+    FROM schedule s
+    JOIN teams h ON h.team_id = s.home_team_id
+    JOIN teams a ON a.team_id = s.away_team_id
+    WHERE s.season_id = %s AND s.game_state NOT IN ('OFF', 'FINAL')
+      AND s.date = (
+        SELECT min(date) FROM schedule
+        WHERE season_id = %s AND date > %s AND game_state NOT IN ('OFF', 'FINAL')
+      )
+    ORDER BY s.game_id;
+"""
+
+def parse_games(spec):
+    """'BOS@TOR,CGY@EDM:home_win' -> [(home, away, fixed_outcome_or_None)]."""
+    from models.scenarios import GAME_OUTCOMES
+
+    games = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        matchup, _, fixed = item.partition(":")
+        away, sep, home = matchup.upper().partition("@")
+        if not sep or not away or not home or away == home:
+            raise HTTPException(status_code=400, detail=f"Expected AWAY@HOME, got '{item}'")
+        if fixed and fixed not in GAME_OUTCOMES:
+            raise HTTPException(status_code=400, detail=f"Unknown outcome '{fixed}' (one of {', '.join(GAME_OUTCOMES)})")
+        games.append((home, away, fixed or None))
+    return games
+
+# Games played as of a snapshot, for the trend window's anchor
+ANCHOR_GAMES_QUERY = "SELECT team_id, games_played FROM daily_standings WHERE season_id = %s AND date = %s;"
+
+async def add_window_games(teams, season_id, max_date, version):
+    """Sets each team's window_games: games since its trend window's anchor snapshot (see models/feature_store.py)."""
+    from models.feature_store import TREND_DAYS
+
+    played = {}
+    anchor = await latest_date(season_id, max_date - timedelta(days=TREND_DAYS))
+    if anchor is not None:
+        rows = store.snapshot(season_id, anchor, version)
+        if rows is None:
+            try:
+                rows = await fetch_all(ANCHOR_GAMES_QUERY, (season_id, anchor))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        played = {r['team_id']: r['games_played'] for r in rows}
+    for t in teams.values():
+        t['window_games'] = t['games_played'] - played.get(t['team_id'], 0)
+
+def score_scenarios(teams, games, model):
+    # Heavy imports stay off the API's import path
+    from models.scenarios import evaluate_scenarios
+    model_probs = {a: t['playoff_prob'] for a, t in teams.items()}
+    return evaluate_scenarios(teams, games, model, model_probs)
+
+@router.get("/scenarios")
+async def get_nhl_scenarios(
+    request: Request,
+    games: Optional[str] = Query(None, description="Comma-separated AWAY@HOME games, optionally pinned "
+                                                   "(e.g. BOS@TOR:home_win). Defaults to the next game day"),
+):
+    """
+    What-if playoff odds for a set of pending games: expected, best and worst case per team
+    and the odds under each outcome of each game, all scored in one model batch.
+    """
+    from models.scenarios import check_games
+
+    season_id = CURRENT_SEASON_ID
+    with span("scenarios", "snapshot_date"):
+        max_date = await latest_date(season_id)
+    model, version = live_model.get()
+    if model is None:
+        raise HTTPException(status_code=503, detail="No trained model available")
+    if max_date is None:
+        return []
+
+    game_date = None
+    if games:
+        matchups = parse_games(games)
+    else:
+        scheduled = store.pending_games(season_id, max_date, next_day_only=True)
+        if scheduled is None:
+            try:
+                with span("scenarios", "db_query"):
+                    scheduled = await fetch_all(NEXT_GAMES_QUERY, (season_id, season_id, max_date))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        matchups = [(g['home'], g['away'], None) for g in scheduled]
+        game_date = scheduled[0]['date'] if scheduled else None
+    try:
+        check_games(matchups)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    key = ("scenarios", season_id, max_date, version, tuple(matchups))
+    entry = response_cache.get(key)
+    if entry is None:
+        rows = await standings_rows(season_id, max_date, version, route="scenarios")
+        teams = {r['abbrev']: r for r in rows}
+        unknown = sorted({t for h, a, _ in matchups for t in (h, a)} - set(teams))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown teams: {', '.join(unknown)}")
+        with span("scenarios", "trend_window"):
+            await add_window_games(teams, season_id, max_date, version)
+        with span("scenarios", "score"):
+            result = await run_in_threadpool(profiled(score_scenarios), teams, matchups, model)
+        for t in result["teams"]:
+            t["name"] = teams[t["abbrev"]]["name"]
+        payload = {"season_id": season_id, "as_of": max_date, "game_date": game_date, **result}
+        with span("scenarios", "serialize"):
+            entry = response_cache.put(key, render_json(payload))
+    return cached_response(request, entry)
+
+HISTORY_FIELDS = (
+    'date', 'season_id', 'games_played', 'wins', 'losses', 'ot_losses', 'points',
+    'goals_for', 'goals_against', 'l10_points', 'streak_code', 'streak_count', 'playoff_prob'
+)
+
+HISTORY_QUERY = """
+    SELECT
+        ds.date,
+        ds.season_id,
+        ds.games_played,
+        ds.wins,
+        ds.losses,
+        ds.ot_losses,
+        ds.points,
+        ds.goals_for,
+        ds.goals_against,
+        ds.l10_points,
+        ds.streak_code,
+        ds.streak_count,
+        dp.playoff_prob
+    FROM daily_standings ds
+    LEFT JOIN daily_predictions dp
+      ON dp.date = ds.date AND dp.team_id = ds.team_id AND dp.model_version = %s
+    WHERE ds.team_id = %s {season_filter}
+    ORDER BY ds.date;
+"""
+
+@router.get("/teams/{abbrev}/history")
+async def get_team_history(
+    request: Request,
+    abbrev: str,
+    season: Optional[int] = Query(None, description="Season ID (defaults to every season on record)"),
+    fmt: str = Query("records", alias="format", pattern=FORMAT_PATTERN,
+                     description="records (one object per row) or columnar (one array per field)"),
+):
+    """Time series of a team's standings snapshots and stored playoff probabilities."""
+    abbrev = abbrev.upper()
+    if store.ready:
+        team_id = store.team_ids.get(abbrev)
+    else:
+        try:
+            team_id = await fetch_val("SELECT team_id FROM teams WHERE abbrev = %s", (abbrev,))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    if team_id is None:
+        raise HTTPException(status_code=404, detail=f"Unknown team '{abbrev}'")
+
+    version = model_version()
+    key = ("history", team_id, season, await latest_date(season or CURRENT_SEASON_ID), version, fmt)
+    entry = response_cache.get(key)
+    if entry is None:
+        with span("history", "store"):
+            rows = store.team_history(team_id, season, version, HISTORY_FIELDS)
+        if rows is None:
+            # (team_id, season_id, date) index serves both the filtered and the all-seasons scan
+            if season is None:
+                query, params = HISTORY_QUERY.format(season_filter=""), (version, team_id)
+            else:
+                query, params = HISTORY_QUERY.format(season_filter="AND ds.season_id = %s"), (version, team_id, season)
+            try:
+                with span("history", "db_query"):
+                    rows = await fetch_all(query, params)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        with span("history", "serialize"):
+            entry = response_cache.put(key, render_json({"abbrev": abbrev, "season_id": season, "history": shape(rows, fmt)}))
+    return cached_response(request, entry)
+
+# Sortable team_season_summary columns for /leaders (whitelisted: interpolated into SQL)
+LEADER_STATS = {
+    "points": "s.points",
+    "points_pct": "s.points_pct",
+    "goal_diff": "s.goal_diff",
+    "pace": "s.pace_points",
+    "l10_pace": "s.l10_pace_points",
+    "win_streak": "s.max_win_streak",
+    "improvement": "s.points_pct - s.prev_points_pct",
+}
+
+SUMMARY_FIELDS = """
+        t.abbrev, t.name, t.conference, t.division, t.logo_url,
+        s.as_of, s.games_played, s.wins, s.losses, s.ot_losses, s.points, s.goals_for, s.goals_against,
+        s.goal_diff, s.points_pct, s.pace_points, s.l10_pace_points, s.max_win_streak, s.prev_points_pct
+"""
+
+# Rollups are per season (32 rows), so these cost the same however much history is stored
+LEADERS_QUERY = """
+    SELECT {fields}, {stat} AS value
+    FROM team_season_summary s
+    JOIN teams t ON t.team_id = s.team_id
+    WHERE s.season_id = %s AND {stat} IS NOT NULL {group_filter}
+    ORDER BY value DESC, s.games_played
+    LIMIT %s;
+"""
+
+GROUP_LEVEL_QUERY = """
+    SELECT level, name FROM (
+        SELECT DISTINCT 'division' AS level, division AS name FROM teams
+        UNION
+        SELECT DISTINCT 'conference', conference FROM teams
+    ) g
+    WHERE lower(name) = lower(%s)
+    ORDER BY level DESC;
+"""
+
+GROUP_TEAMS_QUERY = """
+    SELECT {fields}
+    FROM team_season_summary s
+    JOIN teams t ON t.team_id = s.team_id
+    WHERE s.season_id = %s AND t.{level} = %s
+    ORDER BY s.points DESC, s.games_played;
+"""
+
+GROUP_WEEKLY_QUERY = """
+    SELECT g.week, g.as_of, g.teams, g.games_played, g.points, g.goal_diff, g.points_pct,
+           t.abbrev AS leader, g.leader_points
+    FROM group_weekly g
+    LEFT JOIN teams t ON t.team_id = g.leader_team_id
+    WHERE g.level = %s AND g.name = %s AND g.season_id = %s
+    ORDER BY g.week;
+"""
+
+@router.get("/leaders")
+async def get_nhl_leaders(
+    request: Request,
+    stat: str = Query("points", pattern=f"^({'|'.join(LEADER_STATS)})$",
+                      description="points, points_pct, goal_diff, pace, l10_pace, win_streak or improvement"),
+    season: Optional[int] = Query(None, description="Season ID (defaults to the current season)"),
+    group: Optional[str] = Query(None, description="Only teams of this conference or division"),
+    limit: int = Query(10, ge=1, le=32),
+    fmt: str = Query("records", alias="format", pattern=FORMAT_PATTERN,
+                     description="records (one object per row) or columnar (one array per field)"),
+):
+    """League leaders for a season, read from the team_season_summary rollup."""
+    season_id = season or CURRENT_SEASON_ID
+    max_date = await latest_date(season_id)
+    key = ("leaders", season_id, max_date, stat, group and group.lower(), limit, fmt)
+    entry = response_cache.get(key)
+    if entry is None:
+        group_filter, params = "", [season_id]
+        if group:
+            group_filter = "AND (lower(t.conference) = lower(%s) OR lower(t.division) = lower(%s))"
+            params += [group, group]
+        query = LEADERS_QUERY.format(fields=SUMMARY_FIELDS, stat=LEADER_STATS[stat], group_filter=group_filter)
+        try:
+            with span("leaders", "db_query"):
+                rows = await fetch_all(query, (*params, limit))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        payload = {"season_id": season_id, "as_of": max_date, "stat": stat, "group": group, "leaders": shape(rows, fmt)}
+        with span("leaders", "serialize"):
+            entry = response_cache.put(key, render_json(payload))
+    return cached_response(request, entry)
+
+async def group_level(name):
+    """('division' or 'conference', canonical name) for a group name, or None if no team is in it."""
+    key = name.lower()
+    if store.ready:
+        for level in ("division", "conference"):
+            for t in store.teams.values():
+                if (t[level] or "").lower() == key:
+                    return level, t[level]
+        return None
+    with _latest_lock:
+        if key in _group_levels:
+            return _group_levels[key]
+    try:
+        rows = await fetch_all(GROUP_LEVEL_QUERY, (name,))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    group = (rows[0]['level'], rows[0]['name']) if rows else None
+    with _latest_lock:
+        _group_levels[key] = group
+    return group
+
+@router.get("/divisions/{name}")
+async def get_nhl_division(
+    request: Request,
+    name: str,
+    season: Optional[int] = Query(None, description="Season ID (defaults to the current season)"),
+    fmt: str = Query("records", alias="format", pattern=FORMAT_PATTERN,
+                     description="records (one object per row) or columnar (one array per field)"),
+):
+    """
+    A division's (or conference's) teams with points pace and season-over-season change,
+    plus its week-by-week totals, from the group_weekly and team_season_summary rollups.
+    """
+    season_id = season or CURRENT_SEASON_ID
+    group = await group_level(name)
+    if group is None:
+        raise HTTPException(status_code=404, detail=f"Unknown division or conference '{name}'")
+    level, name = group
+
+    max_date = await latest_date(season_id)
+    key = ("divisions", level, name, season_id, max_date, fmt)
+    entry = response_cache.get(key)
+    if entry is None:
+        try:
+            with span("divisions", "db_query"):
+                teams = await fetch_all(GROUP_TEAMS_QUERY.format(fields=SUMMARY_FIELDS, level=level), (season_id, name))
+                weekly = await fetch_all(GROUP_WEEKLY_QUERY, (level, name, season_id))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        payload = {
+            "name": name,
+            "level": level,
+            "season_id": season_id,
+            "as_of": max_date,
+            "teams": shape(teams, fmt),
+            "weekly": shape(weekly, fmt),
+        }
+        with span("divisions", "serialize"):
+            entry = response_cache.put(key, render_json(payload))
+    return cached_response(request, entry)
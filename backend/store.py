@@ -0,0 +1,368 @@
+import copy
+import threading
+import time
+from datetime import date
+
+import numpy as np
+
+from database.db_utils import pooled_connection
+from metrics import STORE_ROWS, STORE_UPDATES
+
+# CONFIG
+KEY_TEAM = 1_000            # team_id < KEY_TEAM
+KEY_DAY = 100_000           # Days since 1970 < KEY_DAY (until 2243)
+KEY_SEASON = 10 ** 13       # season_id * KEY_DAY + day < KEY_SEASON
+FINAL_STATES = ("OFF", "FINAL")
+
+INT_COLUMNS = (
+    "season_id", "team_id", "games_played", "wins", "losses", "ot_losses", "points",
+    "goals_for", "goals_against", "l10_points", "streak_count",
+)
+# daily_features trend columns (STORED_FEATURES in models/features.py, kept off the API import path) + prediction
+FLOAT_COLUMNS = ("gd_trend", "form_delta", "pace_vs_cutline", "playoff_prob")
+TEAM_FIELDS = ("name", "abbrev", "conference", "division", "logo_url")
+
+STANDINGS_LOAD_QUERY = """
+    SELECT ds.date, ds.season_id, ds.team_id, ds.games_played, ds.wins, ds.losses, ds.ot_losses, ds.points,
+           ds.goals_for, ds.goals_against, ds.l10_points, ds.streak_code, ds.streak_count,
+           fs.gd_trend, fs.form_delta, fs.pace_vs_cutline, dp.playoff_prob
+    FROM daily_standings ds
+    LEFT JOIN daily_features fs ON fs.date = ds.date AND fs.team_id = ds.team_id
+    LEFT JOIN daily_predictions dp
+      ON dp.date = ds.date AND dp.team_id = ds.team_id AND dp.model_version = %s
+    {where}
+    ORDER BY ds.season_id, ds.date, ds.team_id;
+"""
+PREDICTIONS_LOAD_QUERY = "SELECT season_id, date, team_id, playoff_prob FROM daily_predictions WHERE model_version = %s;"
+TEAMS_LOAD_QUERY = "SELECT team_id, name, abbrev, conference, division, logo_url FROM teams;"
+SCHEDULE_LOAD_QUERY = """
+    SELECT season_id, date, game_id, home_team_id, away_team_id, game_state
+    FROM schedule
+    ORDER BY season_id, date, game_id;
+"""
+
+
+def _days(dates):
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def _snapshot_key(season_id, day):
+    """Sort key of a (season, date) snapshot; rows add team_id below it."""
+    return (np.int64(season_id) * KEY_DAY + day) * KEY_TEAM
+
+
+class Dictionary:
+    """Append-only string <-> small int encoding shared by every StandingsData generation."""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def encode(self, values):
+        codes = np.empty(len(values), dtype=np.int16)
+        for i, v in enumerate(values):
+            code = self._codes.get(v)
+            if code is None:
+                code = self._codes[v] = len(self.values)
+                self.values.append(v)
+            codes[i] = code
+        return codes
+
+    def decode(self, codes):
+        return [self.values[c] for c in codes]
+
+
+class StandingsData:
+    """
+    One immutable generation of the standings as typed columns, sorted by (season, date,
+    team). `key` packs that order into one int64 so a snapshot or a season is a pair of
+    searchsorted calls; `team_order`/`team_key` do the same for one team's time series.
+    """
+
+    def __init__(self, columns, version):
+        self.columns = columns
+        self.version = version
+        self.days = columns["date"].astype(np.int64)
+        self.key = (columns["season_id"].astype(np.int64) * KEY_DAY + self.days) * KEY_TEAM + columns["team_id"]
+        team_key = columns["team_id"].astype(np.int64) * KEY_SEASON + columns["season_id"].astype(np.int64) * KEY_DAY + self.days
+        self.team_order = np.argsort(team_key, kind="stable")
+        self.team_key = team_key[self.team_order]
+
+    def __len__(self):
+        return len(self.key)
+
+    def with_predictions(self, probs, version):
+        """A new generation with the playoff_prob column replaced; rows and indexes are shared."""
+        data = copy.copy(self)
+        data.columns = dict(self.columns, playoff_prob=probs)
+        data.version = version
+        return data
+
+    def splice(self, lo, hi, new):
+        """A new generation with rows [lo, hi) replaced by `new` (columns already in key order)."""
+        columns = {c: np.concatenate([a[:lo], new[c], a[hi:]]) for c, a in self.columns.items()}
+        return StandingsData(columns, self.version)
+
+
+class StandingsStore:
+    """
+    The API's in-process copy of daily_standings, its predictions under the serving model,
+    the teams and the schedule. Loaded once at startup and kept current from the ETL's
+    NOTIFY payloads (a season id, optionally ':since-date', reloads just those rows) and
+    from model swaps (reloads the prediction column). Updates build a new StandingsData
+    and swap it in with one assignment, so readers never see a half-applied update.
+    Reads return None until the store is loaded, or when it holds predictions for another
+    model version; callers then fall back to SQL.
+    """
+
+    def __init__(self, version_source):
+        self.version_source = version_source   # () -> serving model version
+        self.teams = {}            # team_id -> {name, abbrev, ...}
+        self.team_ids = {}         # abbrev -> team_id
+        self.streaks = Dictionary()
+        self.states = Dictionary()
+        self._data = None
+        self._schedule = None
+        self._lock = threading.Lock()   # One writer at a time (listener thread, model watcher)
+
+    @property
+    def ready(self):
+        return self._data is not None
+
+    @property
+    def version(self):
+        data = self._data
+        return data.version if data is not None else None
+
+    def _columns(self, rows):
+        """DB rows (STANDINGS_LOAD_QUERY order) -> typed, dictionary-encoded columns."""
+        cols = list(zip(*rows)) if rows else [[] for _ in range(13 + len(FLOAT_COLUMNS))]
+        (dates, season, team, gp, wins, losses, otl, points, gf, ga, l10, streak_code, streak_count) = cols[:13]
+        columns = {"date": np.array(dates, dtype="datetime64[D]")}
+        for name, values in zip(INT_COLUMNS, (season, team, gp, wins, losses, otl, points, gf, ga, l10, streak_count)):
+            columns[name] = np.array([v or 0 for v in values], dtype=np.int32)
+        columns["streak_code"] = self.streaks.encode(streak_code)
+        for name, values in zip(FLOAT_COLUMNS, cols[13:]):
+            columns[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        return columns
+
+    def _query(self, sql, params=()):
+        with pooled_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                return cur.fetchall()
+
+    def _set(self, data):
+        self._data = data
+        STORE_ROWS.set(len(data))
+
+    # --- Loading and updates ---
+
+    def load(self):
+        """Full load; called at startup (in a worker thread) and for bulk ETL changes."""
+        start = time.perf_counter()
+        version = self.version_source()
+        with self._lock:
+            self._load_teams()
+            rows = self._query(STANDINGS_LOAD_QUERY.format(where=""), (version,))
+            self._set(StandingsData(self._columns(rows), version))
+            self._load_schedule()
+        STORE_UPDATES.inc("load")
+        print(f"Standings store: {len(rows)} rows, {len(self._schedule['game_id'])} games "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def _load_teams(self):
+        teams = {}
+        for team_id, *fields in self._query(TEAMS_LOAD_QUERY):
+            teams[team_id] = dict(zip(TEAM_FIELDS, fields))
+        self.teams = teams
+        self.team_ids = {t["abbrev"]: team_id for team_id, t in teams.items()}
+
+    def _load_schedule(self):
+        rows = self._query(SCHEDULE_LOAD_QUERY)
+        season, dates, game_id, home, away, state = (list(zip(*rows)) if rows else [[]] * 6)
+        days = _days(dates)
+        self._schedule = {
+            "key": np.asarray(season, dtype=np.int64) * KEY_DAY + days,
+            "date": np.array(dates, dtype="datetime64[D]"),
+            "game_id": np.array(game_id, dtype=np.int64),
+            "home": np.array(home, dtype=np.int32),
+            "away": np.array(away, dtype=np.int32),
+            "final": np.isin(self.states.encode(state), self.states.encode(FINAL_STATES)),
+        }
+
+    def update_season(self, season_id, since=None):
+        """Reloads one season's rows (from `since` on, if given) and splices them in."""
+        if self._data is None:
+            # Never loaded (e.g. the database was down at startup): this is the first load
+            return self.load()
+        with self._lock:
+            data = self._data
+            where, params = "WHERE ds.season_id = %s", [data.version, season_id]
+            if since is not None:
+                where += " AND ds.date >= %s"
+                params.append(since)
+            rows = self._query(STANDINGS_LOAD_QUERY.format(where=where), params)
+            if any(team_id not in self.teams for team_id in {r[2] for r in rows}):
+                self._load_teams()
+            first = _days(since) if since is not None else 0
+            lo, hi = np.searchsorted(data.key, [_snapshot_key(season_id, first), _snapshot_key(season_id + 1, 0)])
+            self._set(data.splice(lo, hi, self._columns(rows)))
+        STORE_UPDATES.inc("season")
+
+    @staticmethod
+    def _prediction_column(data, season, dates, team, prob, base):
+        """Copy of `base` with prob written at the rows of (season, date, team); unknown keys are skipped."""
+        probs = np.array(base, dtype=np.float64)
+        keys = (np.asarray(season, dtype=np.int64) * KEY_DAY + _days(dates)) * KEY_TEAM + np.asarray(team)
+        idx = np.searchsorted(data.key, keys)
+        found = idx < len(data)
+        found[found] &= data.key[idx[found]] == keys[found]
+        probs[idx[found]] = np.asarray(prob, dtype=np.float64)[found]
+        return probs
+
+    def set_version(self, version, force=False):
+        """Model swap: re-reads the prediction column for the new version (or, forced, the same one)."""
+        with self._lock:
+            data = self._data
+            if data is None or (data.version == version and not force):
+                return
+            probs = np.full(len(data), np.nan)
+            rows = self._query(PREDICTIONS_LOAD_QUERY, (version,))
+            if rows:
+                probs = self._prediction_column(data, *zip(*rows), probs)
+            self._set(data.with_predictions(probs, version))
+        STORE_UPDATES.inc("predictions")
+
+    def put_predictions(self, version, rows):
+        """Predictions scored by the API itself (rows with date, season_id, team_id, playoff_prob)."""
+        if not rows:
+            return
+        with self._lock:
+            data = self._data
+            if data is None or data.version != version:
+                return
+            probs = self._prediction_column(
+                data, [r["season_id"] for r in rows], [r["date"] for r in rows], [r["team_id"] for r in rows],
+                [r["playoff_prob"] for r in rows], data.columns["playoff_prob"],
+            )
+            self._set(data.with_predictions(probs, version))
+
+    def on_notify(self, payloads):
+        """NotifyListener callback. Must run before the caches are invalidated."""
+        try:
+            for kind, season_id, since in self._parse(payloads):
+                if kind == "full":
+                    self.load()
+                    return
+                if kind == "schedule":
+                    with self._lock:
+                        self._load_schedule()
+                    STORE_UPDATES.inc("schedule")
+                elif kind == "season":
+                    self.update_season(season_id, since)
+                elif kind == "predictions":
+                    # Training scores every snapshot after the swap; the column loaded then was incomplete
+                    self.set_version(self.version_source(), force=True)
+        except Exception as e:
+            # Stale rather than broken: reads keep serving the previous generation
+            print(f"Standings store update failed: {e}")
+
+    @staticmethod
+    def _parse(payloads):
+        # '20252026' / '20252026:2026-01-05' -> one season; 'schedule'; 'predictions' (new model's
+        # rows written); 'rollups' (no standings change); anything else (history, replay) -> full reload
+        updates = []
+        for payload in payloads or []:
+            head, _, since = str(payload).partition(":")
+            if head.isdigit():
+                updates.append(("season", int(head), date.fromisoformat(since) if since else None))
+            elif head in ("schedule", "predictions"):
+                updates.append((head, None, None))
+            elif head != "rollups":
+                return [("full", None, None)]
+        return updates
+
+    # --- Reads (None means "not available here, ask the database") ---
+
+    def _current(self, version=None):
+        data = self._data
+        if data is None or (version is not None and data.version != version):
+            return None
+        return data
+
+    def latest_date(self, season_id, as_of=None):
+        data = self._current()
+        if data is None:
+            return None
+        day = _days(as_of) if as_of is not None else KEY_DAY - 1
+        i = np.searchsorted(data.key, _snapshot_key(season_id, day + 1)) - 1
+        if i < 0 or data.columns["season_id"][i] != season_id:
+            return None
+        return data.columns["date"][i].item()
+
+    def season_for_date(self, as_of):
+        """Season of the most recent snapshot on/before a date (snapshot order is chronological)."""
+        data = self._current()
+        if data is None:
+            return None
+        i = np.searchsorted(data.days, _days(as_of), side="right") - 1
+        return int(data.columns["season_id"][i]) if i >= 0 else None
+
+    def _rows(self, data, idx, fields, with_team=False):
+        columns = {}
+        for f in fields:
+            if f == "streak_code":
+                columns[f] = self.streaks.decode(data.columns[f][idx])
+            elif f in FLOAT_COLUMNS:
+                columns[f] = [None if np.isnan(v) else v for v in data.columns[f][idx].tolist()]
+            else:
+                columns[f] = data.columns[f][idx].tolist()
+        rows = [dict(zip(fields, values)) for values in zip(*columns.values())]
+        if with_team:
+            for r in rows:
+                r.update(self.teams.get(r["team_id"], {}))
+        return rows
+
+    def snapshot(self, season_id, snapshot_date, version):
+        """Rows of one snapshot, shaped like STANDINGS_QUERY's result."""
+        data = self._current(version)
+        if data is None:
+            return None
+        base = _snapshot_key(season_id, _days(snapshot_date))
+        lo, hi = np.searchsorted(data.key, [base, base + KEY_TEAM])
+        fields = ("date", "season_id", "team_id", "games_played", "wins", "losses", "ot_losses", "points",
+                  "goals_for", "goals_against", "l10_points", "streak_code", "streak_count", *FLOAT_COLUMNS)
+        return self._rows(data, slice(lo, hi), fields, with_team=True)
+
+    def team_history(self, team_id, season_id, version, fields):
+        """One team's snapshots in date order, for one season or all of them."""
+        data = self._current(version)
+        if data is None:
+            return None
+        if season_id is None:
+            bounds = [team_id * KEY_SEASON, (team_id + 1) * KEY_SEASON]
+        else:
+            bounds = [team_id * KEY_SEASON + season_id * KEY_DAY, team_id * KEY_SEASON + (season_id + 1) * KEY_DAY]
+        lo, hi = np.searchsorted(data.team_key, np.array(bounds, dtype=np.int64))
+        return self._rows(data, data.team_order[lo:hi], fields)
+
+    def pending_games(self, season_id, after, next_day_only=False, include_final=False):
+        """
+        Unplayed games after a date as [{home, away, date}] (abbrevs), optionally only the next
+        game day. include_final keeps games already played since `after` (not in its standings).
+        """
+        schedule = self._schedule
+        if schedule is None:
+            return None
+        lo, hi = np.searchsorted(schedule["key"], [season_id * KEY_DAY + _days(after) + 1, (season_id + 1) * KEY_DAY])
+        idx = np.arange(lo, hi)
+        if not include_final:
+            idx = idx[~schedule["final"][lo:hi]]
+        if next_day_only and len(idx):
+            idx = idx[schedule["key"][idx] == schedule["key"][idx[0]]]
+        abbrev = lambda team_id: self.teams.get(team_id, {}).get("abbrev")
+        return [
+            {"home": abbrev(h), "away": abbrev(a), "date": d}
+            for h, a, d in zip(schedule["home"][idx].tolist(), schedule["away"][idx].tolist(), schedule["date"][idx].tolist())
+        ]
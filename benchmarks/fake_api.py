@@ -0,0 +1,168 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.synthetic import TEAMS, SyntheticSeason
+from etl.update_history import SEASONS
+from etl.update_live import LIVE_SEASON_ID, SEASON_START
+
+
+class FakeNHLApi:
+    """Local stand-in for api-web.nhle.com serving synthetic /standings/{date}, /standings/now
+    and /schedule/{date} payloads on the real season calendar.
+
+    latency_ms (+ up to jitter_ms) is added to every response; a rate_limit_prob share of
+    requests gets a 429 with a Retry-After of retry_after seconds. Responses carry an ETag
+    and a matching If-None-Match is answered with an empty 304, like the CDN in front of the API.
+    """
+
+    def __init__(self, latency_ms=0, jitter_ms=0, rate_limit_prob=0.0, retry_after=1, seed=0, host="127.0.0.1", port=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_prob = rate_limit_prob
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.seasons = [
+            (int(f"{y}{y + 1}"), start, (end - start).days + 1) for y, start, end in SEASONS
+        ] + [(LIVE_SEASON_ID, SEASON_START, 185)]
+        self.seed = seed
+        self.requests = 0
+        self.throttled = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @lru_cache(maxsize=None)
+    def _season(self, index):
+        season_id, start, n_days = self.seasons[index]
+        return SyntheticSeason(season_id, start, seed=self.seed + index, n_days=n_days)
+
+    @lru_cache(maxsize=4096)
+    def standings_body(self, date_str):
+        """Encoded standings for a date: that day's table in season, empty outside any season."""
+        if date_str == "now":
+            season = self._season(len(self.seasons) - 1)
+            return json.dumps(season.payload(season.n_days - 1)).encode()
+        date = datetime.strptime(date_str, "%Y-%m-%d")
+        for i, (_, start, n_days) in enumerate(self.seasons):
+            if start <= date < start + timedelta(days=n_days):
+                season = self._season(i)
+                return json.dumps(season.payload(season.day_index(date))).encode()
+        return json.dumps({"standings": []}).encode()
+
+    def schedule_body(self, date_str):
+        """A week of random regular-season matchups starting at date_str."""
+        start = datetime.strptime(date_str, "%Y-%m-%d")
+        rng = random.Random(date_str)
+        week = []
+        for d in range(7):
+            day = (start + timedelta(days=d)).strftime("%Y-%m-%d")
+            abbrevs = rng.sample([t[0] for t in TEAMS], 16)
+            games = [{
+                "id": int(day.replace("-", "")) * 100 + g,
+                "gameType": 2,
+                "gameState": "FUT",
+                "startTimeUTC": f"{day}T23:00:00Z",
+                "homeTeam": {"abbrev": abbrevs[2 * g]},
+                "awayTeam": {"abbrev": abbrevs[2 * g + 1]},
+            } for g in range(8)]
+            week.append({"date": day, "games": games})
+        return json.dumps({"gameWeek": week}).encode()
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+            def do_GET(self):
+                with api._lock:
+                    api.requests += 1
+                    throttle = api.rng.random() < api.rate_limit_prob
+                    delay = (api.latency_ms + api.rng.random() * api.jitter_ms) / 1000
+                    if throttle:
+                        api.throttled += 1
+                if delay:
+                    time.sleep(delay)
+                if throttle:
+                    return self._send(429, b'{"message":"Too Many Requests"}', {"Retry-After": str(api.retry_after)})
+
+                parts = self.path.strip("/").split("/")
+                if parts[-2:-1] == ["standings"]:
+                    body = api.standings_body(parts[-1])
+                elif parts[-2:-1] == ["schedule"]:
+                    body = api.schedule_body(parts[-1])
+                else:
+                    return self._send(404, b'{"message":"Not Found"}')
+                etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    with api._lock:
+                        api.not_modified += 1
+                    return self._send(304, b"", {"ETag": etag})
+                self._send(200, body, {"ETag": etag})
+
+            def _send(self, status, body, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve synthetic NHL API payloads locally (point NHL_API_URL at it).")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args()
+
+    api = FakeNHLApi(args.latency_ms, args.jitter_ms, args.rate_limit, args.retry_after, port=args.port)
+    print(f"Fake NHL API on {api.base_url} (latency {args.latency_ms}ms, 429 rate {args.rate_limit:.0%})")
+    try:
+        api._server.serve_forever()
+    except KeyboardInterrupt:
+        api.stop()
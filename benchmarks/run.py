@@ -0,0 +1,307 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import requests
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from benchmarks.fake_api import FakeNHLApi
+from benchmarks.synthetic import TEAMS, standings_frame
+
+# CONFIG
+RESULTS_DIR = os.path.join(current_dir, "results")
+BENCHMARKS = ["etl", "features", "train", "serialize", "api", "async_db"]
+
+
+def _percentiles(latencies_s):
+    ms = np.asarray(latencies_s) * 1000
+    return {f"p{p}_ms": round(float(np.percentile(ms, p)), 2) for p in (50, 95, 99)}
+
+
+def _best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_etl(n_dates=120, workers=8, latency_ms=50, rate_limit_prob=0.02):
+    """Fetch + parse throughput of the concurrent fetcher against the fake API (sequential baseline included)."""
+    from etl.fetcher import Fetcher
+    from etl.writer import standings_rows
+
+    dates = [(datetime(2023, 10, 10) + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(n_dates)]
+    team_ids = {t[0]: i + 1 for i, t in enumerate(TEAMS)}
+    result = {"dates": n_dates, "latency_ms": latency_ms, "rate_limit_prob": rate_limit_prob}
+
+    for label, n_workers in (("sequential", 1), ("concurrent", workers)):
+        with FakeNHLApi(latency_ms=latency_ms, rate_limit_prob=rate_limit_prob, retry_after=1) as api:
+            fetcher = Fetcher(workers=n_workers, rate=1000, burst=n_workers, base_url=api.base_url)
+            start = time.perf_counter()
+            payloads = list(fetcher.fetch_standings(dates))
+            fetch_s = time.perf_counter() - start
+            throttled = api.throttled
+
+        start = time.perf_counter()
+        rows = [r for date_str, data in payloads for r in standings_rows(date_str, 20232024, data, team_ids)]
+        parse_s = time.perf_counter() - start
+        result[label] = {
+            "workers": n_workers,
+            "seconds": round(fetch_s, 3),
+            "requests_per_s": round(n_dates / fetch_s, 1),
+            "throttled": throttled,
+            "rows": len(rows),
+            "parse_rows_per_s": round(len(rows) / parse_s) if parse_s else None,
+        }
+    result["speedup"] = round(result["sequential"]["seconds"] / result["concurrent"]["seconds"], 2)
+    return result
+
+
+def bench_features(n_rows=1_000_000):
+    from models.features import feature_matrix, synthetic_standings
+
+    df = synthetic_standings(n_rows)
+    seconds = _best_of(lambda: feature_matrix(df.copy()))
+    return {"rows": n_rows, "seconds": round(seconds, 4), "rows_per_s": round(n_rows / seconds)}
+
+
+def bench_train(n_seasons=11, budget=60):
+    """Wall time of train_and_compare on synthetic daily standings (dry run: nothing is saved)."""
+    from models.train import train_and_compare
+
+    df = standings_frame(n_seasons)
+    df = df[df["games_played"] > 10].reset_index(drop=True)
+    start = time.perf_counter()
+    train_and_compare(df=df, budget=budget, publish=False)
+    return {"seasons": n_seasons, "rows": len(df), "budget_s": budget, "seconds": round(time.perf_counter() - start, 2)}
+
+
+def bench_serialize(n_days=180):
+    """Response serialization time and body sizes (stdlib vs orjson, records vs columnar, gzip/br)."""
+    from backend.render import benchmark
+
+    return benchmark(n_days)
+
+
+def bench_api(url, concurrency=16, n_requests=2000):
+    """Latency/throughput of GET /api/nhl/standings under concurrent load, plain and with If-None-Match."""
+    endpoint = url.rstrip("/") + "/api/nhl/standings"
+    etag = requests.get(endpoint, timeout=30).headers.get("ETag")
+    result = {"url": endpoint, "concurrency": concurrency, "requests": n_requests}
+
+    for label, headers in (("full", {}), ("conditional", {"If-None-Match": etag} if etag else None)):
+        if headers is None:
+            continue
+        local = threading.local()
+
+        def one(_):
+            # One keep-alive session per client thread
+            session = getattr(local, "session", None) or requests.Session()
+            local.session = session
+            start = time.perf_counter()
+            resp = session.get(endpoint, headers=headers, timeout=30)
+            return time.perf_counter() - start, resp.status_code
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(one, range(n_requests)))
+        elapsed = time.perf_counter() - start
+        latencies = [s[0] for s in samples]
+        statuses = {}
+        for _, status in samples:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        result[label] = dict(_percentiles(latencies), requests_per_s=round(n_requests / elapsed, 1), statuses=statuses)
+    return result
+
+
+def _api_query_cases(cur):
+    """(label, query, params) for every SQL read the API issues, with parameters taken from the database."""
+    from backend.routers import nhl
+
+    cur.execute("SELECT season_id, max(date) FROM daily_standings GROUP BY season_id ORDER BY season_id DESC LIMIT 1")
+    season_id, max_date = cur.fetchone()
+    cur.execute("SELECT model_version FROM daily_predictions GROUP BY 1 ORDER BY count(*) DESC LIMIT 1")
+    version = (cur.fetchone() or [None])[0]
+    cur.execute("SELECT team_id, abbrev, division, conference FROM teams ORDER BY team_id LIMIT 1")
+    team_id, abbrev, division, conference = cur.fetchone()
+    anchor = max_date - timedelta(days=21)
+    def leaders(group_filter=""):
+        return nhl.LEADERS_QUERY.format(fields=nhl.SUMMARY_FIELDS, stat=nhl.LEADER_STATS["points"], group_filter=group_filter)
+    return [
+        ("latest_date", "SELECT max(date) FROM daily_standings WHERE season_id = %s", (season_id,)),
+        ("latest_date_as_of", "SELECT max(date) FROM daily_standings WHERE season_id = %s AND date <= %s", (season_id, anchor)),
+        ("season_for_date", "SELECT season_id FROM daily_standings WHERE date <= %s ORDER BY date DESC LIMIT 1", (max_date,)),
+        ("standings", nhl.STANDINGS_QUERY, (version, season_id, max_date)),
+        ("simulation_teams", nhl.SIMULATION_TEAMS_QUERY, (version, season_id, max_date)),
+        ("remaining_games", nhl.REMAINING_GAMES_QUERY, (season_id, max_date)),
+        ("next_games", nhl.NEXT_GAMES_QUERY, (season_id, season_id, max_date)),
+        ("anchor_games", nhl.ANCHOR_GAMES_QUERY, (season_id, anchor)),
+        ("team_id", "SELECT team_id FROM teams WHERE abbrev = %s", (abbrev,)),
+        ("history", nhl.HISTORY_QUERY.format(season_filter=""), (version, team_id)),
+        ("history_season", nhl.HISTORY_QUERY.format(season_filter="AND ds.season_id = %s"), (version, team_id, season_id)),
+        ("leaders", leaders(), (season_id, 10)),
+        ("leaders_group", leaders("AND (lower(t.conference) = lower(%s) OR lower(t.division) = lower(%s))"),
+         (season_id, division, division, 10)),
+        ("group_level", nhl.GROUP_LEVEL_QUERY, (conference.lower(),)),
+        ("group_teams", nhl.GROUP_TEAMS_QUERY.format(fields=nhl.SUMMARY_FIELDS, level="division"), (season_id, division)),
+        ("group_weekly", nhl.GROUP_WEEKLY_QUERY, ("division", division, season_id)),
+    ]
+
+
+def _normalized(rows):
+    # Both drivers return Decimal for NUMERIC and date for DATE; floats are compared to 9 places
+    return [{k: round(float(v), 9) if isinstance(v, (float, Decimal)) else v for k, v in r.items()} for r in rows]
+
+
+def bench_async_db(repeat=20):
+    """
+    Runs every API read query through the psycopg2 pool and through asyncpg (the opt-in DB_ASYNC
+    path) and checks they return the same rows. Needs asyncpg and a populated database.
+    """
+    import asyncio
+
+    from database import async_db
+    from database.db_utils import close_pool, get_connection, init_pool
+
+    conn = get_connection()
+    try:
+        cases = _api_query_cases(conn.cursor())
+    finally:
+        conn.close()
+
+    async def run():
+        init_pool()
+        await async_db.init_async_pool(enabled=True)
+        result = {"queries": len(cases), "mismatches": [], "errors": {}}
+        try:
+            for label, query, params in cases:
+                try:
+                    sync_rows = await asyncio.to_thread(async_db._fetch_all_sync, query, params)
+                    async_rows = await async_db.fetch_all(query, params)
+                except Exception as e:
+                    result["errors"][label] = f"{type(e).__name__}: {e}"
+                    continue
+                if _normalized(sync_rows) != _normalized(async_rows):
+                    result["mismatches"].append(label)
+                timings = {}
+                for driver, fetch in (("psycopg2", lambda: asyncio.to_thread(async_db._fetch_all_sync, query, params)),
+                                      ("asyncpg", lambda: async_db.fetch_all(query, params))):
+                    start = time.perf_counter()
+                    for _ in range(repeat):
+                        await fetch()
+                    timings[f"{driver}_ms"] = round((time.perf_counter() - start) / repeat * 1000, 3)
+                result[label] = dict(rows=len(sync_rows), **timings)
+        finally:
+            await async_db.close_async_pool()
+            close_pool()
+        return result
+
+    return asyncio.run(run())
+
+
+def _meta():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _flatten(d, prefix=""):
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            out.update(_flatten(v, key + "."))
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[key] = v
+    return out
+
+
+def compare(old_path, new_path):
+    """Prints every numeric metric side by side with its relative change."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    a, b = _flatten(old["benchmarks"]), _flatten(new["benchmarks"])
+    print(f"{'Metric':<45} | {old['meta'].get('git_commit') or 'old':>12} | {new['meta'].get('git_commit') or 'new':>12} | Change")
+    print("-" * 85)
+    for key in sorted(set(a) & set(b)):
+        change = f"{(b[key] - a[key]) / a[key]:+.1%}" if a[key] else "n/a"
+        print(f"{key:<45} | {a[key]:>12} | {b[key]:>12} | {change}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repeatable performance benchmarks; results are written as JSON.")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"Comma-separated subset of {BENCHMARKS}")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes for a fast smoke run")
+    parser.add_argument("--api-url", default=None, help="Running backend to load-test, e.g. http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", default=None, help="Results file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two results files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        sys.exit(0)
+
+    selected = [b.strip() for b in args.only.split(",") if b.strip()]
+    results = {"meta": _meta(), "benchmarks": {}}
+    for name in selected:
+        print(f"--- Benchmark: {name} ---")
+        if name == "etl":
+            out = bench_etl(n_dates=40 if args.quick else 120)
+        elif name == "features":
+            out = bench_features(100_000 if args.quick else 1_000_000)
+        elif name == "train":
+            out = bench_train(n_seasons=3 if args.quick else 11, budget=10 if args.quick else 60)
+        elif name == "serialize":
+            out = bench_serialize(n_days=30 if args.quick else 180)
+        elif name == "api":
+            if not args.api_url:
+                print("  Skipped: pass --api-url (the backend needs a populated database, see benchmarks/synthetic.py --load-db)")
+                continue
+            out = bench_api(args.api_url, args.concurrency, 200 if args.quick else 2000)
+        elif name == "async_db":
+            from database.async_db import ASYNCPG_AVAILABLE
+            if not ASYNCPG_AVAILABLE:
+                print("  Skipped: asyncpg is not installed (pip install asyncpg)")
+                continue
+            out = bench_async_db(repeat=5 if args.quick else 20)
+            if out["mismatches"] or out["errors"]:
+                print(f"  asyncpg differs from psycopg2: {out['mismatches']} {out['errors']}")
+        else:
+            print(f"  Unknown benchmark '{name}'")
+            continue
+        results["benchmarks"][name] = out
+        print(json.dumps(out, indent=2))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{results['meta']['git_commit'] or 'local'}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
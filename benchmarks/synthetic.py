@@ -0,0 +1,231 @@
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+# CONFIG
+SEASON_DAYS = 185           # Regular season length in days
+GAMES_PER_TEAM = 82
+OT_RATE = 0.23
+PLAYOFF_SPOTS = 8           # Per conference
+
+# Current league alignment: (abbrev, name, conference, division)
+TEAMS = [
+    ("BOS", "Boston Bruins", "Eastern", "Atlantic"), ("BUF", "Buffalo Sabres", "Eastern", "Atlantic"),
+    ("DET", "Detroit Red Wings", "Eastern", "Atlantic"), ("FLA", "Florida Panthers", "Eastern", "Atlantic"),
+    ("MTL", "Montréal Canadiens", "Eastern", "Atlantic"), ("OTT", "Ottawa Senators", "Eastern", "Atlantic"),
+    ("TBL", "Tampa Bay Lightning", "Eastern", "Atlantic"), ("TOR", "Toronto Maple Leafs", "Eastern", "Atlantic"),
+    ("CAR", "Carolina Hurricanes", "Eastern", "Metropolitan"), ("CBJ", "Columbus Blue Jackets", "Eastern", "Metropolitan"),
+    ("NJD", "New Jersey Devils", "Eastern", "Metropolitan"), ("NYI", "New York Islanders", "Eastern", "Metropolitan"),
+    ("NYR", "New York Rangers", "Eastern", "Metropolitan"), ("PHI", "Philadelphia Flyers", "Eastern", "Metropolitan"),
+    ("PIT", "Pittsburgh Penguins", "Eastern", "Metropolitan"), ("WSH", "Washington Capitals", "Eastern", "Metropolitan"),
+    ("CHI", "Chicago Blackhawks", "Western", "Central"), ("COL", "Colorado Avalanche", "Western", "Central"),
+    ("DAL", "Dallas Stars", "Western", "Central"), ("MIN", "Minnesota Wild", "Western", "Central"),
+    ("NSH", "Nashville Predators", "Western", "Central"), ("STL", "St. Louis Blues", "Western", "Central"),
+    ("UTA", "Utah Hockey Club", "Western", "Central"), ("WPG", "Winnipeg Jets", "Western", "Central"),
+    ("ANA", "Anaheim Ducks", "Western", "Pacific"), ("CGY", "Calgary Flames", "Western", "Pacific"),
+    ("EDM", "Edmonton Oilers", "Western", "Pacific"), ("LAK", "Los Angeles Kings", "Western", "Pacific"),
+    ("SEA", "Seattle Kraken", "Western", "Pacific"), ("SJS", "San Jose Sharks", "Western", "Pacific"),
+    ("VAN", "Vancouver Canucks", "Western", "Pacific"), ("VGK", "Vegas Golden Knights", "Western", "Pacific"),
+]
+N_TEAMS = len(TEAMS)
+
+
+class SyntheticSeason:
+    """One simulated regular season as (days x teams) arrays of cumulative standings stats."""
+
+    def __init__(self, season_id, start_date, seed=0, n_days=SEASON_DAYS):
+        rng = np.random.default_rng(seed)
+        self.season_id = season_id
+        self.start_date = start_date
+        self.n_days = n_days
+        strength = rng.normal(0, 0.35, N_TEAMS)
+
+        shape = (n_days, N_TEAMS)
+        self.gp, self.wins, self.losses, self.ot_losses = (np.zeros(shape, dtype=np.int32) for _ in range(4))
+        self.goals_for, self.goals_against, self.l10 = (np.zeros(shape, dtype=np.int32) for _ in range(3))
+        self.streak_code = np.full(shape, "N", dtype="<U2")
+        self.streak_count = np.zeros(shape, dtype=np.int32)
+
+        gp = np.zeros(N_TEAMS, dtype=np.int32)
+        w, l, otl, gf, ga = (np.zeros(N_TEAMS, dtype=np.int32) for _ in range(5))
+        recent = [[] for _ in range(N_TEAMS)]          # last 10 game point totals
+        s_code = np.full(N_TEAMS, "N", dtype="<U2")
+        s_count = np.zeros(N_TEAMS, dtype=np.int32)
+        play_rate = GAMES_PER_TEAM / n_days
+
+        for day in range(n_days):
+            # Each day a random subset of teams (still under 82 games) is paired off
+            playing = np.flatnonzero((gp < GAMES_PER_TEAM) & (rng.random(N_TEAMS) < play_rate))
+            playing = rng.permutation(playing)[: len(playing) // 2 * 2].reshape(-1, 2)
+            for home, away in playing:
+                p_home = 1 / (1 + np.exp(-(strength[home] - strength[away] + 0.15)))
+                winner, loser = (home, away) if rng.random() < p_home else (away, home)
+                overtime = rng.random() < OT_RATE
+                loser_goals = rng.poisson(2.3)
+                winner_goals = loser_goals + (1 if overtime else 1 + rng.poisson(1.0))
+
+                w[winner] += 1
+                gf[winner] += winner_goals
+                ga[winner] += loser_goals
+                gf[loser] += loser_goals
+                ga[loser] += winner_goals
+                if overtime:
+                    otl[loser] += 1
+                else:
+                    l[loser] += 1
+                gp[home] += 1
+                gp[away] += 1
+                recent[winner] = (recent[winner] + [2])[-10:]
+                recent[loser] = (recent[loser] + [1 if overtime else 0])[-10:]
+                for team, code in ((winner, "W"), (loser, "OT" if overtime else "L")):
+                    s_count[team] = s_count[team] + 1 if s_code[team] == code else 1
+                    s_code[team] = code
+
+            self.gp[day], self.wins[day], self.losses[day], self.ot_losses[day] = gp, w, l, otl
+            self.goals_for[day], self.goals_against[day] = gf, ga
+            self.l10[day] = [sum(r) for r in recent]
+            self.streak_code[day], self.streak_count[day] = s_code, s_count
+
+        self.points = 2 * self.wins + self.ot_losses
+        final = self.points[-1] * 1000 + self.wins[-1]
+        self.made_playoffs = np.zeros(N_TEAMS, dtype=bool)
+        for conference in ("Eastern", "Western"):
+            idx = np.array([i for i, t in enumerate(TEAMS) if t[2] == conference])
+            self.made_playoffs[idx[np.argsort(-final[idx])[:PLAYOFF_SPOTS]]] = True
+
+    @property
+    def end_date(self):
+        return self.start_date + timedelta(days=self.n_days - 1)
+
+    def date(self, day):
+        return (self.start_date + timedelta(days=day)).strftime("%Y-%m-%d")
+
+    def day_index(self, date):
+        """Day of the season for a datetime, or None outside the season."""
+        day = (date - self.start_date).days
+        return day if 0 <= day < self.n_days else None
+
+    def payload(self, day):
+        """An api-web.nhle.com style /standings/{date} response for one day."""
+        final_day = day == self.n_days - 1
+        standings = []
+        for i, (abbrev, name, conference, division) in enumerate(TEAMS):
+            entry = {
+                "teamAbbrev": {"default": abbrev},
+                "teamName": {"default": name},
+                "teamLogo": f"https://assets.nhle.com/logos/nhl/svg/{abbrev}_light.svg",
+                "conferenceName": conference,
+                "divisionName": division,
+                "gamesPlayed": int(self.gp[day, i]),
+                "wins": int(self.wins[day, i]),
+                "losses": int(self.losses[day, i]),
+                "otLosses": int(self.ot_losses[day, i]),
+                "points": int(self.points[day, i]),
+                "goalFor": int(self.goals_for[day, i]),
+                "goalAgainst": int(self.goals_against[day, i]),
+                "l10Pts": int(self.l10[day, i]),
+                "streak": {"code": str(self.streak_code[day, i]), "count": int(self.streak_count[day, i])},
+            }
+            if final_day and self.made_playoffs[i]:
+                entry["clinchIndicator"] = "x"
+            standings.append(entry)
+        standings.sort(key=lambda t: -t["points"])
+        return {"standings": standings}
+
+    def frame(self):
+        """daily_standings-shaped DataFrame (abbrev instead of team_id) plus the made_playoffs label."""
+        teams = np.tile(np.arange(N_TEAMS), self.n_days)
+        return pd.DataFrame({
+            "date": np.repeat([self.date(d) for d in range(self.n_days)], N_TEAMS),
+            "season_id": self.season_id,
+            "abbrev": np.array([t[0] for t in TEAMS])[teams],
+            "games_played": self.gp.ravel(),
+            "wins": self.wins.ravel(),
+            "losses": self.losses.ravel(),
+            "ot_losses": self.ot_losses.ravel(),
+            "points": self.points.ravel(),
+            "goals_for": self.goals_for.ravel(),
+            "goals_against": self.goals_against.ravel(),
+            "l10_points": self.l10.ravel(),
+            "streak_code": self.streak_code.ravel(),
+            "streak_count": self.streak_count.ravel(),
+            "made_playoffs": self.made_playoffs[teams],
+        })
+
+
+def make_seasons(n_seasons, last_start_year=2024, seed=0):
+    """n_seasons consecutive synthetic seasons ending with the one that starts in last_start_year."""
+    seasons = []
+    for k in range(n_seasons):
+        year = last_start_year - n_seasons + 1 + k
+        seasons.append(SyntheticSeason(int(f"{year}{year + 1}"), datetime(year, 10, 8), seed=seed + k))
+    return seasons
+
+
+def standings_frame(n_seasons, seed=0):
+    """Daily-granularity training frame for n_seasons (~5,900 rows per season)."""
+    return pd.concat([s.frame() for s in make_seasons(n_seasons, seed=seed)], ignore_index=True)
+
+
+def load_into_db(conn, seasons):
+    """Writes teams, daily_standings and season_outcomes for the synthetic seasons."""
+    from etl.writer import load_team_ids, standings_rows, write_standings, outcome_rows, write_outcomes
+
+    cur = conn.cursor()
+    for abbrev, name, conference, division in TEAMS:
+        cur.execute(
+            """
+            INSERT INTO teams (abbrev, name, logo_url, conference, division)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (abbrev) DO NOTHING;
+            """,
+            (abbrev, name, f"https://assets.nhle.com/logos/nhl/svg/{abbrev}_light.svg", conference, division),
+        )
+    team_ids = load_team_ids(cur)
+    total = 0
+    for season in seasons:
+        rows = []
+        for day in range(season.n_days):
+            rows.extend(standings_rows(season.date(day), season.season_id, season.payload(day)["standings"], team_ids))
+        total += write_standings(cur, rows, update=True)
+        final = season.payload(season.n_days - 1)["standings"]
+        write_outcomes(cur, outcome_rows(season.season_id, final, team_ids))
+        conn.commit()
+        print(f"  Loaded {season.season_id}: {len(rows)} rows")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic daily standings for benchmarks.")
+    parser.add_argument("--seasons", type=int, default=11)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", default=None, help="Write the frame to this CSV file")
+    parser.add_argument("--load-db", action="store_true",
+                        help="Insert into the database from .env (use a scratch DB_NAME: rows are upserted)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seasons = make_seasons(args.seasons, seed=args.seed)
+    print(f"Simulated {args.seasons} seasons in {time.perf_counter() - start:.1f}s")
+
+    if args.csv:
+        df = pd.concat([s.frame() for s in seasons], ignore_index=True)
+        df.to_csv(args.csv, index=False)
+        print(f"Wrote {len(df)} rows to {args.csv}")
+    if args.load_db:
+        from database.db_utils import get_connection
+        conn = get_connection()
+        try:
+            print(f"Loaded {load_into_db(conn, seasons)} rows.")
+        finally:
+            conn.close()
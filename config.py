@@ -14,4 +14,11 @@ DB_CONFIG = {
     "password": DB_PASSWORD
 }
 
-API_URL = "https://api-web.nhle.com/v1"
\ No newline at end of file
+# Connection pool used by the API
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+# Opt-in: use asyncpg for the API's read path (needs asyncpg; check with benchmarks/run.py --only async_db)
+DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+
+# Override to point the ETL at a mirror or the local fake API (benchmarks/fake_api.py)
+API_URL = os.getenv("NHL_API_URL", "https://api-web.nhle.com/v1")
\ No newline at end of file
@@ -0,0 +1,96 @@
+from starlette.concurrency import run_in_threadpool
+
+from config import DB_CONFIG, DB_POOL_MIN, DB_POOL_MAX, DB_ASYNC
+from database.db_utils import pooled_connection
+
+# asyncpg is optional: without it, queries run on the psycopg2 pool in a worker thread
+try:
+    import asyncpg
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    ASYNCPG_AVAILABLE = False
+
+_async_pool = None
+
+
+async def init_async_pool(minconn=DB_POOL_MIN, maxconn=DB_POOL_MAX, enabled=DB_ASYNC):
+    """Opens the asyncpg pool if the driver is installed and enabled (DB_ASYNC=1, off by default)."""
+    global _async_pool
+    if _async_pool is None and ASYNCPG_AVAILABLE and enabled:
+        _async_pool = await asyncpg.create_pool(
+            database=DB_CONFIG["dbname"],
+            user=DB_CONFIG["user"],
+            password=DB_CONFIG["password"],
+            min_size=minconn,
+            max_size=maxconn,
+        )
+        print(f"Async DB pool ready (min={minconn}, max={maxconn})")
+    return _async_pool
+
+
+async def close_async_pool():
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+
+
+def _to_asyncpg(query):
+    """
+    Rewrites psycopg2-style %s placeholders as asyncpg's $1, $2, ... and %% as %. A %s inside
+    quoted literals, quoted identifiers or -- comments is not a placeholder and is kept as-is.
+    """
+    out, n, i = [], 0, 0
+    while i < len(query):
+        c = query[i]
+        if c in "'\"":
+            # A doubled quote inside a literal is an escaped quote, so scanning on to the next one is enough
+            end = query.find(c, i + 1)
+            end = len(query) if end < 0 else end + 1
+            out.append(query[i:end].replace("%%", "%"))
+            i = end
+        elif query.startswith("--", i):
+            end = query.find("\n", i)
+            end = len(query) if end < 0 else end
+            out.append(query[i:end])
+            i = end
+        elif query.startswith("%s", i):
+            n += 1
+            out.append(f"${n}")
+            i += 2
+        elif query.startswith("%%", i):
+            out.append("%")
+            i += 2
+        elif c == "%":
+            raise ValueError(f"Unsupported placeholder at offset {i}: only %s and %% work with asyncpg")
+        else:
+            out.append(c)
+            i += 1
+    return "".join(out)
+
+
+def _fetch_all_sync(query, params):
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+            columns = [c.name for c in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+async def fetch_all(query, params=()):
+    """
+    Runs a read query (psycopg2 %s style) without blocking the event loop. Returns a list of dicts.
+    Pass typed parameters (date, not '2025-01-31'): asyncpg does not coerce strings like psycopg2.
+    """
+    if _async_pool is not None:
+        records = await _async_pool.fetch(_to_asyncpg(query), *params)
+        return [dict(r) for r in records]
+    return await run_in_threadpool(_fetch_all_sync, query, params)
+
+
+async def fetch_val(query, params=()):
+    """Runs a query and returns the first column of the first row (or None)."""
+    rows = await fetch_all(query, params)
+    if not rows:
+        return None
+    return next(iter(rows[0].values()))
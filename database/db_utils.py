@@ -1,9 +1,110 @@
+import threading
+import time
+from contextlib import contextmanager
+
 import psycopg2
-from config import DB_CONFIG
+from psycopg2 import extensions
+from psycopg2.pool import ThreadedConnectionPool
+from config import DB_CONFIG, DB_POOL_MIN, DB_POOL_MAX
+
+# Channel the ETL NOTIFYs after committing new standings; the API LISTENs on it
+STANDINGS_CHANNEL = "standings_updated"
+
+# Connections idle longer than this are pinged before being handed out
+HEALTH_CHECK_IDLE_SECONDS = 30
+
+_pool = None
+_pool_slots = None     # Makes getconn() block instead of raising when the pool is exhausted
+_last_used = {}        # id(conn) -> monotonic time it was returned to the pool
 
 def get_connection():
     return psycopg2.connect(**DB_CONFIG)
 
+def init_pool(minconn=DB_POOL_MIN, maxconn=DB_POOL_MAX):
+    """Opens the shared connection pool (called from the API's startup hook)."""
+    global _pool, _pool_slots
+    if _pool is None:
+        _pool = ThreadedConnectionPool(minconn, maxconn, **DB_CONFIG)
+        _pool_slots = threading.BoundedSemaphore(maxconn)
+        print(f"DB pool ready (min={minconn}, max={maxconn})")
+    return _pool
+
+def close_pool():
+    """Closes every pooled connection (called from the API's shutdown hook)."""
+    global _pool, _pool_slots
+    if _pool is not None:
+        _pool.closeall()
+        _pool = None
+        _pool_slots = None
+        _last_used.clear()
+
+def _is_healthy(conn):
+    if conn.closed:
+        return False
+    if time.monotonic() - _last_used.get(id(conn), 0) < HEALTH_CHECK_IDLE_SECONDS:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+def _discard(pool, conn):
+    # Forget its idle time too: a later connection may reuse the same id()
+    _last_used.pop(id(conn), None)
+    pool.putconn(conn, close=True)
+
+@contextmanager
+def pooled_connection():
+    """Borrows a healthy connection from the pool, or opens a one-off one if no pool is running."""
+    if _pool is None:
+        conn = get_connection()
+        try:
+            yield conn
+        finally:
+            conn.close()
+        return
+
+    pool, slots = _pool, _pool_slots
+    slots.acquire()
+    try:
+        conn = pool.getconn()
+        # After a server restart every idle connection is dead: drop them until one answers
+        # or the pool opens a fresh one (getconn raises if the server is still down)
+        while not _is_healthy(conn):
+            _discard(pool, conn)
+            conn = pool.getconn()
+    except Exception:
+        slots.release()
+        raise
+    try:
+        yield conn
+    except psycopg2.Error:
+        # Broken connections are discarded rather than returned to the pool
+        if conn.closed:
+            _discard(pool, conn)
+            conn = None
+        raise
+    finally:
+        if conn is not None:
+            if not conn.closed and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    conn.close()
+            if conn.closed:
+                _discard(pool, conn)
+            else:
+                _last_used[id(conn)] = time.monotonic()
+                pool.putconn(conn)
+        slots.release()
+
+def notify_standings_updated(cur, payload=""):
+    """Queues a NOTIFY that Postgres delivers to listeners when the transaction commits."""
+    cur.execute("SELECT pg_notify(%s, %s);", (STANDINGS_CHANNEL, str(payload)))
+
 def execute_sql_file(filename):
     """Reads and executes a .sql file (like schema.sql)"""
     conn = get_connection()
@@ -0,0 +1,14 @@
+-- Trend features per standings snapshot, maintained by the ETL (models/feature_store.py).
+-- Safe to drop at any time: `python -m models.feature_store --rebuild` recreates and refills it.
+DROP TABLE IF EXISTS daily_features;
+
+CREATE TABLE daily_features (
+    date DATE,
+    season_id INT,
+    team_id INT,
+    gd_trend DOUBLE PRECISION,          -- Goal differential per game over the trailing window
+    form_delta DOUBLE PRECISION,        -- Points % over the trailing window minus season points %
+    pace_vs_cutline DOUBLE PRECISION,   -- 82-game points pace above/below the conference's last playoff spot
+    computed_at TIMESTAMP DEFAULT now(),
+    PRIMARY KEY (date, team_id)
+);
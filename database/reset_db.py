@@ -4,3 +4,5 @@ if __name__ == "__main__":
     print("--- RESETTING DATABASE ---")
     print("Warning: This deletes all existing data.")
     execute_sql_file("database/schema.sql")
+    execute_sql_file("database/rollups.sql")
+    execute_sql_file("database/feature_store.sql")
@@ -0,0 +1,42 @@
+-- Rollups derived from daily_standings, maintained by the ETL (etl/rollups.py).
+-- Safe to drop at any time: `python -m etl.rollups --rebuild` recreates and refills them.
+DROP TABLE IF EXISTS team_season_summary;
+DROP TABLE IF EXISTS group_weekly;
+
+-- One row per team per season, built from its latest snapshot
+CREATE TABLE team_season_summary (
+    season_id INT,
+    team_id INT,
+    as_of DATE,                         -- Snapshot the row was built from
+    games_played INT,
+    wins INT,
+    losses INT,
+    ot_losses INT,
+    points INT,
+    goals_for INT,
+    goals_against INT,
+    goal_diff INT,
+    points_pct DOUBLE PRECISION,        -- points / (2 * games_played)
+    pace_points DOUBLE PRECISION,       -- Projected season points at the season-to-date points per game
+    l10_pace_points DOUBLE PRECISION,   -- Projected season points at the last-10 points per game
+    max_win_streak INT,                 -- Longest win streak seen in the season's snapshots
+    prev_points_pct DOUBLE PRECISION,   -- points_pct at the end of the previous season
+    PRIMARY KEY (season_id, team_id)
+);
+
+-- Division and conference totals, from the last snapshot of each week
+CREATE TABLE group_weekly (
+    level VARCHAR(10),                  -- 'division' or 'conference'
+    name VARCHAR(50),
+    season_id INT,
+    week DATE,                          -- Monday of the week
+    as_of DATE,
+    teams INT,
+    games_played INT,
+    points INT,
+    goal_diff INT,
+    points_pct DOUBLE PRECISION,
+    leader_team_id INT,
+    leader_points INT,
+    PRIMARY KEY (level, name, season_id, week)
+);
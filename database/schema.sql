@@ -1,3 +1,6 @@
+DROP TABLE IF EXISTS schedule;
+DROP TABLE IF EXISTS daily_predictions;
+DROP TABLE IF EXISTS ingest_log;
 DROP TABLE IF EXISTS daily_standings;
 DROP TABLE IF EXISTS season_outcomes;
 DROP TABLE IF EXISTS teams;
@@ -36,4 +39,37 @@ CREATE TABLE daily_standings (
     streak_code VARCHAR(5),     -- 'W', 'L', 'OT'
     streak_count INT DEFAULT 0,
     UNIQUE(date, team_id)       -- One record per team per day
-);
\ No newline at end of file
+);
+
+-- Latest/point-in-time snapshot lookups: max(date) WHERE season_id = ... [AND date <= ...]
+CREATE INDEX idx_daily_standings_season_date ON daily_standings (season_id, date);
+-- Per-team time series: WHERE team_id = ... AND season_id = ... ORDER BY date
+CREATE INDEX idx_daily_standings_team_season_date ON daily_standings (team_id, season_id, date);
+
+CREATE TABLE ingest_log (
+    date DATE PRIMARY KEY,
+    season_id INT,
+    payload_hash CHAR(64),      -- sha256 of the normalized /standings/{date} payload
+    ingested_at TIMESTAMP DEFAULT now()
+);
+
+-- Playoff probabilities scored at ingestion time, one row per snapshot per model
+CREATE TABLE daily_predictions (
+    date DATE,
+    season_id INT,
+    team_id INT REFERENCES teams(team_id),
+    model_version VARCHAR(64),  -- Content hash of the model artifact
+    playoff_prob DOUBLE PRECISION,
+    created_at TIMESTAMP DEFAULT now(),
+    PRIMARY KEY (date, team_id, model_version)
+);
+
+-- Regular-season schedule, used to simulate the remaining games
+CREATE TABLE schedule (
+    game_id BIGINT PRIMARY KEY,     -- Official NHL game ID
+    season_id INT,
+    date DATE,
+    home_team_id INT REFERENCES teams(team_id),
+    away_team_id INT REFERENCES teams(team_id),
+    game_state VARCHAR(10)          -- 'FUT', 'PRE', 'LIVE', 'OFF', 'FINAL'
+);
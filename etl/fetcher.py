@@ -0,0 +1,239 @@
+import email.utils
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import API_URL
+from metrics import FETCH_LATENCY, FETCH_THROTTLED
+
+# CONFIG
+HEADERS = {
+    "User-Agent": "SportsDashboard/1.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
+}
+
+DEFAULT_WORKERS = 8
+DEFAULT_RATE = 10.0      # Requests per second shared by all workers
+DEFAULT_BURST = 10
+MIN_RATE = 0.5
+MAX_RETRIES = 5
+
+
+class TokenBucket:
+    """Thread-safe token bucket with AIMD rate adaptation.
+
+    Every worker calls acquire() before a request. A 429 halves the refill
+    rate (once per pause window, however many workers hit it) and pauses the
+    whole bucket; each success creeps the rate back up towards the configured
+    ceiling.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=DEFAULT_BURST):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def backoff(self, delay):
+        """Called on 429: pause everyone for `delay` seconds and halve the rate."""
+        with self.lock:
+            now = time.monotonic()
+            # Other workers' 429s from the same burst only extend the pause
+            if now >= self.paused_until:
+                self.rate = max(MIN_RATE, self.rate / 2)
+            self.paused_until = max(self.paused_until, now + delay)
+            self.tokens = 0
+
+    def success(self):
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + 0.1)
+
+
+def parse_retry_after(value):
+    """Retry-After may be delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+        return max(0.0, when.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class Fetcher:
+    """Bounded thread pool that routes every request through one TokenBucket.
+
+    With a RawCache, JSON bodies are written through to disk; immutable entries are served from
+    it without touching the network, and offline=True serves everything from it (replay mode).
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                 max_retries=MAX_RETRIES, timeout=10, base_url=API_URL, cache=None, offline=False):
+        if offline and cache is None:
+            raise ValueError("offline mode needs a RawCache to replay from")
+        self.cache = cache
+        self.offline = offline
+        self.workers = workers
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.base_url = base_url.rstrip("/")
+        self._local = threading.local()
+        self._validators = {}   # path -> (etag, last_modified, body) of the last 200, for get_if_changed()
+        self._validators_lock = threading.Lock()
+
+    def _session(self):
+        # requests.Session is not thread-safe, so each worker keeps its own keep-alive session
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._local.session = session
+        return session
+
+    def get(self, path, headers=None):
+        """GET {base_url}/{path}, retrying 429s and transient errors. Returns the Response or None."""
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        endpoint = path.lstrip('/').split('/')[0]
+        for attempt in range(self.max_retries):
+            self.bucket.acquire()
+            start = time.perf_counter()
+            try:
+                resp = self._session().get(url, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                FETCH_LATENCY.observe(time.perf_counter() - start, endpoint, "error")
+                print(f"  Request error on {path} (attempt {attempt + 1}): {e}")
+                time.sleep(min(2 ** attempt, 30))
+                continue
+            FETCH_LATENCY.observe(time.perf_counter() - start, endpoint, str(resp.status_code))
+
+            if resp.status_code == 429:
+                FETCH_THROTTLED.inc(endpoint)
+                delay = parse_retry_after(resp.headers.get("Retry-After"))
+                if delay is None:
+                    delay = min(2 ** attempt, 30)
+                print(f"  Hit Rate Limit (429) on {path}. Backing off {delay:.1f}s...")
+                self.bucket.backoff(delay)
+                continue
+            if resp.status_code >= 500:
+                time.sleep(min(2 ** attempt, 30))
+                continue
+
+            self.bucket.success()
+            return resp
+        print(f"  Giving up on {path} after {self.max_retries} attempts.")
+        return None
+
+    def get_json(self, path, immutable=False):
+        """Returns the decoded JSON body for a 200 response, otherwise None.
+
+        immutable=True marks the payload as final (finished season): once cached it is never re-fetched.
+        """
+        if self.cache is not None:
+            body, cached_immutable = self.cache.lookup(path)
+            if body is not None and (cached_immutable or self.offline):
+                return json.loads(body)
+            if self.offline:
+                print(f"  Not in the response cache: {path}")
+                return None
+
+        resp = self.get(path)
+        if resp is None or resp.status_code != 200:
+            return None
+        try:
+            data = resp.json()
+        except ValueError:
+            return None
+        if self.cache is not None:
+            self.cache.put(path, resp.content, immutable)
+        return data
+
+    def get_if_changed(self, path):
+        """Conditional GET for repeatedly polled paths. Returns (json_or_None, changed).
+
+        Sends If-None-Match / If-Modified-Since from the previous response, so an unchanged
+        payload costs an empty 304. Servers that ignore validators are caught by comparing bodies.
+        """
+        with self._validators_lock:
+            previous = self._validators.get(path)
+        headers = {}
+        if previous is not None:
+            etag, last_modified, _ = previous
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        resp = self.get(path, headers)
+        if resp is None:
+            return None, False
+        if resp.status_code == 304 and previous is not None:
+            return json.loads(previous[2]), False
+        if resp.status_code != 200:
+            return None, False
+        try:
+            data = resp.json()
+        except ValueError:
+            return None, False
+        changed = previous is None or resp.content != previous[2]
+        with self._validators_lock:
+            self._validators[path] = (resp.headers.get("ETag"), resp.headers.get("Last-Modified"), resp.content)
+        if changed and self.cache is not None:
+            self.cache.put(path, resp.content)
+        return data, changed
+
+    def fetch_many(self, paths, immutable=False):
+        """Fetches paths concurrently, yielding (path, json_or_None) in input order."""
+        paths = list(paths)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            yield from zip(paths, pool.map(lambda p: self.get_json(p, immutable), paths))
+
+    def fetch_standings(self, date_strs, immutable=False):
+        """Yields (date_str, standings_list) for each date, in input order."""
+        paths = [f"standings/{d}" for d in date_strs]
+        for date_str, (_, data) in zip(date_strs, self.fetch_many(paths, immutable)):
+            yield date_str, (data or {}).get("standings", [])
+
+
+def date_range(start, end, step_days=7):
+    """Dates from start to end inclusive as YYYY-MM-DD strings."""
+    dates = []
+    current = start
+    while current <= end:
+        dates.append(current.strftime("%Y-%m-%d"))
+        current += timedelta(days=step_days)
+    return dates
+
@@ -0,0 +1,97 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+
+# CONFIG
+CACHE_DIR = os.getenv("RAW_CACHE_DIR", os.path.join(project_root, "data", "raw_cache"))
+COMPRESS_LEVEL = 6
+
+
+class RawCache:
+    """Content-addressed store of raw API response bodies.
+
+    Bodies are gzipped under objects/<sha[:2]>/<sha>.json.gz, so identical payloads (e.g. the
+    same off-season standings served for many dates) are stored once. A small SQLite index maps
+    each request path (endpoint + date, e.g. "standings/2024-01-15") to its latest body and
+    records whether it is immutable (a finished season that will never change upstream).
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                path TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                immutable INTEGER NOT NULL DEFAULT 0,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._db.commit()
+
+    def _object_path(self, digest):
+        return os.path.join(self.cache_dir, "objects", digest[:2], f"{digest}.json.gz")
+
+    def lookup(self, path):
+        """Returns (body_bytes, immutable) for a cached path, or (None, False)."""
+        with self._lock:
+            row = self._db.execute("SELECT sha256, immutable FROM responses WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return None, False
+        try:
+            with gzip.open(self._object_path(row[0]), "rb") as f:
+                return f.read(), bool(row[1])
+        except OSError:
+            return None, False
+
+    def put(self, path, body, immutable=False):
+        """Stores a response body; re-storing an identical payload only touches the index."""
+        digest = hashlib.sha256(body).hexdigest()
+        obj = self._object_path(digest)
+        if not os.path.exists(obj):
+            os.makedirs(os.path.dirname(obj), exist_ok=True)
+            tmp = f"{obj}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp, "wb", compresslevel=COMPRESS_LEVEL) as f:
+                f.write(body)
+            os.replace(tmp, obj)
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT INTO responses (path, sha256, immutable, fetched_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (path) DO UPDATE SET
+                    sha256 = excluded.sha256,
+                    immutable = max(responses.immutable, excluded.immutable),
+                    fetched_at = excluded.fetched_at
+                """,
+                (path, digest, int(immutable), time.time()),
+            )
+            self._db.commit()
+        return digest
+
+    def paths(self, prefix=""):
+        """Cached request paths starting with prefix, sorted (dates sort chronologically)."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path FROM responses WHERE path >= ? AND path < ? ORDER BY path",
+                (prefix, prefix + "\uffff"),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def stats(self):
+        with self._lock:
+            entries, immutable, objects = self._db.execute(
+                "SELECT count(*), coalesce(sum(immutable), 0), count(DISTINCT sha256) FROM responses"
+            ).fetchone()
+        return {"entries": entries, "immutable": immutable, "objects": objects}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,113 @@
+import sys
+import os
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from database.db_utils import get_connection, notify_standings_updated
+from etl.raw_cache import RawCache
+from etl.rollups import refresh_rollups
+from metrics import report_etl
+from etl.update_history import SEASONS
+from etl.update_live import LIVE_SEASON_ID, SEASON_START
+from etl.writer import (
+    load_team_ids, standings_rows, write_standings, outcome_rows, write_outcomes,
+    payload_hash, write_ingest_log, ALL_COLUMNS
+)
+from models.feature_store import refresh_features
+from models.predictions import refresh_predictions
+
+PREFIX = "standings/"
+
+
+def season_ranges():
+    """(season_id, first date, last date, is_finished) for every season the ETL knows about."""
+    ranges = [(int(f"{y}{y + 1}"), start, end, True) for y, start, end in SEASONS]
+    ranges.append((LIVE_SEASON_ID, SEASON_START, datetime.now(), False))
+    return ranges
+
+
+def cached_standings(cache, paths):
+    """Yields (date_str, standings_list) for cached standings paths."""
+    for path in paths:
+        body, _ = cache.lookup(path)
+        if body is not None:
+            yield path[len(PREFIX):], json.loads(body).get("standings", [])
+
+
+def replay(cache=None, seasons=None):
+    """Rebuilds daily_standings and season_outcomes from the raw response cache. No network access.
+
+    Every cached snapshot is re-parsed and upserted, so a parser change is applied to all of them.
+    """
+    cache = cache or RawCache()
+    started = time.perf_counter()
+    conn = get_connection()
+    cur = conn.cursor()
+    team_ids = load_team_ids(cur)
+    all_paths = cache.paths(PREFIX)
+    print(f"--- Replaying {len(all_paths)} cached standings responses ---")
+
+    total = 0
+    for season_id, start, end, finished in season_ranges():
+        if seasons and season_id not in seasons:
+            continue
+        first, last = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+        paths = [p for p in all_paths if first <= p[len(PREFIX):] <= last]
+        if not paths:
+            continue
+
+        rows = []
+        payloads = {}
+        for date_str, data in cached_standings(cache, paths):
+            if data:
+                payloads[date_str] = data
+                rows.extend(standings_rows(date_str, season_id, data, team_ids))
+
+        try:
+            # Full-row upsert: a parser fix may change any column, not just the live ones
+            written = write_standings(cur, rows, update=ALL_COLUMNS)
+            refresh_rollups(cur, season_id)
+            refresh_features(cur, season_id)
+            if finished:
+                # Same rule as update_history: final standings from the last day of the season, or 1-2 days before
+                for offset in range(3):
+                    data = payloads.get((end - timedelta(days=offset)).strftime("%Y-%m-%d"))
+                    if data:
+                        write_outcomes(cur, outcome_rows(season_id, data, team_ids))
+                        break
+            else:
+                write_ingest_log(cur, season_id, {d: payload_hash(data) for d, data in payloads.items()})
+            conn.commit()
+            total += written
+            print(f"  {season_id}: {written} rows from {len(paths)} responses")
+        except Exception as e:
+            print(f"  Error replaying season {season_id}: {e}")
+            conn.rollback()
+
+    # Stats may have changed under the same dates, so stored predictions are recomputed
+    for season_id in seasons or [None]:
+        refresh_predictions(conn, season_id=season_id, rescore=True)
+    notify_standings_updated(cur, "replay")
+    conn.commit()
+    conn.close()
+    report_etl()
+    print(f"Replay complete: {total} rows in {time.perf_counter() - started:.1f}s.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild standings and outcomes from the raw response cache (offline).")
+    parser.add_argument("--season", type=int, action="append", help="Only replay this season_id (repeatable)")
+    parser.add_argument("--stats", action="store_true", help="Print cache statistics and exit")
+    args = parser.parse_args()
+
+    if args.stats:
+        print(RawCache().stats())
+    else:
+        replay(seasons=args.season)
@@ -0,0 +1,177 @@
+import sys
+import os
+import argparse
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from database.db_utils import execute_sql_file, get_connection, notify_standings_updated
+from metrics import ROWS_WRITTEN, WRITE_LATENCY
+
+# CONFIG
+ROLLUPS_SQL = os.path.join(project_root, "database", "rollups.sql")
+GAMES_PER_SEASON = 82
+SHORT_SEASONS = {20122013: 48, 20202021: 56}   # Lockout / pandemic schedules, for points pace
+
+# Latest snapshot per team plus season-wide stats; prev_points_pct comes from the previous
+# season's summary row. Bounded by one season's rows however much history is stored.
+TEAM_SUMMARY_SQL = """
+    INSERT INTO team_season_summary (
+        season_id, team_id, as_of, games_played, wins, losses, ot_losses, points, goals_for, goals_against,
+        goal_diff, points_pct, pace_points, l10_pace_points, max_win_streak, prev_points_pct
+    )
+    SELECT
+        ds.season_id, ds.team_id, ds.date, ds.games_played, ds.wins, ds.losses, ds.ot_losses, ds.points,
+        ds.goals_for, ds.goals_against,
+        ds.goals_for - ds.goals_against,
+        ds.points::float / NULLIF(2 * ds.games_played, 0),
+        ds.points + GREATEST(%(games)s - ds.games_played, 0) * ds.points::float / NULLIF(ds.games_played, 0),
+        ds.points + GREATEST(%(games)s - ds.games_played, 0) * ds.l10_points::float / NULLIF(LEAST(ds.games_played, 10), 0),
+        streaks.max_win_streak,
+        prev.points_pct
+    FROM (
+        SELECT DISTINCT ON (team_id) *
+        FROM daily_standings
+        WHERE season_id = %(season)s
+        ORDER BY team_id, date DESC
+    ) ds
+    JOIN (
+        SELECT team_id, max(CASE WHEN streak_code = 'W' THEN streak_count ELSE 0 END) AS max_win_streak
+        FROM daily_standings
+        WHERE season_id = %(season)s
+        GROUP BY team_id
+    ) streaks ON streaks.team_id = ds.team_id
+    LEFT JOIN team_season_summary prev ON prev.season_id = %(prev)s AND prev.team_id = ds.team_id
+    ON CONFLICT (season_id, team_id) DO UPDATE SET
+        as_of = EXCLUDED.as_of,
+        games_played = EXCLUDED.games_played,
+        wins = EXCLUDED.wins,
+        losses = EXCLUDED.losses,
+        ot_losses = EXCLUDED.ot_losses,
+        points = EXCLUDED.points,
+        goals_for = EXCLUDED.goals_for,
+        goals_against = EXCLUDED.goals_against,
+        goal_diff = EXCLUDED.goal_diff,
+        points_pct = EXCLUDED.points_pct,
+        pace_points = EXCLUDED.pace_points,
+        l10_pace_points = EXCLUDED.l10_pace_points,
+        max_win_streak = EXCLUDED.max_win_streak,
+        prev_points_pct = EXCLUDED.prev_points_pct;
+"""
+
+# The following season compares itself against this one
+NEXT_SEASON_SQL = """
+    UPDATE team_season_summary n
+    SET prev_points_pct = p.points_pct
+    FROM team_season_summary p
+    WHERE n.season_id = %(next)s AND p.season_id = %(season)s AND p.team_id = n.team_id;
+"""
+
+# Only weeks containing a changed date are recomputed (all weeks when dates is NULL)
+GROUP_WEEKLY_SQL = """
+    INSERT INTO group_weekly (
+        level, name, season_id, week, as_of, teams, games_played, points, goal_diff, points_pct,
+        leader_team_id, leader_points
+    )
+    SELECT
+        g.level, g.name, %(season)s, w.week, w.as_of,
+        count(*),
+        sum(ds.games_played),
+        sum(ds.points),
+        sum(ds.goals_for - ds.goals_against),
+        sum(ds.points)::float / NULLIF(2 * sum(ds.games_played), 0),
+        (array_agg(ds.team_id ORDER BY ds.points DESC, ds.games_played))[1],
+        max(ds.points)
+    FROM (
+        SELECT date_trunc('week', date)::date AS week, max(date) AS as_of
+        FROM daily_standings
+        WHERE season_id = %(season)s
+          AND (%(dates)s::date[] IS NULL
+               OR date_trunc('week', date) = ANY(ARRAY(SELECT date_trunc('week', d) FROM unnest(%(dates)s::date[]) d)))
+        GROUP BY 1
+    ) w
+    JOIN daily_standings ds ON ds.season_id = %(season)s AND ds.date = w.as_of
+    JOIN teams t ON t.team_id = ds.team_id
+    CROSS JOIN LATERAL (VALUES ('division', t.division), ('conference', t.conference)) AS g(level, name)
+    WHERE g.name IS NOT NULL
+    GROUP BY g.level, g.name, w.week, w.as_of
+    ON CONFLICT (level, name, season_id, week) DO UPDATE SET
+        as_of = EXCLUDED.as_of,
+        teams = EXCLUDED.teams,
+        games_played = EXCLUDED.games_played,
+        points = EXCLUDED.points,
+        goal_diff = EXCLUDED.goal_diff,
+        points_pct = EXCLUDED.points_pct,
+        leader_team_id = EXCLUDED.leader_team_id,
+        leader_points = EXCLUDED.leader_points;
+"""
+
+
+def season_games(season_id):
+    return SHORT_SEASONS.get(season_id, GAMES_PER_SEASON)
+
+
+def _adjacent_season(season_id, step):
+    start = season_id // 10000 + step
+    return start * 10000 + start + 1
+
+
+def _timed(cur, table, sql, params):
+    with WRITE_LATENCY.time(table):
+        cur.execute(sql, params)
+    ROWS_WRITTEN.inc(table, amount=max(cur.rowcount, 0))
+    return cur.rowcount
+
+
+def refresh_rollups(cur, season_id, dates=None):
+    """
+    Brings the rollup tables up to date for one season; call in the transaction that wrote
+    its standings. dates limits the weekly aggregates to the weeks that changed. Returns
+    (team rows, group rows) written.
+    """
+    params = {
+        "season": season_id,
+        "prev": _adjacent_season(season_id, -1),
+        "next": _adjacent_season(season_id, 1),
+        "games": season_games(season_id),
+        "dates": list(dates) if dates else None,
+    }
+    teams = _timed(cur, "team_season_summary", TEAM_SUMMARY_SQL, params)
+    cur.execute(NEXT_SEASON_SQL, params)
+    groups = _timed(cur, "group_weekly", GROUP_WEEKLY_SQL, params)
+    return teams, groups
+
+
+def rebuild(seasons=None, recreate=False):
+    """Recomputes the rollups for every stored season (oldest first, so season-over-season links hold)."""
+    if recreate:
+        execute_sql_file(ROLLUPS_SQL)
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT DISTINCT season_id FROM daily_standings ORDER BY season_id")
+        stored = [r[0] for r in cur.fetchall()]
+        for season_id in stored:
+            if seasons and season_id not in seasons:
+                continue
+            start = time.perf_counter()
+            teams, groups = refresh_rollups(cur, season_id)
+            conn.commit()
+            print(f"  {season_id}: {teams} team summaries, {groups} weekly group rows "
+                  f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        notify_standings_updated(cur, "rollups")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute the league rollup tables from daily_standings.")
+    parser.add_argument("--season", type=int, action="append", help="Only this season (repeatable)")
+    parser.add_argument("--rebuild", action="store_true", help="Drop and recreate the rollup tables first")
+    args = parser.parse_args()
+    print("--- Refreshing rollups ---")
+    rebuild(seasons=args.season, recreate=args.rebuild)
@@ -0,0 +1,185 @@
+import sys
+import os
+import argparse
+import signal
+import threading
+from datetime import datetime, timedelta, timezone
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from database.db_utils import get_connection, notify_standings_updated
+from etl.fetcher import Fetcher
+from etl.raw_cache import RawCache
+from etl.update_live import LIVE_SEASON_ID, ingest_standings
+from etl.writer import load_team_ids, load_payload_hashes, schedule_rows, write_schedule
+from metrics import REGISTRY, report_etl
+
+# CONFIG
+LIVE_INTERVAL = 120              # Seconds between polls while games are in progress
+GAME_NIGHT_INTERVAL = 600        # Game day: around puck drop and until the final standings land
+OFF_DAY_INTERVAL = 4 * 3600      # No games today (standings only change with late corrections)
+PREGAME_LEAD = 15 * 60           # Start polling this long before the first game
+STALE_GAME_HOURS = 6             # A game not live or final this long after puck drop is postponed/stuck, not upcoming
+LIVE_STATES = {"LIVE", "CRIT"}
+FINAL_STATES = {"OFF", "FINAL"}
+
+POLLS = REGISTRY.counter("etl_poll_results_total", "Scheduler polls by endpoint and outcome", ("endpoint", "result"))
+
+
+def parse_start(game):
+    start = game.get("startTimeUTC")
+    if not start:
+        return None
+    try:
+        return datetime.fromisoformat(start.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+class Scheduler:
+    """
+    Long-running replacement for cron-driven update_live runs.
+
+    Each tick polls the schedule (yesterday onwards, so games past midnight count) and
+    /standings/now with conditional requests over one keep-alive session. Only a payload
+    that actually changed is written; standings changes are re-scored and NOTIFYed to the
+    API through ingest_standings. The next tick is scheduled from today's game states:
+    every LIVE_INTERVAL while games are on, GAME_NIGHT_INTERVAL around them and until the
+    standings reflect the finished games, OFF_DAY_INTERVAL otherwise.
+    """
+
+    def __init__(self, fetcher=None, season_id=LIVE_SEASON_ID, live_interval=LIVE_INTERVAL,
+                 game_night_interval=GAME_NIGHT_INTERVAL, off_day_interval=OFF_DAY_INTERVAL):
+        # One worker thread: every poll reuses the same session and its connection
+        self.fetcher = fetcher or Fetcher(workers=1, cache=RawCache())
+        self.season_id = season_id
+        self.live_interval = live_interval
+        self.game_night_interval = game_night_interval
+        self.off_day_interval = off_day_interval
+        self.finished = None             # ids of final games at the last poll (None before the first)
+        self.awaiting_standings = False  # games finished since the standings last changed
+        self._stop = threading.Event()
+
+    def poll_schedule(self, now):
+        """Returns the games from yesterday and today; re-writes the schedule only if it changed."""
+        yesterday = (now - timedelta(days=1)).strftime("%Y-%m-%d")
+        today = now.strftime("%Y-%m-%d")
+        data, changed = self.fetcher.get_if_changed(f"schedule/{yesterday}")
+        if data is None:
+            POLLS.inc("schedule", "error")
+            return []
+        POLLS.inc("schedule", "changed" if changed else "unchanged")
+        if changed:
+            conn = get_connection()
+            try:
+                cur = conn.cursor()
+                written = write_schedule(cur, schedule_rows(self.season_id, data, load_team_ids(cur)))
+                # Game states feed the simulation's remaining schedule
+                notify_standings_updated(cur, "schedule")
+                conn.commit()
+                print(f"Schedule changed: upserted {written} games.")
+            except Exception as e:
+                print(f"Error writing schedule: {e}")
+                conn.rollback()
+            finally:
+                conn.close()
+
+        games = [g for day in data.get("gameWeek", []) if day.get("date") in (yesterday, today)
+                 for g in day.get("games", []) if g.get("gameType") == 2]
+        finished = {g["id"] for g in games if g.get("gameState") in FINAL_STATES}
+        if self.finished is not None and finished - self.finished:
+            self.awaiting_standings = True
+        self.finished = finished
+        return games
+
+    def poll_standings(self):
+        """Ingests /standings/now if it changed. Returns the changed dates."""
+        data, changed = self.fetcher.get_if_changed("standings/now")
+        if data is None:
+            POLLS.inc("standings", "error")
+            return []
+        POLLS.inc("standings", "changed" if changed else "unchanged")
+        standings = data.get("standings", [])
+        if not changed or not standings:
+            return []
+        date_str = standings[0].get("date") or datetime.now().strftime("%Y-%m-%d")
+        conn = get_connection()
+        try:
+            # Payload hashes from ingest_log keep a restarted daemon from rewriting what it already stored
+            dates = ingest_standings(conn, [(date_str, standings)], load_payload_hashes(conn.cursor(), [date_str]),
+                                     season_id=self.season_id)
+        finally:
+            conn.close()
+        if dates:
+            self.awaiting_standings = False
+            report_etl()
+        return dates
+
+    def next_interval(self, games, now):
+        """Seconds until the next tick, from the state of today's games."""
+        states = [g.get("gameState") for g in games]
+        if any(s in LIVE_STATES for s in states):
+            return self.live_interval
+        # Yesterday's games are polled too, so a postponed one would otherwise pin game-night polling
+        cutoff = now - timedelta(hours=STALE_GAME_HOURS)
+        upcoming = [parse_start(g) for g in games if g.get("gameState") not in FINAL_STATES]
+        upcoming = [s for s in upcoming if s is not None and s > cutoff]
+        if upcoming:
+            until_start = (min(upcoming) - now).total_seconds() - PREGAME_LEAD
+            if until_start > self.game_night_interval:
+                return min(until_start, self.off_day_interval)
+            return self.game_night_interval
+        if self.awaiting_standings:
+            return self.game_night_interval
+        return self.off_day_interval
+
+    def tick(self):
+        now = datetime.now(timezone.utc)
+        games = self.poll_schedule(now.astimezone())
+        self.poll_standings()
+        interval = self.next_interval(games, now)
+        live = sum(g.get("gameState") in LIVE_STATES for g in games)
+        print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {len(games)} games ({live} live), next poll in {interval / 60:.0f} min")
+        return interval
+
+    def run(self):
+        print("--- ETL scheduler started (Ctrl+C to stop) ---")
+        while not self._stop.is_set():
+            try:
+                interval = self.tick()
+            except Exception as e:
+                print(f"Scheduler tick failed: {e}")
+                interval = self.game_night_interval
+            if os.getenv("ETL_METRICS_FILE"):
+                REGISTRY.write_textfile(os.getenv("ETL_METRICS_FILE"))
+            self._stop.wait(interval)
+        print("Scheduler stopped.")
+
+    def stop(self, *args):
+        self._stop.set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Game-aware polling daemon for the live season.")
+    parser.add_argument("--once", action="store_true", help="Run a single tick and exit")
+    parser.add_argument("--live-interval", type=int, default=LIVE_INTERVAL, help="Seconds between polls while games are live")
+    parser.add_argument("--game-night-interval", type=int, default=GAME_NIGHT_INTERVAL)
+    parser.add_argument("--off-day-interval", type=int, default=OFF_DAY_INTERVAL)
+    parser.add_argument("--no-cache", action="store_true", help="Don't write responses to the raw response cache")
+    args = parser.parse_args()
+
+    scheduler = Scheduler(
+        fetcher=Fetcher(workers=1, cache=None if args.no_cache else RawCache()),
+        live_interval=args.live_interval,
+        game_night_interval=args.game_night_interval,
+        off_day_interval=args.off_day_interval,
+    )
+    if args.once:
+        scheduler.tick()
+        sys.exit(0)
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    signal.signal(signal.SIGINT, scheduler.stop)
+    scheduler.run()
@@ -1,20 +1,20 @@
-import requests
 import sys
 import os
+import argparse
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from config import API_URL
 from database.db_utils import get_connection
+from etl.fetcher import Fetcher
+from etl.raw_cache import RawCache
 
-def seed_teams():
+def seed_teams(fetcher=None):
     print("--- Seeding Teams & Metadata ---")
-    url = f"{API_URL}/standings/now"
-    resp = requests.get(url)
-    data = resp.json().get("standings", [])
+    fetcher = fetcher or Fetcher(cache=RawCache())
+    data = (fetcher.get_json("standings/now") or {}).get("standings", [])
     
     conn = get_connection()
     cur = conn.cursor()
@@ -43,4 +43,7 @@ def seed_teams():
     print(f"Success: Seeded {count} teams.")
 
 if __name__ == "__main__":
-    seed_teams()
+    parser = argparse.ArgumentParser(description="Seed the teams table from the current standings.")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the raw response cache")
+    args = parser.parse_args()
+    seed_teams(fetcher=Fetcher(cache=None if args.no_cache else RawCache()))
@@ -1,7 +1,6 @@
 import sys
 import os
-import requests
-import time
+import argparse
 from datetime import datetime, timedelta
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -9,19 +8,14 @@ project_root = os.path.dirname(current_dir)
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from config import API_URL
-from database.db_utils import get_connection
-
-# CONFIG
-HEADERS = {
-    "User-Agent": "SportsDashboard/1.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36"
-}
-
-# Map historical/relocated franchises to current DB codes
-TEAM_MAPPINGS = {
-    "ARI": "UTA",  # Arizona Coyotes -> Utah Hockey Club
-    "PHX": "UTA"   # Phoenix Coyotes -> Utah Hockey Club
-}
+from database.db_utils import get_connection, notify_standings_updated
+from etl.fetcher import Fetcher, date_range
+from etl.raw_cache import RawCache
+from etl.rollups import refresh_rollups
+from metrics import report_etl
+from models.feature_store import refresh_features
+from models.predictions import refresh_predictions
+from etl.writer import load_team_ids, standings_rows, write_standings, outcome_rows, write_outcomes
 
 SEASONS = [
     (2014, datetime(2014, 10, 8), datetime(2015, 4, 11)),
@@ -37,131 +31,70 @@ SEASONS = [
     (2024, datetime(2024, 10, 4), datetime(2025, 4, 17))
 ]
 
-def update_history():
+def update_history(step_days=7, fetcher=None):
+    fetcher = fetcher or Fetcher(cache=RawCache())
     conn = get_connection()
     cur = conn.cursor()
     
-    # Fetch Daily Standings (Weekly intervals)
+    team_ids = load_team_ids(cur)
+
+    # Fetch Daily Standings (every `step_days` days, weekly by default)
     print("--- Fetching Historical Standings ---")
     
     for start_year, start_date, end_date in SEASONS:
         print(f"Processing Season {start_year}...")
-        current = start_date
         season_id = int(f"{start_year}{start_year + 1}")
+        dates = date_range(start_date, end_date, step_days)
         
-        while current <= end_date:
-            date_str = current.strftime("%Y-%m-%d")
-            time.sleep(0.1) 
-            
-            try:
-                resp = requests.get(f"{API_URL}/standings/{date_str}", headers=HEADERS, timeout=10)
-                
-                if resp.status_code == 200:
-                    data = resp.json().get("standings", [])
-                    for t in data:
-                        # Extract Team Abbreviation
-                        abbrev = t["teamAbbrev"]["default"] if isinstance(t.get("teamAbbrev"), dict) else t.get("teamAbbrev")
-                        if abbrev in TEAM_MAPPINGS:
-                            abbrev = TEAM_MAPPINGS[abbrev]
-                        
-                        # Extract New Stats
-                        l10 = t.get("l10Pts", 0)
-                        streak_info = t.get("streak", {})
-                        s_code = streak_info.get("code", "N") if streak_info else "N"
-                        s_count = streak_info.get("count", 0) if streak_info else 0
+        # Requests run concurrently; the whole season is written in one batch.
+        # Finished seasons never change, so their payloads are cached as immutable.
+        rows = []
+        for date_str, data in fetcher.fetch_standings(dates, immutable=True):
+            # Empty payloads often happen in off-season or breaks, ignore silent failure
+            rows.extend(standings_rows(date_str, season_id, data, team_ids))
 
-                        sql = """
-                            INSERT INTO daily_standings 
-                            (date, season_id, team_id, games_played, wins, losses, ot_losses, points, goals_for, goals_against, l10_points, streak_code, streak_count)
-                            VALUES (%s, %s, (SELECT team_id FROM teams WHERE abbrev = %s LIMIT 1), %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (date, team_id) DO NOTHING;
-                        """
-                        cur.execute(sql, (
-                            date_str, season_id, abbrev,
-                            t.get("gamesPlayed", 0), t.get("wins", 0), t.get("losses", 0),
-                            t.get("otLosses", 0), t.get("points", 0), 
-                            t.get("goalFor", 0), t.get("goalAgainst", 0),
-                            l10, s_code, s_count
-                        ))
-                    conn.commit()
-                elif resp.status_code == 429:
-                    print(f"  Hit Rate Limit (429) on {date_str}. Sleeping 5s...")
-                    time.sleep(5)
-                else:
-                    # Often happens in off-season or breaks, ignore silent failure
-                    pass
-                    
-            except Exception as e:
-                print(f"  Error on {date_str}: {e}")
-                conn.rollback()
-            
-            current += timedelta(days=7) 
+        try:
+            written = write_standings(cur, rows)
+            refresh_rollups(cur, season_id)
+            refresh_features(cur, season_id)
+            conn.commit()
+            print(f"  Wrote {written} rows.")
+        except Exception as e:
+            print(f"  Error writing season {season_id}: {e}")
+            conn.rollback()
+
+    # Score every snapshot that has no prediction yet, then tell the API
+    refresh_predictions(conn)
+    notify_standings_updated(cur, "history")
+    conn.commit()
             
     # Fetch Outcomes
     print("--- Fetching Season Outcomes ---")
-    MAX_RETRIES = 3
-    BACKOFF_FACTOR = 2
+
+    # Try end_date, then end_date - 1 day, etc. to find valid data.
+    # All candidates for all seasons are requested up front in one concurrent batch.
+    candidates = {}
+    for start_year, _, end_date in SEASONS:
+        season_id = int(f"{start_year}{start_year + 1}")
+        candidates[season_id] = [(end_date - timedelta(days=day_offset)).strftime("%Y-%m-%d") for day_offset in range(3)]
+    all_dates = [d for dates in candidates.values() for d in dates]
+    fetched = dict(fetcher.fetch_standings(all_dates, immutable=True))
 
     for start_year, _, end_date in SEASONS:
         season_id = int(f"{start_year}{start_year + 1}")
         
-        # Try end_date, then end_date - 1 day, etc. to find valid data
-        valid_resp = None
-        for day_offset in range(3):
-            check_date = end_date - timedelta(days=day_offset)
-            date_str = check_date.strftime("%Y-%m-%d")
-            url = f"{API_URL}/standings/{date_str}"
-            
-            try:
-                resp = requests.get(url, headers=HEADERS, timeout=10)
-                if resp.status_code == 200:
-                    data = resp.json().get("standings", [])
-                    if data: # Ensure we actually got standings
-                        valid_resp = resp
-                        break 
-            except:
-                pass
-            time.sleep(0.5)
+        data = None
+        for date_str in candidates[season_id]:
+            if fetched.get(date_str):  # Ensure we actually got standings
+                data = fetched[date_str]
+                break
 
-        if not valid_resp:
+        if not data:
             print(f"  Skipping {season_id}: Could not find final standings data around {end_date.strftime('%Y-%m-%d')}.")
             continue
 
         try:
-            data = valid_resp.json().get("standings", [])
-            inserted_count = 0
-            
-            for t in data:
-                ta = t.get("teamAbbrev")
-                abbrev = ta.get("default") if isinstance(ta, dict) else (ta or t.get("abbrev"))
-                
-                if not abbrev: 
-                    continue
-                if abbrev in TEAM_MAPPINGS: abbrev = TEAM_MAPPINGS[abbrev]
-
-                # Ensure team exists
-                cur.execute("SELECT team_id FROM teams WHERE abbrev = %s LIMIT 1", (abbrev,))
-                row = cur.fetchone()
-                if not row:
-                    continue
-                team_id = row[0]
-
-                # "clinchIndicator" usually exists for playoff teams (e.g. 'x', 'y', 'p')
-                # If it is missing or None, they missed playoffs.
-                clinch = t.get("clinchIndicator")
-                made_playoffs = clinch is not None and clinch != ""
-                points = t.get("points", 0)
-
-                sql = """
-                    INSERT INTO season_outcomes (season_id, team_id, made_playoffs, points)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (season_id, team_id) DO UPDATE
-                      SET made_playoffs = EXCLUDED.made_playoffs,
-                          points = EXCLUDED.points;
-                """
-                cur.execute(sql, (season_id, team_id, made_playoffs, points))
-                inserted_count += 1
-
+            inserted_count = write_outcomes(cur, outcome_rows(season_id, data, team_ids))
             conn.commit()
             print(f"  Saved outcomes for {season_id} ({inserted_count} teams).")
             
@@ -170,7 +103,20 @@ def update_history():
             conn.rollback()
 
     conn.close()
+    report_etl()
     print("History load complete.")
 
 if __name__ == "__main__":
-    update_history()
+    parser = argparse.ArgumentParser(description="Backfill historical standings and season outcomes.")
+    parser.add_argument("--step-days", type=int, default=7, help="Days between snapshots (1 = daily granularity)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent HTTP workers")
+    parser.add_argument("--rate", type=float, default=10.0, help="Max requests per second across all workers")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the raw response cache")
+    parser.add_argument("--retrain", action="store_true", help="Refresh the model incrementally once the load finishes")
+    args = parser.parse_args()
+    cache = None if args.no_cache else RawCache()
+    update_history(step_days=args.step_days, fetcher=Fetcher(workers=args.workers, rate=args.rate, cache=cache))
+    if args.retrain:
+        # Training dependencies stay out of plain ETL runs
+        from models.train import retrain_incremental
+        retrain_incremental()
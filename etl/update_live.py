@@ -1,6 +1,6 @@
 import sys
 import os
-import requests
+import argparse
 from datetime import datetime, timedelta
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -8,59 +8,100 @@ project_root = os.path.dirname(current_dir)
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from config import API_URL
-from database.db_utils import get_connection
+from database.db_utils import get_connection, notify_standings_updated
+from etl.fetcher import Fetcher, date_range
+from etl.rollups import refresh_rollups
+from etl.raw_cache import RawCache
+from metrics import report_etl
+from models.feature_store import refresh_features
+from models.predictions import refresh_predictions
+from etl.writer import (
+    load_team_ids, standings_rows, write_standings,
+    payload_hash, get_watermark, load_payload_hashes, write_ingest_log
+)
 
-def update_live():
+# CONFIG
+LIVE_SEASON_ID = 20252026
+SEASON_START = datetime(2025, 10, 4)
+STEP_DAYS = 7
+RECHECK_DAYS = 7  # Re-fetch this many days before the watermark to pick up late stat corrections
+
+def pending_dates(watermark, end_date, step_days=STEP_DAYS, recheck_days=RECHECK_DAYS):
+    """Snapshot dates on the season grid newer than the watermark, plus the re-check window."""
+    dates = date_range(SEASON_START, end_date, step_days)
+    if watermark is None:
+        return dates
+    cutoff = (watermark - timedelta(days=recheck_days)).strftime("%Y-%m-%d")
+    return [d for d in dates if d > cutoff]
+
+def ingest_standings(conn, payloads, known_hashes, season_id=LIVE_SEASON_ID):
+    """
+    Writes the (date_str, standings) payloads whose hash differs from known_hashes, re-scores
+    those dates and NOTIFYs the API. Returns the changed dates (empty if nothing was written).
+    """
+    cur = conn.cursor()
+    team_ids = load_team_ids(cur)
+    rows = []
+    new_hashes = {}
+    for date_str, data in payloads:
+        if not data:
+            continue
+        h = payload_hash(data)
+        if known_hashes.get(date_str) == h:
+            continue  # Unchanged since last ingest
+        new_hashes[date_str] = h
+        rows.extend(standings_rows(date_str, season_id, data, team_ids))
+
+    # Single batched upsert for every changed date
+    feature_dates = []
+    try:
+        written = write_standings(cur, rows, update=True)
+        write_ingest_log(cur, season_id, new_hashes)
+        if written:
+            # Same transaction, so the rollups and features never lag the standings they summarise
+            refresh_rollups(cur, season_id, list(new_hashes))
+            feature_dates = refresh_features(cur, season_id, list(new_hashes))
+        conn.commit()
+        print(f"Upserted {written} rows across {len(new_hashes)} changed dates.")
+    except Exception as e:
+        print(f"Error writing live standings: {e}")
+        conn.rollback()
+        written = 0
+
+    if not written:
+        return []
+    # Changed dates (and later ones whose trend window covers them) are re-scored so
+    # stored predictions match the corrected stats
+    refresh_predictions(conn, season_id=season_id, dates=feature_dates or list(new_hashes), rescore=True)
+    # 'season:first-changed-date' lets the API reload just the tail of the season
+    notify_standings_updated(cur, f"{season_id}:{min(new_hashes)}")
+    conn.commit()
+    return list(new_hashes)
+
+def update_live(fetcher=None, full=False, step_days=STEP_DAYS, recheck_days=RECHECK_DAYS):
+    fetcher = fetcher or Fetcher(cache=RawCache())
     print("--- Updating Live Season (2025-2026) ---")
     conn = get_connection()
     cur = conn.cursor()
-    
-    start_date = datetime(2025, 10, 4)
+
     end_date = datetime.now() - timedelta(days=1)
-    current = start_date
-    
-    while current <= end_date:
-        date_str = current.strftime("%Y-%m-%d")
-        try:
-            resp = requests.get(f"{API_URL}/standings/{date_str}")
-            if resp.status_code == 200:
-                data = resp.json().get("standings", [])
-                for t in data:
-                    # New Extract Logic
-                    l10 = t.get("l10Pts", 0)
-                    streak_info = t.get("streak", {})
-                    s_code = streak_info.get("code", "N") if streak_info else "N"
-                    s_count = streak_info.get("count", 0) if streak_info else 0
+    watermark = None if full else get_watermark(cur, LIVE_SEASON_ID)
+    dates = pending_dates(watermark, end_date, step_days, recheck_days)
+    print(f"Watermark: {watermark or 'none (full rebuild)'}. Checking {len(dates)} dates.")
+
+    known_hashes = {} if full else load_payload_hashes(cur, dates)
+    ingest_standings(conn, fetcher.fetch_standings(dates), known_hashes)
 
-                    sql = """
-                        INSERT INTO daily_standings 
-                        (date, season_id, team_id, games_played, wins, losses, ot_losses, points, goals_for, goals_against, l10_points, streak_code, streak_count)
-                        VALUES (%s, 20252026, (SELECT team_id FROM teams WHERE abbrev = %s LIMIT 1), %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (date, team_id) DO UPDATE SET
-                            games_played = EXCLUDED.games_played,
-                            wins = EXCLUDED.wins,
-                            points = EXCLUDED.points,
-                            l10_points = EXCLUDED.l10_points,
-                            streak_code = EXCLUDED.streak_code,
-                            streak_count = EXCLUDED.streak_count;
-                    """
-                    cur.execute(sql, (
-                        date_str, t["teamAbbrev"]["default"],
-                        t.get("gamesPlayed", 0), t.get("wins", 0), t.get("losses", 0),
-                        t.get("otLosses", 0), t.get("points", 0), 
-                        t.get("goalFor", 0), t.get("goalAgainst", 0),
-                        l10, s_code, s_count
-                    ))
-            conn.commit()
-        except Exception as e:
-            print(f"Skipping {date_str}: {e}")
-            conn.rollback()
-        
-        current += timedelta(days=7)
-        
     conn.close()
+    report_etl()
     print("Live update complete.")
 
 if __name__ == "__main__":
-    update_live()
+    parser = argparse.ArgumentParser(description="Incrementally refresh the live season's standings.")
+    parser.add_argument("--full", action="store_true", help="Ignore the watermark and payload hashes and rebuild the whole season")
+    parser.add_argument("--step-days", type=int, default=STEP_DAYS, help="Days between snapshots")
+    parser.add_argument("--recheck-days", type=int, default=RECHECK_DAYS, help="Days before the watermark to re-fetch for late corrections")
+    parser.add_argument("--no-cache", action="store_true", help="Don't write responses to the raw response cache")
+    args = parser.parse_args()
+    fetcher = Fetcher(cache=None if args.no_cache else RawCache())
+    update_live(fetcher=fetcher, full=args.full, step_days=args.step_days, recheck_days=args.recheck_days)
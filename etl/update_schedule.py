@@ -0,0 +1,53 @@
+import sys
+import os
+import argparse
+from datetime import datetime
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from database.db_utils import get_connection
+from etl.fetcher import Fetcher, date_range
+from etl.raw_cache import RawCache
+from metrics import report_etl
+from etl.update_live import LIVE_SEASON_ID, SEASON_START
+from etl.writer import load_team_ids, schedule_rows, write_schedule
+
+# CONFIG
+SEASON_END = datetime(2026, 4, 16)
+
+def update_schedule(fetcher=None, start_date=None):
+    """Loads the live season's regular-season schedule. Each /schedule/{date} call returns a full week."""
+    fetcher = fetcher or Fetcher(cache=RawCache())
+    print("--- Updating Schedule (2025-2026) ---")
+    conn = get_connection()
+    cur = conn.cursor()
+
+    team_ids = load_team_ids(cur)
+    paths = [f"schedule/{d}" for d in date_range(start_date or SEASON_START, SEASON_END, 7)]
+    rows = []
+    for _, data in fetcher.fetch_many(paths):
+        if data:
+            rows.extend(schedule_rows(LIVE_SEASON_ID, data, team_ids))
+
+    try:
+        written = write_schedule(cur, rows)
+        conn.commit()
+        print(f"Upserted {written} games.")
+    except Exception as e:
+        print(f"Error writing schedule: {e}")
+        conn.rollback()
+
+    conn.close()
+    report_etl()
+    print("Schedule update complete.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch the live season's regular-season schedule.")
+    parser.add_argument("--from-today", action="store_true", help="Only refresh weeks from today onwards")
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the raw response cache")
+    args = parser.parse_args()
+    update_schedule(fetcher=Fetcher(cache=None if args.no_cache else RawCache()),
+                    start_date=datetime.now() if args.from_today else None)
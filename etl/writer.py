@@ -0,0 +1,196 @@
+import hashlib
+import json
+
+from psycopg2.extras import execute_values
+
+from metrics import timed_write
+
+# Map historical/relocated franchises to current DB codes
+TEAM_MAPPINGS = {
+    "ARI": "UTA",  # Arizona Coyotes -> Utah Hockey Club
+    "PHX": "UTA"   # Phoenix Coyotes -> Utah Hockey Club
+}
+
+STANDINGS_COLUMNS = (
+    "date", "season_id", "team_id", "games_played", "wins", "losses", "ot_losses", "points",
+    "goals_for", "goals_against", "l10_points", "streak_code", "streak_count"
+)
+
+# Columns refreshed when a live snapshot is re-ingested
+LIVE_UPDATE_COLUMNS = ("games_played", "wins", "points", "l10_points", "streak_code", "streak_count")
+
+# Every non-key column, for re-ingests that must fully overwrite a snapshot (replay after a parser change)
+ALL_COLUMNS = tuple(c for c in STANDINGS_COLUMNS if c not in ("date", "team_id"))
+
+
+def load_team_ids(cur):
+    """Loads the abbrev -> team_id map once per run instead of a subquery per row."""
+    cur.execute("SELECT abbrev, team_id FROM teams")
+    return dict(cur.fetchall())
+
+
+def team_abbrev(t):
+    """Extracts the team abbreviation from a standings entry, applying TEAM_MAPPINGS."""
+    ta = t.get("teamAbbrev")
+    abbrev = ta.get("default") if isinstance(ta, dict) else (ta or t.get("abbrev"))
+    return TEAM_MAPPINGS.get(abbrev, abbrev)
+
+
+def standings_rows(date_str, season_id, data, team_ids):
+    """Converts one /standings/{date} payload into daily_standings row tuples.
+
+    Teams missing from `team_ids` are skipped (the old per-row subquery inserted them with a NULL team_id).
+    """
+    rows = []
+    for t in data:
+        team_id = team_ids.get(team_abbrev(t))
+        if team_id is None:
+            continue
+
+        streak_info = t.get("streak", {})
+        s_code = streak_info.get("code", "N") if streak_info else "N"
+        s_count = streak_info.get("count", 0) if streak_info else 0
+
+        rows.append((
+            date_str, season_id, team_id,
+            t.get("gamesPlayed", 0), t.get("wins", 0), t.get("losses", 0),
+            t.get("otLosses", 0), t.get("points", 0),
+            t.get("goalFor", 0), t.get("goalAgainst", 0),
+            t.get("l10Pts", 0), s_code, s_count
+        ))
+    return rows
+
+
+def write_standings(cur, rows, update=False):
+    """Upserts daily_standings rows in a single execute_values statement.
+
+    update=False keeps history semantics (ON CONFLICT DO NOTHING); update=True
+    refreshes LIVE_UPDATE_COLUMNS like the live loader always has. A tuple of
+    column names (e.g. ALL_COLUMNS) refreshes exactly those.
+    """
+    if not rows:
+        return 0
+
+    # One statement cannot touch the same (date, team_id) twice, so keep the last row per key
+    deduped = list({(r[0], r[2]): r for r in rows}.values())
+
+    if update:
+        columns = LIVE_UPDATE_COLUMNS if update is True else update
+        conflict = "DO UPDATE SET " + ", ".join(f"{c} = EXCLUDED.{c}" for c in columns)
+    else:
+        conflict = "DO NOTHING"
+
+    sql = f"""
+        INSERT INTO daily_standings ({", ".join(STANDINGS_COLUMNS)})
+        VALUES %s
+        ON CONFLICT (date, team_id) {conflict};
+    """
+    with timed_write("daily_standings", len(deduped)):
+        execute_values(cur, sql, deduped, page_size=len(deduped))
+    return len(deduped)
+
+
+def outcome_rows(season_id, data, team_ids):
+    """Converts final standings into season_outcomes row tuples."""
+    rows = []
+    for t in data:
+        team_id = team_ids.get(team_abbrev(t))
+        if team_id is None:
+            continue
+
+        # "clinchIndicator" usually exists for playoff teams (e.g. 'x', 'y', 'p')
+        # If it is missing or None, they missed playoffs.
+        clinch = t.get("clinchIndicator")
+        made_playoffs = clinch is not None and clinch != ""
+        rows.append((season_id, team_id, made_playoffs, t.get("points", 0)))
+    return rows
+
+
+def write_outcomes(cur, rows):
+    """Upserts season_outcomes rows in a single execute_values statement."""
+    if not rows:
+        return 0
+    deduped = list({(r[0], r[1]): r for r in rows}.values())
+    sql = """
+        INSERT INTO season_outcomes (season_id, team_id, made_playoffs, points)
+        VALUES %s
+        ON CONFLICT (season_id, team_id) DO UPDATE
+          SET made_playoffs = EXCLUDED.made_playoffs,
+              points = EXCLUDED.points;
+    """
+    with timed_write("season_outcomes", len(deduped)):
+        execute_values(cur, sql, deduped, page_size=len(deduped))
+    return len(deduped)
+
+
+def payload_hash(data):
+    """Stable sha256 of a standings payload, used to skip dates that have not changed."""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def get_watermark(cur, season_id):
+    """Latest ingested date for a season, from ingest_log or else max(date) in daily_standings."""
+    cur.execute("SELECT max(date) FROM ingest_log WHERE season_id = %s", (season_id,))
+    watermark = cur.fetchone()[0]
+    if watermark is None:
+        cur.execute("SELECT max(date) FROM daily_standings WHERE season_id = %s", (season_id,))
+        watermark = cur.fetchone()[0]
+    return watermark
+
+
+def load_payload_hashes(cur, date_strs):
+    """Returns {date_str: payload_hash} for dates already in ingest_log."""
+    if not date_strs:
+        return {}
+    cur.execute(
+        "SELECT to_char(date, 'YYYY-MM-DD'), payload_hash FROM ingest_log WHERE date = ANY(%s::date[])",
+        (list(date_strs),)
+    )
+    return dict(cur.fetchall())
+
+
+def write_ingest_log(cur, season_id, hashes):
+    """Records the payload hash for each ingested date."""
+    if not hashes:
+        return 0
+    sql = """
+        INSERT INTO ingest_log (date, season_id, payload_hash)
+        VALUES %s
+        ON CONFLICT (date) DO UPDATE
+          SET payload_hash = EXCLUDED.payload_hash,
+              ingested_at = now();
+    """
+    execute_values(cur, sql, [(d, season_id, h) for d, h in hashes.items()], page_size=len(hashes))
+    return len(hashes)
+
+
+def schedule_rows(season_id, data, team_ids):
+    """Converts /schedule/{date} payloads into schedule row tuples (regular-season games only)."""
+    rows = []
+    for day in data.get("gameWeek", []):
+        for g in day.get("games", []):
+            if g.get("gameType") != 2:
+                continue
+            home = team_ids.get(team_abbrev(g.get("homeTeam", {})))
+            away = team_ids.get(team_abbrev(g.get("awayTeam", {})))
+            if home is None or away is None:
+                continue
+            rows.append((g["id"], season_id, day["date"], home, away, g.get("gameState")))
+    return rows
+
+
+def write_schedule(cur, rows):
+    """Upserts schedule rows in a single execute_values statement."""
+    if not rows:
+        return 0
+    deduped = list({r[0]: r for r in rows}.values())
+    sql = """
+        INSERT INTO schedule (game_id, season_id, date, home_team_id, away_team_id, game_state)
+        VALUES %s
+        ON CONFLICT (game_id) DO UPDATE
+          SET date = EXCLUDED.date,
+              game_state = EXCLUDED.game_state;
+    """
+    with timed_write("schedule", len(deduped)):
+        execute_values(cur, sql, deduped, page_size=len(deduped))
+    return len(deduped)
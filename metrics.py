@@ -0,0 +1,340 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter as _Tally
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# CONFIG
+# Latency buckets in seconds (0.5 ms .. 10 s)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))   # > 0 enables the sampling profiler for slower requests
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {v}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for labels, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {v}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram, rendered in the Prometheus text format."""
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def totals(self, *labels):
+        """(sum, count) for one label set."""
+        series = self._series.get(labels)
+        return (series[-2], series[-1]) if series else (0.0, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                for bound, n in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_labels(names, labels + (bound,))} {n}")
+                lines.append(f"{self.name}_bucket{_labels(names, labels + ('+Inf',))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-2]:.6f}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name, help, labelnames=()):
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Atomically writes all metrics to a file (e.g. for node_exporter's textfile collector)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+REGISTRY = Registry()
+
+# Shared metric families (API)
+HTTP_LATENCY = REGISTRY.histogram("http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status"))
+HTTP_ERRORS = REGISTRY.counter("http_request_errors_total", "Unhandled exceptions by route and type", ("route", "exception"))
+STAGE_LATENCY = REGISTRY.histogram("handler_stage_duration_seconds", "Time spent in each stage of a handler", ("route", "stage"))
+PUSH_CLIENTS = REGISTRY.gauge("push_clients", "Open standings streams")
+PUSH_EVENTS = REGISTRY.counter("push_events_total", "Events broadcast to standings streams", ("event",))
+STORE_ROWS = REGISTRY.gauge("standings_store_rows", "Rows held in the in-memory standings store")
+STORE_UPDATES = REGISTRY.counter("standings_store_updates_total", "In-memory standings store updates by kind", ("kind",))
+
+# Shared metric families (ETL)
+FETCH_LATENCY = REGISTRY.histogram("etl_fetch_duration_seconds", "NHL API request latency by endpoint and status", ("endpoint", "status"))
+FETCH_THROTTLED = REGISTRY.counter("etl_rate_limited_total", "429 responses from the NHL API", ("endpoint",))
+ROWS_WRITTEN = REGISTRY.counter("etl_rows_written_total", "Rows written by the ETL", ("table",))
+WRITE_LATENCY = REGISTRY.histogram("etl_write_duration_seconds", "Time spent in batched DB writes", ("table",))
+
+
+def span(route, stage):
+    """Times one stage of a handler: `with span("standings", "db_query"): ...`."""
+    return STAGE_LATENCY.time(route, stage)
+
+
+@contextmanager
+def timed_write(table, rows):
+    """Times a batched write and counts its rows."""
+    with WRITE_LATENCY.time(table):
+        yield
+    ROWS_WRITTEN.inc(table, amount=rows)
+
+
+def etl_summary():
+    """One-line-per-metric recap printed at the end of an ETL run."""
+    lines = []
+    for labels, series in sorted(FETCH_LATENCY._series.items()):
+        total, count = series[-2], series[-1]
+        lines.append(f"  fetch {labels[0]} [{labels[1]}]: {count} requests, avg {total / count * 1000:.0f} ms")
+    for labels, throttled in sorted(FETCH_THROTTLED._values.items()):
+        lines.append(f"  429s on {labels[0]}: {throttled}")
+    for labels, rows in sorted(ROWS_WRITTEN._values.items()):
+        seconds, _ = WRITE_LATENCY.totals(*labels)
+        rate = f"{rows / seconds:,.0f} rows/s" if seconds else "n/a"
+        lines.append(f"  wrote {rows} rows to {labels[0]} in {seconds:.2f}s ({rate})")
+    return "\n".join(lines)
+
+
+def report_etl(path=None):
+    """Prints the ETL summary and, if ETL_METRICS_FILE (or path) is set, writes the metrics textfile."""
+    summary = etl_summary()
+    if summary:
+        print("--- ETL metrics ---")
+        print(summary)
+    path = path or os.getenv("ETL_METRICS_FILE")
+    if path:
+        REGISTRY.write_textfile(path)
+
+
+class _Session:
+    """What one profiling session samples: whole threads, plus loop-thread stacks of its own tasks."""
+
+    def __init__(self):
+        self.samples = _Tally()
+        self.threads = set()
+        self.tasks = set()
+        try:
+            self.loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.loop = None
+        if self.loop is None:
+            self.threads.add(threading.get_ident())
+        else:
+            # The event loop thread runs every request: only this request's tasks count there
+            self.loop_thread = threading.get_ident()
+            self.tasks.add(asyncio.current_task())
+
+
+class SamplingProfiler:
+    """Opt-in wall-clock sampler producing folded stacks (flamegraph.pl / speedscope format).
+
+    One background thread samples while at least one session is open. A session opened on an
+    event loop keeps that thread's stacks only while one of its own tasks is running there (the
+    task that opened it, plus the endpoint's task via attach_task()), so concurrent requests
+    and the idle selector stay out of its profile. Worker threads running a call wrapped with
+    profiled() are sampled for the session too. A session opened outside a loop samples its
+    whole thread.
+    """
+
+    def __init__(self, interval_ms=PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self._sessions = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @staticmethod
+    def _stack(frame):
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(parts))
+
+    def _run(self):
+        while True:
+            with self._lock:
+                sessions = [(s, set(s.threads), set(s.tasks)) for s in self._sessions]
+                if not sessions:
+                    self._thread = None
+                    return
+            loops = {s.loop_thread: s.loop for s, _, _ in sessions if s.loop is not None}
+            before = {ident: asyncio.current_task(loop) for ident, loop in loops.items()}
+            frames = sys._current_frames()
+            # A task switch while the frames were taken makes the loop sample ambiguous: drop it
+            running = {ident: task for ident, task in before.items() if asyncio.current_task(loops[ident]) is task}
+            stacks = {}
+            for session, threads, tasks in sessions:
+                idents = set(threads)
+                if session.loop is not None and running.get(session.loop_thread) in tasks:
+                    idents.add(session.loop_thread)
+                for ident in idents:
+                    if ident in frames and ident not in stacks:
+                        stacks[ident] = self._stack(frames[ident])
+                session.samples.update(stacks[ident] for ident in idents if ident in stacks)
+            time.sleep(self.interval)
+
+    @contextmanager
+    def session(self):
+        entry = _Session()
+        token = _SESSION.set(entry)
+        with self._lock:
+            self._sessions.append(entry)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        try:
+            yield entry.samples
+        finally:
+            _SESSION.reset(token)
+            with self._lock:
+                self._sessions.remove(entry)
+
+    def _attach(self, entry, ident, attached):
+        with self._lock:
+            (entry.threads.add if attached else entry.threads.discard)(ident)
+
+    def _attach_task(self, entry, task):
+        with self._lock:
+            entry.tasks.add(task)
+
+    @staticmethod
+    def dump(samples, name, directory=PROFILE_DIR):
+        """Writes folded stacks ("frame;frame;frame count") and returns the file path."""
+        os.makedirs(directory, exist_ok=True)
+        safe = "".join(c if c.isalnum() else "_" for c in name).strip("_")
+        path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{safe}.folded")
+        with open(path, "w") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+_SESSION = ContextVar("profile_session", default=None)
+PROFILER = SamplingProfiler() if PROFILE_SLOW_MS > 0 else None
+
+
+def profiled(func):
+    """Wraps a function handed to a thread pool so the caller's profile session samples that thread too."""
+    entry = _SESSION.get()
+    if PROFILER is None or entry is None:
+        return func
+
+    def run(*args, **kwargs):
+        ident = threading.get_ident()
+        PROFILER._attach(entry, ident, True)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            PROFILER._attach(entry, ident, False)
+    return run
+
+
+async def attach_task():
+    """
+    FastAPI dependency: the endpoint runs in its own task (BaseHTTPMiddleware starts one), so it
+    joins the request's profile session here. Async so it runs in that task, not a worker thread.
+    """
+    entry = _SESSION.get()
+    if PROFILER is not None and entry is not None and entry.loop is not None:
+        PROFILER._attach_task(entry, asyncio.current_task())
@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from models.features import feature_matrix
+from models.search import build_estimator
+from models.snapshots import MIN_GAMES_PLAYED, load_training_frame
+
+warnings.filterwarnings('ignore')
+
+# CONFIG
+DEFAULT_MODEL = 'rf'
+DEFAULT_PARAMS = {'rf': {'n_estimators': 200, 'max_depth': 10, 'min_samples_leaf': 4}}
+MIN_TRAIN_SEASONS = 3        # Rolling-origin: first test season needs at least this many seasons before it
+GP_BUCKET = 10               # Width of the games_played buckets in the report
+CALIBRATION_BINS = 10
+EPS = 1e-15
+
+# Read-only arrays shared with the fold workers (memory-mapped .npy files, not pickled per task)
+_shared = {}
+
+
+def _init_worker(data_dir):
+    for name in ('X', 'y', 'season', 'games_played'):
+        _shared[name] = np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode='r')
+
+
+def _run_fold(args):
+    """Trains on train_seasons (rows past the early-season cut) and scores every row of test_season."""
+    model_name, params, train_seasons, test_season, min_games = args
+    X, y, season, gp = _shared['X'], _shared['y'], _shared['season'], _shared['games_played']
+    train = np.isin(season, train_seasons) & (gp > min_games)
+    test = season == test_season
+
+    start = time.perf_counter()
+    model = build_estimator(model_name, params)
+    model.fit(X[train], y[train])
+    prob = np.clip(model.predict_proba(X[test])[:, 1], EPS, 1 - EPS)
+    return {
+        'season_id': int(test_season),
+        'train_seasons': [int(s) for s in train_seasons],
+        'games_played': gp[test].astype(int),
+        'y': y[test].astype(int),
+        'prob': prob,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def make_splits(seasons, mode='loso', min_train=MIN_TRAIN_SEASONS):
+    """(train_seasons, test_season) pairs: leave-one-season-out or rolling origin (past seasons only)."""
+    seasons = sorted(seasons)
+    if mode == 'loso':
+        return [([s for s in seasons if s != test], test) for test in seasons]
+    if mode == 'rolling':
+        return [(seasons[:i], seasons[i]) for i in range(min_train, len(seasons))]
+    raise ValueError(f"Unknown backtest mode '{mode}'")
+
+
+def scores(y, prob):
+    """Accuracy, log-loss and Brier score for one set of predictions."""
+    if len(y) == 0:
+        return {'n': 0, 'accuracy': None, 'log_loss': None, 'brier': None}
+    return {
+        'n': int(len(y)),
+        'accuracy': float(np.mean((prob > 0.5) == y)),
+        'log_loss': float(-np.mean(y * np.log(prob) + (1 - y) * np.log(1 - prob))),
+        'brier': float(np.mean((prob - y) ** 2)),
+    }
+
+
+def summarize(folds):
+    """Overall, per-season, per games_played bucket and calibration tables from the fold outputs."""
+    gp = np.concatenate([f['games_played'] for f in folds])
+    y = np.concatenate([f['y'] for f in folds])
+    prob = np.concatenate([f['prob'] for f in folds])
+
+    by_games = []
+    for lo in range(0, int(gp.max()) + 1, GP_BUCKET):
+        mask = (gp >= lo) & (gp < lo + GP_BUCKET)
+        if mask.any():
+            row = scores(y[mask], prob[mask])
+            row.update(games_played=f"{lo}-{lo + GP_BUCKET - 1}",
+                       mean_prob=float(prob[mask].mean()), observed=float(y[mask].mean()))
+            by_games.append(row)
+
+    calibration = []
+    bins = np.minimum((prob * CALIBRATION_BINS).astype(int), CALIBRATION_BINS - 1)
+    for b in range(CALIBRATION_BINS):
+        mask = bins == b
+        if mask.any():
+            calibration.append({
+                'bin': f"{b / CALIBRATION_BINS:.1f}-{(b + 1) / CALIBRATION_BINS:.1f}",
+                'n': int(mask.sum()),
+                'mean_prob': float(prob[mask].mean()),
+                'observed': float(y[mask].mean()),
+            })
+
+    return {
+        'overall': scores(y, prob),
+        'by_season': [dict(scores(f['y'], f['prob']), season_id=f['season_id'], seconds=round(f['seconds'], 2))
+                      for f in folds],
+        'by_games_played': by_games,
+        'calibration': calibration,
+    }
+
+
+def backtest(model_name=DEFAULT_MODEL, params=None, mode='loso', workers=None, min_games=MIN_GAMES_PLAYED,
+             refresh=False):
+    """Season-grouped backtest over the snapshot store; folds run in a process pool."""
+    params = DEFAULT_PARAMS.get(model_name, {}) if params is None else params
+    df = load_training_frame(min_games=-1, refresh=refresh)
+    if df.empty:
+        print("No labelled snapshots found. Run 'python -m etl.update_history' first.")
+        return None
+
+    X = feature_matrix(df).to_numpy()
+    y = df['made_playoffs'].astype(np.int8).to_numpy()
+    season = df['season_id'].to_numpy()
+    games_played = df['games_played'].to_numpy()
+    splits = make_splits(np.unique(season).tolist(), mode)
+    if not splits:
+        print(f"Not enough seasons for a {mode} backtest.")
+        return None
+
+    # Features are computed once and handed to the workers as memory-mapped files
+    data_dir = tempfile.mkdtemp(prefix='backtest_')
+    try:
+        for name, arr in (('X', X), ('y', y), ('season', season), ('games_played', games_played)):
+            np.save(os.path.join(data_dir, f"{name}.npy"), arr)
+        jobs = [(model_name, params, train, test, min_games) for train, test in splits]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_dir,)) as pool:
+            folds = list(pool.map(_run_fold, jobs))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    result = summarize(folds)
+    result.update(model=model_name, params=params, mode=mode)
+    return result
+
+
+def _fmt(v):
+    return f"{v:.4f}" if v is not None else "   -  "
+
+
+def print_report(result):
+    o = result['overall']
+    print(f"\n{result['mode'].upper()} backtest of {result['model']} {result['params']}")
+    print(f"Overall: {o['n']} snapshots | acc {_fmt(o['accuracy'])} | log-loss {_fmt(o['log_loss'])} | brier {_fmt(o['brier'])}")
+
+    print(f"\n{'Season':<10} | {'Rows':>6} | {'Acc':<7} | {'LogLoss':<7} | {'Secs':>5}")
+    print("-" * 48)
+    for r in result['by_season']:
+        print(f"{r['season_id']:<10} | {r['n']:>6} | {_fmt(r['accuracy'])} | {_fmt(r['log_loss'])} | {r['seconds']:>5.1f}")
+
+    print(f"\n{'GP':<8} | {'Rows':>6} | {'Acc':<7} | {'LogLoss':<7} | {'Pred':<6} | {'Actual':<6}")
+    print("-" * 56)
+    for r in result['by_games_played']:
+        print(f"{r['games_played']:<8} | {r['n']:>6} | {_fmt(r['accuracy'])} | {_fmt(r['log_loss'])} | "
+              f"{r['mean_prob']:.3f}  | {r['observed']:.3f}")
+
+    print(f"\n{'Prob bin':<9} | {'Rows':>6} | {'Pred':<6} | {'Actual':<6}")
+    print("-" * 36)
+    for r in result['calibration']:
+        print(f"{r['bin']:<9} | {r['n']:>6} | {r['mean_prob']:.3f}  | {r['observed']:.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Season-grouped backtest of the playoff model.")
+    parser.add_argument("--mode", choices=["loso", "rolling"], default="loso",
+                        help="loso = leave one season out, rolling = train only on earlier seasons")
+    parser.add_argument("--model", choices=["lr", "rf", "xgb", "ensemble"], default=DEFAULT_MODEL)
+    parser.add_argument("--params", type=json.loads, default=None, help='Estimator params as JSON, e.g. \'{"max_depth": 6}\'')
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: one per CPU)")
+    parser.add_argument("--refresh-data", action="store_true", help="Re-pull every season whose rows changed into the snapshot store first")
+    parser.add_argument("--output", default=None, help="Write the full report as JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = backtest(args.model, args.params, args.mode, args.workers, refresh=args.refresh_data)
+    if result:
+        print_report(result)
+        print(f"\nBacktest finished in {time.perf_counter() - start:.1f}s")
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(result, f, indent=2)
+            print(f"Report written to {args.output}")
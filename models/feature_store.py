@@ -0,0 +1,153 @@
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from database.db_utils import execute_sql_file, get_connection, notify_standings_updated
+from metrics import timed_write
+from models.features import STORED_FEATURES
+
+# CONFIG
+FEATURE_STORE_SQL = os.path.join(parent_dir, "database", "feature_store.sql")
+TREND_DAYS = 21             # Trailing window of gd_trend / form_delta (calendar days, so any snapshot grid works)
+PLAYOFF_SPOTS = 8           # Per conference; the last one is the cutline
+GAMES_PER_SEASON = 82       # Pace scale only, so short seasons are not special-cased
+
+# A season's snapshots from `start` on, plus the last one before it (the trailing window's anchor)
+SEASON_ROWS_QUERY = """
+    SELECT ds.date, ds.season_id, ds.team_id, t.conference, ds.games_played, ds.points,
+           ds.goals_for, ds.goals_against
+    FROM daily_standings ds
+    JOIN teams t ON t.team_id = ds.team_id
+    WHERE ds.season_id = %(season)s
+      AND ds.date >= COALESCE(
+        (SELECT max(date) FROM daily_standings WHERE season_id = %(season)s AND date <= %(anchor)s),
+        %(anchor)s
+      )
+    ORDER BY ds.date, ds.team_id;
+"""
+SEASON_COLUMNS = ["date", "season_id", "team_id", "conference", "games_played", "points", "goals_for", "goals_against"]
+
+
+def _ratio(num, den):
+    num = np.asarray(num, dtype=np.float64)
+    den = np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+
+def compute_features(df, trend_days=TREND_DAYS, playoff_spots=PLAYOFF_SPOTS):
+    """
+    Trend features for daily_standings-shaped rows (date, season_id, team_id, conference,
+    games_played, points, goals_for, goals_against), all teams of each date included.
+    Window and cross-team operations only, no per-team loops. Returns date, season_id,
+    team_id plus STORED_FEATURES.
+    """
+    df = df.sort_values(["date", "team_id"], kind="stable").reset_index(drop=True)
+    df["date"] = pd.to_datetime(df["date"]).astype("datetime64[ns]")
+    df["goal_diff"] = df["goals_for"].astype(np.float64) - df["goals_against"]
+    df["points_pct"] = _ratio(df["points"], 2 * df["games_played"])
+
+    # Each team's snapshot at the start of its trailing window; before the season's first
+    # snapshot that is the zero record, so early rows trend over the season so far
+    df["anchor"] = (df["date"] - pd.Timedelta(days=trend_days)).astype("datetime64[ns]")
+    past = df[["date", "season_id", "team_id", "games_played", "points", "goal_diff"]]
+    prev = pd.merge_asof(
+        df[["anchor", "season_id", "team_id"]], past, left_on="anchor", right_on="date",
+        by=["season_id", "team_id"], direction="backward",
+    )
+    games = df["games_played"] - prev["games_played"].fillna(0).to_numpy()
+    window_points = df["points"] - prev["points"].fillna(0).to_numpy()
+    df["gd_trend"] = _ratio(df["goal_diff"] - prev["goal_diff"].fillna(0).to_numpy(), games)
+    df["form_delta"] = np.where(games > 0, _ratio(window_points, 2 * games) - df["points_pct"], 0.0)
+
+    # Conference cutline per snapshot: the points % of the team in the last playoff spot
+    ranked = df.sort_values(["season_id", "date", "conference", "points_pct"], ascending=[True, True, True, False],
+                            kind="stable")
+    rank = ranked.groupby(["season_id", "date", "conference"], dropna=False).cumcount()
+    size = ranked.groupby(["season_id", "date", "conference"], dropna=False)["team_id"].transform("size")
+    cut = ranked[rank == np.minimum(size, playoff_spots) - 1][["season_id", "date", "conference", "points_pct"]]
+    cut = cut.rename(columns={"points_pct": "cutline_pct"})
+    df = df.merge(cut, on=["season_id", "date", "conference"], how="left")
+    df["pace_vs_cutline"] = (df["points_pct"] - df["cutline_pct"].fillna(df["points_pct"])) * 2 * GAMES_PER_SEASON
+
+    df["date"] = df["date"].dt.date
+    return df[["date", "season_id", "team_id"] + STORED_FEATURES]
+
+
+def write_features(cur, df):
+    """Upserts computed feature rows in one statement. Returns the rows written."""
+    if df.empty:
+        return 0
+    sql = f"""
+        INSERT INTO daily_features (date, season_id, team_id, {", ".join(STORED_FEATURES)})
+        VALUES %s
+        ON CONFLICT (date, team_id) DO UPDATE SET
+            season_id = EXCLUDED.season_id,
+            {", ".join(f"{c} = EXCLUDED.{c}" for c in STORED_FEATURES)},
+            computed_at = now();
+    """
+    rows = list(zip(df["date"], df["season_id"].tolist(), df["team_id"].tolist(),
+                    *(df[c].astype(np.float64).tolist() for c in STORED_FEATURES)))
+    with timed_write("daily_features", len(rows)):
+        execute_values(cur, sql, rows, page_size=len(rows))
+    return len(rows)
+
+
+def refresh_features(cur, season_id, dates=None):
+    """
+    Recomputes daily_features for one season; call in the transaction that wrote its
+    standings. With dates, only snapshots on/after the earliest one are rewritten (later
+    windows may look back over it), reading just TREND_DAYS of history before it.
+    Returns the sorted snapshot dates whose features were written.
+    """
+    start = min(date.fromisoformat(str(d)) for d in dates) if dates else date.min
+    anchor = start - timedelta(days=TREND_DAYS) if dates else date.min
+    cur.execute(SEASON_ROWS_QUERY, {"season": season_id, "anchor": anchor})
+    df = pd.DataFrame(cur.fetchall(), columns=SEASON_COLUMNS)
+    if df.empty:
+        return []
+    features = compute_features(df)
+    features = features[features["date"] >= start]
+    write_features(cur, features)
+    return sorted(set(features["date"]))
+
+
+def rebuild(seasons=None, recreate=False):
+    """Recomputes the feature store for every stored season."""
+    if recreate:
+        execute_sql_file(FEATURE_STORE_SQL)
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT DISTINCT season_id FROM daily_standings ORDER BY season_id")
+        stored = [r[0] for r in cur.fetchall()]
+        for season_id in stored:
+            if seasons and season_id not in seasons:
+                continue
+            start = time.perf_counter()
+            dates = refresh_features(cur, season_id)
+            conn.commit()
+            print(f"  {season_id}: features for {len(dates)} snapshots in {(time.perf_counter() - start) * 1000:.0f} ms")
+        notify_standings_updated(cur, "features")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute the daily_features trend feature store from daily_standings.")
+    parser.add_argument("--season", type=int, action="append", help="Only this season (repeatable)")
+    parser.add_argument("--rebuild", action="store_true", help="Drop and recreate the daily_features table first")
+    args = parser.parse_args()
+    print("--- Refreshing feature store ---")
+    rebuild(seasons=args.season, recreate=args.rebuild)
@@ -0,0 +1,143 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# Feature schema shared by training (models/train.py) and serving (backend/routers/nhl.py).
+# Order matters: the model is fitted on columns in exactly this order. New features are only
+# ever appended, so a model trained on an older schema scores on the first n columns.
+ROW_FEATURE_SCHEMA = [
+    ("games_played", "float64", "Games played so far"),
+    ("points", "float64", "Standings points"),
+    ("win_pct", "float64", "wins / games_played (0 before the first game)"),
+    ("goal_diff", "float64", "goals_for - goals_against"),
+    ("points_win_interaction", "float64", "points * win_pct"),
+    ("l10_pct", "float64", "Points in last 10 games / 20 (max possible)"),
+    ("streak_numeric", "float64", "Streak length, positive for W, negative for L/OT"),
+]
+# Trend features, precomputed per snapshot in daily_features (models/feature_store.py)
+TREND_FEATURE_SCHEMA = [
+    ("gd_trend", "float64", "Goal differential per game over the trailing window"),
+    ("form_delta", "float64", "Points % over the trailing window minus season points %"),
+    ("pace_vs_cutline", "float64", "Season points pace minus that of the conference's last playoff spot"),
+]
+FEATURE_SCHEMA = ROW_FEATURE_SCHEMA + TREND_FEATURE_SCHEMA
+FEATURES = [name for name, _, _ in FEATURE_SCHEMA]
+ROW_FEATURES = [name for name, _, _ in ROW_FEATURE_SCHEMA]
+STORED_FEATURES = [name for name, _, _ in TREND_FEATURE_SCHEMA]
+
+# Raw daily_standings columns the row features are derived from, plus the stored trend features
+STANDINGS_COLUMNS = ['games_played', 'wins', 'points', 'goals_for', 'goals_against', 'l10_points', 'streak_code', 'streak_count']
+SOURCE_COLUMNS = STANDINGS_COLUMNS + STORED_FEATURES
+
+
+def win_pct(wins, games_played):
+    wins = np.asarray(wins, dtype=np.float64)
+    games_played = np.asarray(games_played, dtype=np.float64)
+    # Avoid division by zero
+    return np.divide(wins, games_played, out=np.zeros_like(wins), where=games_played > 0)
+
+
+def goal_diff(goals_for, goals_against):
+    return np.asarray(goals_for, dtype=np.float64) - np.asarray(goals_against, dtype=np.float64)
+
+
+def points_win_interaction(points, win_pct_values):
+    return np.asarray(points, dtype=np.float64) * win_pct_values
+
+
+def l10_pct(l10_points):
+    # Normalize L10 Points (Max is 20 points in 10 games)
+    return np.asarray(l10_points, dtype=np.float64) / 20.0
+
+
+def streak_numeric(streak_code, streak_count):
+    # W = Positive, L/OT = Negative, anything else = 0
+    code = np.asarray(streak_code, dtype=object)
+    count = np.asarray(streak_count, dtype=np.float64)
+    return np.select([code == 'W', (code == 'L') | (code == 'OT')], [count, -count], 0.0)
+
+
+def add_features(df):
+    """Adds every FEATURES column to a frame of SOURCE_COLUMNS (in place) and returns it."""
+    df['win_pct'] = win_pct(df['wins'], df['games_played'])
+    df['goal_diff'] = goal_diff(df['goals_for'], df['goals_against'])
+    df['points_win_interaction'] = points_win_interaction(df['points'], df['win_pct'].to_numpy())
+    df['l10_pct'] = l10_pct(df['l10_points'])
+    df['streak_numeric'] = streak_numeric(df['streak_code'], df['streak_count'])
+    for name in STORED_FEATURES:
+        # Read as-is; snapshots without a daily_features row score them as 0
+        if name not in df:
+            df[name] = np.nan
+    return df
+
+
+def feature_matrix(df):
+    """Adds features and returns the model input frame, in schema order with NaN/inf zeroed."""
+    add_features(df)
+    X = df[FEATURES].astype(np.float64)
+    values = X.to_numpy()
+    values[~np.isfinite(values)] = 0.0
+    return pd.DataFrame(values, columns=FEATURES, index=df.index)
+
+
+def _rowwise_features(df):
+    """The original df.apply implementation, kept only as the parity/benchmark reference."""
+    df = df.copy()
+    df['goal_diff'] = df['goals_for'] - df['goals_against']
+    df['win_pct'] = df.apply(lambda x: x['wins'] / x['games_played'] if x['games_played'] > 0 else 0, axis=1)
+    df['points_win_interaction'] = df['points'] * df['win_pct']
+    df['l10_pct'] = df['l10_points'] / 20.0
+
+    def calculate_streak(row):
+        code = row['streak_code']
+        count = row['streak_count']
+        if code == 'W': return count
+        if code in ['L', 'OT']: return -count
+        return 0
+
+    df['streak_numeric'] = df.apply(calculate_streak, axis=1)
+    X = df[ROW_FEATURES].copy()
+    X.fillna(0, inplace=True)
+    X.replace([np.inf, -np.inf], 0, inplace=True)
+    return X.astype(np.float64)
+
+
+def synthetic_standings(n, seed=0):
+    """Random daily_standings-shaped rows for benchmarking."""
+    rng = np.random.default_rng(seed)
+    gp = rng.integers(0, 83, n)
+    wins = (gp * rng.uniform(0.25, 0.7, n)).astype(int)
+    return pd.DataFrame({
+        'games_played': gp,
+        'wins': wins,
+        'points': wins * 2 + rng.integers(0, 10, n),
+        'goals_for': rng.integers(0, 300, n),
+        'goals_against': rng.integers(0, 300, n),
+        'l10_points': rng.integers(0, 21, n),
+        'streak_code': rng.choice(np.array(['W', 'L', 'OT', None], dtype=object), n),
+        'streak_count': rng.integers(0, 10, n),
+    })
+
+
+def benchmark(n_rows):
+    df = synthetic_standings(n_rows)
+
+    start = time.perf_counter()
+    fast = feature_matrix(df.copy())
+    fast_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    slow = _rowwise_features(df)
+    slow_s = time.perf_counter() - start
+
+    np.testing.assert_allclose(fast[ROW_FEATURES].to_numpy(), slow.to_numpy())
+    print(f"{n_rows:,} rows: vectorized {fast_s * 1000:.1f} ms | row-wise {slow_s * 1000:.1f} ms | {slow_s / fast_s:.0f}x faster (outputs match)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parity check and micro-benchmark for the feature pipeline.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    benchmark(args.rows)
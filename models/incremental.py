@@ -0,0 +1,106 @@
+import os
+import sys
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+from sklearn.metrics import accuracy_score, log_loss, roc_auc_score
+from sklearn.pipeline import Pipeline
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from models.predictions import predict_playoff_probs
+from models.search import build_estimator
+
+try:
+    from xgboost import XGBClassifier
+    XGB_AVAILABLE = True
+except Exception:
+    XGB_AVAILABLE = False
+
+# CONFIG
+DRIFT_TOLERANCE = 0.03    # Full search when accuracy on unseen rows drops this far below the model's CV accuracy
+MIN_DRIFT_ROWS = 200      # Fewer unseen rows than this are too noisy to judge; warm-start regardless
+WARM_TREES = 25           # Trees added to a random forest per refresh
+WARM_ROUNDS = 25          # Boosting rounds added to XGBoost per refresh
+MAX_GROWTH = 2.0          # A tree model this many times its searched size is refit from scratch instead
+
+
+def data_summary(df):
+    """What a model was trained on, kept in its registry manifest: labelled rows per season."""
+    counts = df.groupby("season_id").size()
+    return {"rows": int(len(df)), "seasons": {str(int(s)): int(n) for s, n in counts.items()}}
+
+
+def changed_seasons(df, summary):
+    """Seasons whose labelled rows differ from a data_summary (new outcomes, backfilled snapshots)."""
+    current = data_summary(df)["seasons"]
+    return sorted(int(s) for s, n in current.items() if summary["seasons"].get(s) != n)
+
+
+def drift_check(model, X, y, baseline_accuracy, tolerance=DRIFT_TOLERANCE):
+    """Scores a fitted model on rows it has not seen against the CV accuracy it was selected with."""
+    prob = predict_playoff_probs(model, X)
+    accuracy = float(accuracy_score(y, prob > 0.5))
+    return {
+        "rows": int(len(y)),
+        "accuracy": accuracy,
+        "log_loss": float(log_loss(y, prob, labels=[0, 1])),
+        "roc_auc": float(roc_auc_score(y, prob)) if len(np.unique(y)) > 1 else None,
+        "baseline_accuracy": baseline_accuracy,
+        "drifted": len(y) >= MIN_DRIFT_ROWS and accuracy < baseline_accuracy - tolerance,
+    }
+
+
+def _searched_size(family, params, member):
+    member_params = params.get(member, {}) if family == "ensemble" else params
+    return member_params.get("n_estimators", 100)
+
+
+def _grow(est, X, y):
+    """Continues training one fitted estimator on (X, y) in place."""
+    if isinstance(est, Pipeline):
+        # Scaler refits (cheap); lbfgs restarts from the previous coefficients
+        est.set_params(clf__warm_start=True)
+        est.fit(X, y)
+    elif isinstance(est, RandomForestClassifier):
+        # Existing trees are kept; only the new ones see the added rows
+        est.set_params(warm_start=True, n_estimators=len(est.estimators_) + WARM_TREES, n_jobs=-1)
+        est.fit(X, y)
+    elif XGB_AVAILABLE and isinstance(est, XGBClassifier):
+        booster = est.get_booster()
+        est.set_params(n_estimators=WARM_ROUNDS, n_jobs=-1)
+        est.fit(X, y, xgb_model=booster)
+        est.set_params(n_estimators=est.get_booster().num_boosted_rounds())
+    else:
+        raise ValueError(f"Cannot warm-start {type(est).__name__}")
+
+
+def _size(est):
+    if isinstance(est, RandomForestClassifier):
+        return len(est.estimators_)
+    if XGB_AVAILABLE and isinstance(est, XGBClassifier):
+        return est.get_booster().num_boosted_rounds()
+    return None
+
+
+def warm_start(model, family, params, X, y):
+    """
+    Updates a fitted model with new data instead of searching again: random forests get
+    WARM_TREES more trees, XGBoost WARM_ROUNDS more boosting rounds on top of its booster,
+    logistic regression restarts from its coefficients. Ensemble members are updated in
+    place (VotingClassifier.fit would clone them). Once a tree model reaches MAX_GROWTH x
+    its searched size, the model is refit from scratch with the searched params so repeated
+    refreshes don't grow it without bound. Returns (model, warm) with warm=False on a refit.
+    """
+    members = dict(model.named_estimators_) if isinstance(model, VotingClassifier) else {family: model}
+    for name, est in members.items():
+        size = _size(est)
+        if size is not None and size + WARM_TREES > MAX_GROWTH * _searched_size(family, params, name):
+            print(f"  {name} has {size} trees/rounds; refitting with the searched params")
+            return build_estimator(family, params, n_jobs=-1).fit(X, y), False
+    for name, est in members.items():
+        _grow(est, X, y)
+    return model, True
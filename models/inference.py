@@ -0,0 +1,422 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+# Deliberately light: only numpy is imported at module load. sklearn/joblib/xgboost
+# are imported lazily, and only when a model has to be compiled from the pickle.
+
+MODEL_PATH = os.path.join(parent_dir, 'models', 'playoff_predictor.pkl')
+COMPILED_PATH = os.path.join(parent_dir, 'models', 'playoff_predictor.npz')
+PARITY_ATOL = 1e-6
+
+_version_memo = {}  # (path, mtime_ns, size) -> content hash
+
+
+def model_version(path=MODEL_PATH):
+    """Content hash of the model artifact (memoized per mtime/size), or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (path, st.st_mtime_ns, st.st_size)
+    if key not in _version_memo:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        _version_memo.clear()
+        _version_memo[key] = h.hexdigest()[:16]
+    return _version_memo[key]
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+class LinearComponent:
+    """StandardScaler (optional) + binary LogisticRegression."""
+    kind = "linear"
+
+    def __init__(self, mean, scale, coef, intercept):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+
+    def positive_proba(self, X):
+        return _sigmoid(((X - self.mean) / self.scale) @ self.coef + self.intercept)
+
+    def arrays(self):
+        return {"mean": self.mean, "scale": self.scale, "coef": self.coef, "intercept": np.array(self.intercept)}
+
+    @classmethod
+    def from_arrays(cls, a):
+        return cls(a["mean"], a["scale"], a["coef"], a["intercept"])
+
+
+class TreeEnsembleComponent:
+    """Every tree of a forest/booster flattened into shared node arrays.
+
+    Leaves point at themselves, so walking `depth` steps from each root lands
+    every row on its leaf without any per-row branching.
+    mode="mean": average leaf probabilities (RandomForest, X <= threshold goes left).
+    mode="logit": sigmoid(base_margin + sum of leaf values) (XGBoost, X < threshold goes left).
+    """
+    kind = "trees"
+
+    def __init__(self, feature, threshold, left, right, leaf_value, roots, depth, mode, base_margin=0.0, children=None):
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.leaf_value = np.asarray(leaf_value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.depth = int(depth)
+        self.mode = str(mode)
+        self.base_margin = float(base_margin)
+        # Interleaved [left, right] per node so one take() picks the branch (stored, so a
+        # memory-mapped load stays zero-copy)
+        if children is None:
+            children = np.column_stack([self.left, self.right]).astype(np.int64).ravel()
+        self.children = np.asarray(children, dtype=np.int64)
+
+    def leaves(self, X):
+        # Both libraries compare float32 features; match that exactly
+        X32 = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X32.shape
+        x_flat = X32.ravel()
+        row_base = (np.arange(n_rows, dtype=np.int64) * n_features)[:, None]
+        node = np.broadcast_to(self.roots.astype(np.int64), (n_rows, len(self.roots))).copy()
+        for _ in range(self.depth):
+            x = x_flat.take(row_base + self.feature.take(node))
+            threshold = self.threshold.take(node)
+            go_right = (x >= threshold) if self.mode == "logit" else (x > threshold)
+            next_node = self.children.take(node * 2 + go_right)
+            if np.array_equal(next_node, node):
+                break  # Every row already sits on a leaf
+            node = next_node
+        return node
+
+    def positive_proba(self, X):
+        values = self.leaf_value[self.leaves(X)]
+        if self.mode == "logit":
+            return _sigmoid(self.base_margin + values.sum(axis=1))
+        return values.mean(axis=1)
+
+    def arrays(self):
+        return {
+            "feature": self.feature, "threshold": self.threshold, "left": self.left, "right": self.right,
+            "leaf_value": self.leaf_value, "roots": self.roots, "depth": np.array(self.depth),
+            "mode": np.array(self.mode), "base_margin": np.array(self.base_margin), "children": self.children,
+        }
+
+    @classmethod
+    def from_arrays(cls, a):
+        return cls(a["feature"], a["threshold"], a["left"], a["right"], a["leaf_value"],
+                   a["roots"], a["depth"], a["mode"], a["base_margin"], a.get("children"))
+
+
+COMPONENT_TYPES = {c.kind: c for c in (LinearComponent, TreeEnsembleComponent)}
+
+
+class CompiledModel:
+    """Weighted soft vote over compiled components, with the sklearn predict_proba interface."""
+
+    def __init__(self, components, weights=None, n_features=None):
+        self.components = components
+        self.weights = np.ones(len(components)) if weights is None else np.asarray(weights, dtype=np.float64)
+        if n_features is None:
+            # Exports older than the feature count: a linear component still knows it
+            n_features = next((len(c.coef) for c in components if c.kind == "linear"), None)
+        self.n_features_in_ = n_features
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        probs = np.stack([c.positive_proba(X) for c in self.components], axis=1)
+        p1 = probs @ self.weights / self.weights.sum()
+        return np.column_stack([1.0 - p1, p1])
+
+    def to_arrays(self, version):
+        arrays = {"version": np.array(version), "weights": self.weights, "n_components": np.array(len(self.components))}
+        if self.n_features_in_ is not None:
+            arrays["n_features"] = np.array(self.n_features_in_)
+        for i, c in enumerate(self.components):
+            arrays[f"c{i}__kind"] = np.array(c.kind)
+            for name, value in c.arrays().items():
+                arrays[f"c{i}_{name}"] = value
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, data):
+        """Returns (CompiledModel, version) from a mapping of named arrays."""
+        components = []
+        for i in range(int(data["n_components"])):
+            prefix = f"c{i}_"
+            kind = str(data[prefix + "_kind"])
+            a = {k[len(prefix):]: data[k] for k in data.keys() if k.startswith(prefix) and k != prefix + "_kind"}
+            components.append(COMPONENT_TYPES[kind].from_arrays(a))
+        n_features = int(data["n_features"]) if "n_features" in data else None
+        return cls(components, data["weights"], n_features), str(data["version"])
+
+    def save(self, path, version):
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, **self.to_arrays(version))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Returns (CompiledModel, version)."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls.from_arrays({k: data[k] for k in data.files})
+
+    def save_dir(self, directory, version):
+        """One .npy per array, so load_dir can memory-map them (an .npz cannot be mapped)."""
+        os.makedirs(directory, exist_ok=True)
+        for name, value in self.to_arrays(version).items():
+            np.save(os.path.join(directory, f"{name}.npy"), value, allow_pickle=False)
+
+    @classmethod
+    def load_dir(cls, directory, mmap=True):
+        """Returns (CompiledModel, version). With mmap, every process maps the same page-cache copy."""
+        data = {}
+        for filename in os.listdir(directory):
+            if filename.endswith(".npy"):
+                data[filename[:-4]] = np.load(os.path.join(directory, filename), mmap_mode="r" if mmap else None,
+                                              allow_pickle=False)
+        return cls.from_arrays(data)
+
+
+# --- Compilation from fitted sklearn / xgboost estimators ---
+
+def _positive_index(est):
+    classes = list(getattr(est, "classes_", [0, 1]))
+    return classes.index(1) if 1 in classes else len(classes) - 1
+
+
+def _compile_linear(scaler, lr):
+    if lr.coef_.shape[0] != 1:
+        raise ValueError("Only binary LogisticRegression is supported")
+    n = lr.coef_.shape[1]
+    mean = np.zeros(n)
+    scale = np.ones(n)
+    if scaler is not None:
+        if getattr(scaler, "with_mean", True) and scaler.mean_ is not None:
+            mean = scaler.mean_
+        if getattr(scaler, "with_std", True) and scaler.scale_ is not None:
+            scale = scaler.scale_
+    coef, intercept = lr.coef_[0], lr.intercept_[0]
+    if _positive_index(lr) == 0:
+        coef, intercept = -coef, -intercept
+    return LinearComponent(mean, scale, coef, intercept)
+
+
+def _compile_forest(forest):
+    trees = getattr(forest, "estimators_", [forest])
+    pos = _positive_index(forest)
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset, depth = 0, 0
+    for est in trees:
+        t = est.tree_
+        n = t.node_count
+        idx = np.arange(n)
+        is_leaf = t.children_left < 0
+        counts = t.value[:, 0, :]
+        leaf_prob = counts[:, pos] / np.maximum(counts.sum(axis=1), 1e-300)
+        features.append(np.where(is_leaf, 0, t.feature))
+        thresholds.append(np.where(is_leaf, 0.0, t.threshold))
+        lefts.append(np.where(is_leaf, idx, t.children_left) + offset)
+        rights.append(np.where(is_leaf, idx, t.children_right) + offset)
+        values.append(leaf_prob)
+        roots.append(offset)
+        offset += n
+        depth = max(depth, t.max_depth)
+    return TreeEnsembleComponent(
+        np.concatenate(features), np.concatenate(thresholds).astype(np.float64),
+        np.concatenate(lefts), np.concatenate(rights), np.concatenate(values),
+        roots, depth, "mean"
+    )
+
+
+def _compile_xgboost(xgb):
+    booster = xgb.get_booster()
+    model = json.loads(bytes(booster.save_raw("json")))
+    learner = model["learner"]
+    objective = learner["objective"]["name"]
+    if objective != "binary:logistic":
+        raise ValueError(f"Unsupported XGBoost objective {objective}")
+    base_score = float(str(learner["learner_model_param"]["base_score"]).strip("[]"))
+    base_margin = np.log(base_score / (1.0 - base_score))
+
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset, depth = 0, 0
+    for tree in learner["gradient_booster"]["model"]["trees"]:
+        left = np.asarray(tree["left_children"])
+        right = np.asarray(tree["right_children"])
+        cond = np.asarray(tree["split_conditions"], dtype=np.float32)
+        n = len(left)
+        idx = np.arange(n)
+        is_leaf = left < 0
+        features.append(np.where(is_leaf, 0, np.asarray(tree["split_indices"])))
+        thresholds.append(np.where(is_leaf, np.float32(0), cond))
+        lefts.append(np.where(is_leaf, idx, left) + offset)
+        rights.append(np.where(is_leaf, idx, right) + offset)
+        # For leaves XGBoost stores the leaf weight in split_conditions
+        values.append(np.where(is_leaf, cond, 0.0).astype(np.float64))
+        roots.append(offset)
+        offset += n
+        depth = max(depth, _tree_depth(left, right))
+    return TreeEnsembleComponent(
+        np.concatenate(features), np.concatenate(thresholds).astype(np.float32),
+        np.concatenate(lefts), np.concatenate(rights), np.concatenate(values),
+        roots, depth, "logit", base_margin
+    )
+
+
+def _tree_depth(left, right):
+    depth, frontier = 0, [0]
+    while True:
+        frontier = [c for n in frontier for c in (left[n], right[n]) if c >= 0]
+        if not frontier:
+            return depth
+        depth += 1
+
+
+def _compile_estimator(est):
+    name = type(est).__name__
+    if name == "Pipeline":
+        steps = [s for _, s in est.steps if s is not None and s != "passthrough"]
+        scaler = None
+        if len(steps) == 2 and type(steps[0]).__name__ == "StandardScaler":
+            scaler, steps = steps[0], steps[1:]
+        if len(steps) != 1:
+            raise ValueError(f"Unsupported pipeline {est}")
+        if scaler is None:
+            return _compile_estimator(steps[0])
+        if type(steps[0]).__name__ != "LogisticRegression":
+            raise ValueError(f"Unsupported pipeline {est}")
+        return _compile_linear(scaler, steps[0])
+    if name == "LogisticRegression":
+        return _compile_linear(None, est)
+    if name in ("RandomForestClassifier", "ExtraTreesClassifier", "DecisionTreeClassifier"):
+        return _compile_forest(est)
+    if name == "XGBClassifier":
+        return _compile_xgboost(est)
+    raise ValueError(f"Unsupported estimator {name}")
+
+
+def compile_model(model):
+    """Converts a fitted estimator (incl. soft VotingClassifier) into a CompiledModel. Raises ValueError if unsupported."""
+    if type(model).__name__ == "VotingClassifier":
+        if model.voting != "soft":
+            raise ValueError("Only soft voting can be compiled")
+        components = [_compile_estimator(est) for est in model.estimators_]
+        return CompiledModel(components, model.weights, getattr(model, "n_features_in_", None))
+    return CompiledModel([_compile_estimator(model)], n_features=getattr(model, "n_features_in_", None))
+
+
+def parity_sample(n=2000, seed=0, n_features=None):
+    """Feature rows spanning realistic ranges, used to check compiled vs sklearn outputs."""
+    rng = np.random.default_rng(seed)
+    gp = rng.integers(0, 83, n).astype(np.float64)
+    win_pct = rng.uniform(0, 1, n)
+    points = np.round(gp * win_pct * 2 + rng.integers(0, 10, n))
+    X = np.column_stack([
+        gp, points, win_pct, rng.integers(-100, 101, n).astype(np.float64), points * win_pct,
+        rng.integers(0, 21, n) / 20.0, rng.integers(-10, 11, n).astype(np.float64),
+        rng.uniform(-2, 2, n), rng.uniform(-0.5, 0.5, n), rng.uniform(-50, 50, n),
+    ])
+    return X[:, :n_features]
+
+
+def check_parity(model, compiled, X=None):
+    """Max absolute difference between sklearn predict_proba and the compiled model."""
+    X = parity_sample(n_features=getattr(model, "n_features_in_", None)) if X is None else np.asarray(X, dtype=np.float64)
+    with warnings.catch_warnings():
+        # Fitted on a DataFrame, scored on an array: only a feature-name warning
+        warnings.simplefilter("ignore")
+        expected = model.predict_proba(X)[:, _positive_index(model)]
+    return float(np.max(np.abs(compiled.predict_proba(X)[:, 1] - expected)))
+
+
+def compile_checked(model):
+    """Compiles a fitted estimator and verifies parity. Returns (CompiledModel, max_diff) or (None, None)."""
+    try:
+        compiled = compile_model(model)
+    except ValueError as e:
+        print(f"Model cannot be compiled, serving will use sklearn: {e}")
+        return None, None
+    diff = check_parity(model, compiled)
+    if diff > PARITY_ATOL:
+        print(f"Compiled model disagrees with predict_proba (max diff {diff:.2e}), not exporting.")
+        return None, None
+    return compiled, diff
+
+
+def export_model(model, version, path=COMPILED_PATH):
+    """Compiles, verifies parity and saves the dependency-light artifact. Returns the CompiledModel or None."""
+    compiled, diff = compile_checked(model)
+    if compiled is None:
+        return None
+    compiled.save(path, version)
+    print(f"Exported compiled model to {path} (max diff {diff:.1e})")
+    return compiled
+
+
+def load_runtime_model(path=MODEL_PATH, compiled_path=COMPILED_PATH):
+    """Fastest available model for serving, as (model, version).
+
+    Prefers the exported .npz (numpy only). If it is missing or stale, the
+    pickle is loaded, compiled and re-exported; sklearn is the last resort.
+    """
+    version = model_version(path)
+    if version is None:
+        return None, None
+    if os.path.exists(compiled_path):
+        try:
+            compiled, compiled_version = CompiledModel.load(compiled_path)
+            if compiled_version == version:
+                return compiled, version
+        except Exception as e:
+            print(f"Could not read compiled model: {e}")
+
+    import joblib
+    model = joblib.load(path)
+    compiled = export_model(model, version, compiled_path)
+    return (compiled if compiled is not None else model), version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the trained model to the NumPy runtime and check parity.")
+    parser.add_argument("--rows", type=int, default=32, help="Batch size for the latency comparison")
+    args = parser.parse_args()
+
+    import joblib
+    version = model_version()
+    if version is None:
+        print(f"No model found at {MODEL_PATH}. Run 'python -m models.train' first.")
+        sys.exit(1)
+    model = joblib.load(MODEL_PATH)
+    compiled = export_model(model, version)
+    if compiled is None:
+        sys.exit(1)
+
+    X = parity_sample(args.rows, seed=1, n_features=getattr(model, "n_features_in_", None))
+    for label, fn in (("sklearn", model.predict_proba), ("compiled", compiled.predict_proba)):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            fn(X)
+            start = time.perf_counter()
+            for _ in range(20):
+                fn(X)
+        print(f"{label:>8}: {(time.perf_counter() - start) / 20 * 1000:.2f} ms per {args.rows}-row batch")
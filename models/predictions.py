@@ -0,0 +1,146 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from database.db_utils import get_connection, notify_standings_updated
+from metrics import timed_write
+from models.features import SOURCE_COLUMNS, STANDINGS_COLUMNS, STORED_FEATURES, feature_matrix
+from models.registry import REGISTRY_DIR, load_current
+
+CHUNK_SIZE = 50_000
+
+
+def load_model():
+    """Returns (model, version) of the current registry model, or (None, None) if none has been trained yet.
+
+    The model is the compiled NumPy runtime when the estimator supports it (see models/inference.py).
+    """
+    return load_current()
+
+
+def predict_playoff_probs(model, X):
+    """Probability of making the playoffs for each row of the feature matrix."""
+    n_features = getattr(model, "n_features_in_", None)
+    if n_features is not None and X.shape[1] > n_features:
+        # Trained before the schema grew: features are only appended, so it reads the first n
+        X = X.iloc[:, :n_features] if hasattr(X, "iloc") else X[:, :n_features]
+    if hasattr(model, "predict_proba"):
+        # predict_proba returns [prob_class_0, prob_class_1]
+        # We want prob_class_1 (Probability of making playoffs)
+        probs = model.predict_proba(X)[:, 1]
+    else:
+        probs = model.predict(X).astype(float)
+    return np.clip(probs, 0.0, 1.0)
+
+
+def write_predictions(cur, rows):
+    """Upserts (date, season_id, team_id, model_version, playoff_prob) rows in one statement."""
+    if not rows:
+        return 0
+    sql = """
+        INSERT INTO daily_predictions (date, season_id, team_id, model_version, playoff_prob)
+        VALUES %s
+        ON CONFLICT (date, team_id, model_version) DO UPDATE
+          SET playoff_prob = EXCLUDED.playoff_prob,
+              created_at = now();
+    """
+    with timed_write("daily_predictions", len(rows)):
+        execute_values(cur, sql, rows, page_size=len(rows))
+    return len(rows)
+
+
+def score_snapshots(conn, model, version, season_id=None, dates=None, rescore=False, chunk_size=CHUNK_SIZE):
+    """Scores daily_standings snapshots in vectorized chunks and stores them in daily_predictions.
+
+    By default only snapshots without a prediction for this model version are scored.
+    Commits once at the end; returns the number of rows written.
+    """
+    filters = []
+    params = {"version": version}
+    if season_id is not None:
+        filters.append("ds.season_id = %(season_id)s")
+        params["season_id"] = season_id
+    if dates:
+        filters.append("ds.date = ANY(%(dates)s::date[])")
+        params["dates"] = list(dates)
+    if not rescore:
+        filters.append("dp.team_id IS NULL")
+    where = ("WHERE " + " AND ".join(filters)) if filters else ""
+
+    query = f"""
+        SELECT ds.date, ds.season_id, ds.team_id,
+               {", ".join(["ds." + c for c in STANDINGS_COLUMNS] + ["fs." + c for c in STORED_FEATURES])}
+        FROM daily_standings ds
+        LEFT JOIN daily_features fs ON fs.date = ds.date AND fs.team_id = ds.team_id
+        LEFT JOIN daily_predictions dp
+          ON dp.date = ds.date AND dp.team_id = ds.team_id AND dp.model_version = %(version)s
+        {where}
+        ORDER BY ds.date, ds.team_id
+    """
+    columns = ['date', 'season_id', 'team_id'] + SOURCE_COLUMNS
+
+    # Named (server-side) cursor streams the rows so a full backfill never sits in memory at once
+    read_cur = conn.cursor(name="score_snapshots")
+    read_cur.itersize = chunk_size
+    read_cur.execute(query, params)
+    write_cur = conn.cursor()
+
+    total = 0
+    while True:
+        chunk = read_cur.fetchmany(chunk_size)
+        if not chunk:
+            break
+        df = pd.DataFrame(chunk, columns=columns)
+        probs = predict_playoff_probs(model, feature_matrix(df))
+        rows = list(zip(df['date'].tolist(), df['season_id'].tolist(), df['team_id'].tolist(),
+                        [version] * len(df), probs.tolist()))
+        total += write_predictions(write_cur, rows)
+    read_cur.close()
+    conn.commit()
+    return total
+
+
+def refresh_predictions(conn, season_id=None, dates=None, rescore=False):
+    """Scores newly written standings with the current model. Safe to call when no model exists."""
+    model, version = load_model()
+    if model is None:
+        print("No trained model yet, skipping predictions.")
+        return 0
+    try:
+        written = score_snapshots(conn, model, version, season_id=season_id, dates=dates, rescore=rescore)
+        print(f"Stored {written} predictions (model {version}).")
+        return written
+    except Exception as e:
+        print(f"Prediction refresh failed: {e}")
+        conn.rollback()
+        return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill daily_predictions for historical standings snapshots.")
+    parser.add_argument("--season", type=int, default=None, help="Only score this season_id (e.g. 20232024)")
+    parser.add_argument("--rescore", action="store_true", help="Re-score snapshots that already have a prediction for this model")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    model, version = load_model()
+    if model is None:
+        print(f"No model found in {REGISTRY_DIR}. Run 'python -m models.train' first.")
+        sys.exit(1)
+    conn = get_connection()
+    try:
+        written = score_snapshots(conn, model, version, season_id=args.season, rescore=args.rescore, chunk_size=args.chunk_size)
+        print(f"Backfill complete: {written} predictions stored for model {version}.")
+        notify_standings_updated(conn.cursor(), "predictions")
+        conn.commit()
+    finally:
+        conn.close()
@@ -0,0 +1,264 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import warnings
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from models.inference import CompiledModel, compile_checked, load_runtime_model, model_version, parity_sample
+
+# CONFIG
+REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", os.path.join(current_dir, "registry"))
+CURRENT_FILE = "CURRENT"          # Holds the active version; replaced atomically to publish or roll back
+KEEP_VERSIONS = 5                 # Older inactive versions are pruned on publish
+MODEL_POLL_SECONDS = 5            # How often serving processes look for a new CURRENT
+
+# Layout:
+#   registry/CURRENT                    active version id
+#   registry/<version>/manifest.json    feature schema, metrics, params, hashes
+#   registry/<version>/model.pkl        uncompressed joblib dump (memory-mappable)
+#   registry/<version>/compiled/*.npy   NumPy runtime arrays, one file each (memory-mappable)
+
+
+def version_dir(version, registry_dir=REGISTRY_DIR):
+    return os.path.join(registry_dir, version)
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def read_manifest(version, registry_dir=REGISTRY_DIR):
+    with open(os.path.join(version_dir(version, registry_dir), "manifest.json")) as f:
+        return json.load(f)
+
+
+def current_version(registry_dir=REGISTRY_DIR):
+    """Active registry version, or None if nothing has been published."""
+    try:
+        with open(os.path.join(registry_dir, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def active_version(registry_dir=REGISTRY_DIR):
+    """Version predictions are stored under: the registry's, else the legacy pickle's hash."""
+    return current_version(registry_dir) or model_version()
+
+
+def activate(version, registry_dir=REGISTRY_DIR):
+    """Points CURRENT at a published version (also used to roll back)."""
+    if not os.path.exists(os.path.join(version_dir(version, registry_dir), "manifest.json")):
+        raise ValueError(f"Unknown model version {version}")
+    tmp = os.path.join(registry_dir, f".{CURRENT_FILE}.tmp")
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(registry_dir, CURRENT_FILE))
+
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    """Manifests of every published version, newest first."""
+    if not os.path.isdir(registry_dir):
+        return []
+    manifests = []
+    for name in os.listdir(registry_dir):
+        if os.path.exists(os.path.join(registry_dir, name, "manifest.json")):
+            manifests.append(read_manifest(name, registry_dir))
+    return sorted(manifests, key=lambda m: m["created_at"], reverse=True)
+
+
+def prune(keep=KEEP_VERSIONS, registry_dir=REGISTRY_DIR):
+    """Deletes all but the newest `keep` versions, never the active one."""
+    active = current_version(registry_dir)
+    for manifest in list_versions(registry_dir)[keep:]:
+        if manifest["version"] != active:
+            shutil.rmtree(version_dir(manifest["version"], registry_dir), ignore_errors=True)
+
+
+def publish(model, name, metrics=None, params=None, data=None, parent=None, registry_dir=REGISTRY_DIR,
+            keep=KEEP_VERSIONS):
+    """
+    Writes a fitted model as a new immutable version and makes it current. The version
+    is the content hash of the pickle, so republishing an identical model is a no-op.
+    data describes the training rows (models/incremental.py); parent is the version a
+    warm-started model was updated from. Returns the version.
+    """
+    import joblib
+    from models.features import FEATURE_SCHEMA
+
+    os.makedirs(registry_dir, exist_ok=True)
+    staging = os.path.join(registry_dir, f".staging-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    try:
+        # Uncompressed so joblib.load(mmap_mode="r") can map the arrays instead of copying them
+        joblib.dump(model, os.path.join(staging, "model.pkl"))
+        sha = _sha256(os.path.join(staging, "model.pkl"))
+        version = sha[:16]
+        target = version_dir(version, registry_dir)
+        if not os.path.exists(target):
+            compiled, diff = compile_checked(model)
+            if compiled is not None:
+                compiled.save_dir(os.path.join(staging, "compiled"), version)
+            manifest = {
+                "version": version,
+                "name": name,
+                "estimator": type(model).__name__,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "features": [{"name": n, "dtype": d, "description": desc} for n, d, desc in FEATURE_SCHEMA],
+                "metrics": metrics or {},
+                "params": params or {},
+                "data": data,
+                "parent": parent,
+                "sha256": sha,
+                "compiled": compiled is not None,
+                "parity_max_diff": diff,
+            }
+            with open(os.path.join(staging, "manifest.json"), "w") as f:
+                json.dump(manifest, f, indent=2, default=str)
+            os.replace(staging, target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    activate(version, registry_dir)
+    prune(keep, registry_dir)
+    print(f"Published {name} as model version {version} ({target})")
+    return version
+
+
+def load(version=None, mmap=True, compiled=True, registry_dir=REGISTRY_DIR):
+    """
+    (model, manifest) for a version (default: current). Serves the compiled NumPy runtime
+    when the version has one (and compiled=True), else the sklearn pickle; both are memory-
+    mapped read-only by default, so every worker on the host shares one physical copy of
+    the arrays. Retraining loads the estimator itself with compiled=False, mmap=False.
+    """
+    version = version or current_version(registry_dir)
+    if version is None:
+        return None, None
+    path = version_dir(version, registry_dir)
+    manifest = read_manifest(version, registry_dir)
+    if compiled and manifest.get("compiled"):
+        model, _ = CompiledModel.load_dir(os.path.join(path, "compiled"), mmap=mmap)
+    else:
+        import joblib
+        model = joblib.load(os.path.join(path, "model.pkl"), mmap_mode="r" if mmap else None)
+    return model, manifest
+
+
+def load_current(registry_dir=REGISTRY_DIR):
+    """(model, version) of the active model: the registry's, else the legacy playoff_predictor.pkl."""
+    model, manifest = load(registry_dir=registry_dir)
+    if model is not None:
+        return model, manifest["version"]
+    return load_runtime_model()
+
+
+class LiveModel:
+    """
+    The serving model of a long-running process. A background thread follows CURRENT; a
+    new version is loaded and warmed off the request path, then swapped in with a single
+    reference assignment, so in-flight requests finish on the model they started with.
+    """
+
+    def __init__(self, poll_interval=MODEL_POLL_SECONDS, registry_dir=REGISTRY_DIR):
+        self.poll_interval = poll_interval
+        self.registry_dir = registry_dir
+        self.callbacks = []
+        self._active = (None, None)   # (model, version), replaced atomically
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def model(self):
+        return self._active[0]
+
+    @property
+    def version(self):
+        return self._active[1]
+
+    def get(self):
+        """(model, version) as one consistent pair."""
+        return self._active
+
+    def subscribe(self, callback):
+        """callback(version) runs on the watcher thread after each swap."""
+        self.callbacks.append(callback)
+
+    def check(self):
+        """Loads the active version if it differs from the one being served. Returns True on a swap."""
+        version = active_version(self.registry_dir)
+        if version is None or version == self.version:
+            return False
+        model, loaded_version = load_current(self.registry_dir)
+        if model is None:
+            return False
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            # Warm up before the first real request
+            model.predict_proba(parity_sample(32, n_features=getattr(model, "n_features_in_", None)))
+        previous = self.version
+        self._active = (model, loaded_version)
+        print(f"Serving model version {loaded_version} ({type(model).__name__})"
+              + (f", replacing {previous}" if previous else ""))
+        for callback in self.callbacks:
+            callback(loaded_version)
+        return True
+
+    def start(self):
+        """Loads the current model synchronously, then keeps watching in the background."""
+        try:
+            self.check()
+        except Exception as e:
+            print(f"Model load failed: {e}")
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="model-watch", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                # Keep serving the previous model; retried on the next poll
+                print(f"Model reload failed: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the model registry or roll back to an earlier version.")
+    parser.add_argument("--activate", metavar="VERSION", help="Make VERSION the current model")
+    args = parser.parse_args()
+
+    if args.activate:
+        activate(args.activate)
+        print(f"Current model is now {args.activate}; running APIs pick it up within {MODEL_POLL_SECONDS}s.")
+        sys.exit(0)
+
+    active = current_version()
+    versions = list_versions()
+    if not versions:
+        print(f"No models published in {REGISTRY_DIR}. Run 'python -m models.train' first.")
+    for m in versions:
+        marker = "*" if m["version"] == active else " "
+        scores = ", ".join(f"{k}={v:.4f}" for k, v in m["metrics"].items() if isinstance(v, (int, float)))
+        print(f"{marker} {m['version']}  {m['created_at']}  {m['name']:<25} {scores}"
+              + ("" if m["compiled"] else "  (sklearn)"))
@@ -0,0 +1,241 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from models.feature_store import GAMES_PER_SEASON
+from models.features import SOURCE_COLUMNS, STORED_FEATURES, feature_matrix
+from models.predictions import predict_playoff_probs
+from models.simulation import OT_RATE, home_win_probs, team_ratings
+
+# CONFIG
+MAX_GAMES = 16               # Games per request (4 ** 16 scenarios are summarised, never materialised)
+MAX_GAMES_PER_TEAM = 3       # Each team's 4 ** k outcome combinations are enumerated, so k stays small
+WINNER_GOALS = 3             # Assumed score of a scenario game: one-goal margin either way
+LOSER_GOALS = 2
+WINDOW_GAMES_ESTIMATE = 10   # Games in the trend window (21 days) when the caller doesn't pass window_games
+
+# A game ends in one of four ways; each maps to a (home, away) team result
+GAME_OUTCOMES = {
+    "home_win": ("W", "L"),
+    "home_win_ot": ("W", "OTL"),
+    "away_win_ot": ("OTL", "W"),
+    "away_win": ("L", "W"),
+}
+TEAM_RESULTS = ("W", "OTL", "L")
+STREAK_CODES = {"W": "W", "OTL": "OT", "L": "L"}
+
+
+def outcome_likelihoods(p_home):
+    """Probability of each GAME_OUTCOMES entry given the home side's win probability."""
+    return {
+        "home_win": p_home * (1 - OT_RATE),
+        "home_win_ot": p_home * OT_RATE,
+        "away_win_ot": (1 - p_home) * OT_RATE,
+        "away_win": (1 - p_home) * (1 - OT_RATE),
+    }
+
+
+def _points_pct(points, games_played):
+    return points / (2 * games_played) if games_played > 0 else 0.0
+
+
+def apply_results(team, results):
+    """
+    A team's SOURCE_COLUMNS after playing games with the given sequence of results.
+
+    The trend features are recomputed, not copied. The scenario games extend the team's trend
+    window (its start is kept), whose goal-difference and points totals are recovered from the
+    stored gd_trend / form_delta and team["window_games"] (games since the window's anchor
+    snapshot; WINDOW_GAMES_ESTIMATE when absent). pace_vs_cutline is measured against the
+    conference cutline implied by the stored value, held fixed: the other teams' results would
+    move it too, but each team is scored from its own row only.
+    """
+    row = {c: team[c] for c in SOURCE_COLUMNS}
+    for c in STORED_FEATURES:
+        # Missing features stay missing (the API sends None, feature_matrix expects NaN)
+        row[c] = np.nan if row[c] is None else row[c]
+    window = team.get("window_games")
+    window = min(row["games_played"], WINDOW_GAMES_ESTIMATE) if window is None else window
+    pct = _points_pct(row["points"], row["games_played"])
+    window_gd = row["gd_trend"] * window
+    window_points = (row["form_delta"] + pct) * 2 * window if window > 0 else 0.0
+    cutline = pct - row["pace_vs_cutline"] / (2 * GAMES_PER_SEASON)
+
+    for result in results:
+        won = result == "W"
+        points = 2 if won else (1 if result == "OTL" else 0)
+        # The game dropping out of the last 10 is unknown: remove an average one
+        dropped = row["l10_points"] / 10 if row["games_played"] >= 10 else 0
+        row["l10_points"] = min(20.0, max(0.0, row["l10_points"] - dropped + points))
+        row["games_played"] += 1
+        row["wins"] += int(won)
+        row["points"] += points
+        row["goals_for"] += WINNER_GOALS if won else LOSER_GOALS
+        row["goals_against"] += LOSER_GOALS if won else WINNER_GOALS
+        code = STREAK_CODES[result]
+        row["streak_count"] = row["streak_count"] + 1 if row["streak_code"] == code else 1
+        row["streak_code"] = code
+        window += 1
+        window_points += points
+        window_gd += (WINNER_GOALS - LOSER_GOALS) * (1 if won else -1)
+
+    if results:
+        # Same definitions as models/feature_store.compute_features
+        pct = _points_pct(row["points"], row["games_played"])
+        row["gd_trend"] = window_gd / window
+        row["form_delta"] = window_points / (2 * window) - pct
+        row["pace_vs_cutline"] = (pct - cutline) * 2 * GAMES_PER_SEASON
+    return row
+
+
+def check_games(games):
+    """Raises ValueError unless games is a set evaluate_scenarios can enumerate."""
+    if len(games) > MAX_GAMES:
+        raise ValueError(f"At most {MAX_GAMES} games per request")
+    seen, counts = set(), {}
+    for home, away, _ in games:
+        if (home, away) in seen:
+            raise ValueError(f"Duplicate game {away}@{home}")
+        seen.add((home, away))
+        for abbrev in (home, away):
+            counts[abbrev] = counts.get(abbrev, 0) + 1
+    crowded = sorted(a for a, n in counts.items() if n > MAX_GAMES_PER_TEAM)
+    if crowded:
+        raise ValueError(f"At most {MAX_GAMES_PER_TEAM} games per team, got more for {', '.join(crowded)}")
+
+
+def evaluate_scenarios(teams, games, model, model_probs=None):
+    """
+    What-if analysis of a set of pending games.
+
+    teams: {abbrev: standings row with SOURCE_COLUMNS}
+    games: [(home, away, fixed_outcome_or_None)]; a fixed outcome pins that game.
+    model_probs: {abbrev: current playoff_prob}, used to weigh outcomes as the simulator does.
+
+    The model scores each team from its own features only, so a team's odds in any of the
+    4 ** len(games) scenarios depend only on its own results. Every distinct (team, own
+    results) row is built once and the whole set is scored in a single predict_proba call;
+    expected odds, best/worst cases and per-game effects are then weighted sums over it.
+    Raises ValueError for sets check_games rejects.
+    """
+    check_games(games)
+    team_games = {}
+    for g, (home, away, _) in enumerate(games):
+        team_games.setdefault(home, []).append((g, 0))
+        team_games.setdefault(away, []).append((g, 1))
+    affected = list(team_games)
+
+    # One batch: each affected team's current row followed by all 3 ** k result sequences
+    rows, offsets = [], {}
+    for abbrev in affected:
+        offsets[abbrev] = len(rows)
+        rows.append(apply_results(teams[abbrev], ()))
+        for results in itertools.product(TEAM_RESULTS, repeat=len(team_games[abbrev])):
+            rows.append(apply_results(teams[abbrev], results))
+    probs = predict_playoff_probs(model, feature_matrix(pd.DataFrame(rows, columns=SOURCE_COLUMNS)))
+
+    # Outcome weights per game, from the same team strengths the season simulator uses
+    points = np.array([teams[a]["points"] for a in affected], dtype=np.float64)
+    gp = np.array([teams[a]["games_played"] for a in affected], dtype=np.float64)
+    seeded = model_probs and all(model_probs.get(a) is not None for a in affected)
+    ratings = team_ratings(points, gp, [model_probs[a] for a in affected] if seeded else None)
+    index = {a: i for i, a in enumerate(affected)}
+    p_home = home_win_probs(ratings, np.array([index[h] for h, _, _ in games]), np.array([index[a] for _, a, _ in games]))
+    weights = []
+    for (_, _, fixed), p in zip(games, p_home):
+        likelihood = outcome_likelihoods(float(p))
+        weights.append({o: float(o == fixed) for o in GAME_OUTCOMES} if fixed else likelihood)
+
+    team_summary, conditional = {}, {}
+    for abbrev in affected:
+        own = team_games[abbrev]
+        base = offsets[abbrev]
+        expected, best, worst = 0.0, -1.0, 2.0
+        given = {(g, o): [0.0, 0.0] for g, _ in own for o in GAME_OUTCOMES}   # (g, outcome) -> [sum w*p, sum w]
+        for combo in itertools.product(GAME_OUTCOMES, repeat=len(own)):
+            w = float(np.prod([weights[g][o] for (g, _), o in zip(own, combo)]))
+            # Base-3 position of this team's result sequence within its block of rows
+            pos = 0
+            for (g, side), o in zip(own, combo):
+                pos = pos * 3 + TEAM_RESULTS.index(GAME_OUTCOMES[o][side])
+            p = float(probs[base + 1 + pos])
+            expected += w * p
+            if w > 0:
+                best, worst = max(best, p), min(worst, p)
+            for (g, _), o in zip(own, combo):
+                given[(g, o)][0] += w * p
+                given[(g, o)][1] += w
+        team_summary[abbrev] = {
+            "abbrev": abbrev,
+            "current": float(probs[base]),
+            "expected": expected,
+            "best": best,
+            "worst": worst,
+            "games": len(own),
+        }
+        for (g, o), (wp, w) in given.items():
+            conditional[(abbrev, g, o)] = wp / w if w > 0 else None
+
+    game_summary = []
+    for g, (home, away, fixed) in enumerate(games):
+        outcomes = []
+        for o in GAME_OUTCOMES:
+            outcomes.append({
+                "outcome": o,
+                "likelihood": weights[g][o],
+                "playoff_prob": {home: conditional[(home, g, o)], away: conditional[(away, g, o)]},
+            })
+        swing = {}
+        for team in (home, away):
+            values = [c["playoff_prob"][team] for c in outcomes if c["playoff_prob"][team] is not None]
+            swing[team] = max(values) - min(values) if values else 0.0
+        game_summary.append({"home": home, "away": away, "fixed": fixed, "outcomes": outcomes, "swing": swing})
+
+    free = sum(1 for _, _, fixed in games if not fixed)
+    return {
+        "scenarios": 4 ** free,
+        "scored_rows": len(rows),
+        "games": game_summary,
+        "teams": sorted(team_summary.values(), key=lambda t: -(t["best"] - t["worst"])),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time a what-if evaluation on synthetic standings with the current model.")
+    parser.add_argument("--games", type=int, default=10)
+    args = parser.parse_args()
+
+    from models.registry import load_current
+    from models.simulation import synthetic_fixture
+
+    model, version = load_current()
+    if model is None:
+        print("No trained model yet. Run 'python -m models.train' first.")
+        sys.exit(1)
+    fixture, _ = synthetic_fixture()
+    rng = np.random.default_rng(0)
+    teams = {}
+    for t in fixture:
+        teams[t["abbrev"]] = dict(t, losses=0, goals_for=int(rng.integers(100, 160)), goals_against=int(rng.integers(100, 160)),
+                                  l10_points=int(rng.integers(4, 17)), streak_code="W", streak_count=1,
+                                  gd_trend=float(rng.normal(0, 1)), form_delta=float(rng.normal(0, 0.1)),
+                                  pace_vs_cutline=float(rng.normal(0, 8)), window_games=10)
+    order = rng.permutation(list(teams))
+    games = [(order[2 * i], order[2 * i + 1], None) for i in range(args.games)]
+
+    start = time.perf_counter()
+    result = evaluate_scenarios(teams, games, model)
+    elapsed = time.perf_counter() - start
+    print(f"{result['scenarios']:,} scenarios ({result['scored_rows']} scored rows) in {elapsed * 1000:.1f} ms")
+    for t in result["teams"][:8]:
+        print(f"  {t['abbrev']:<4} now {t['current']:6.1%}  expected {t['expected']:6.1%}  range {t['worst']:6.1%} - {t['best']:6.1%}")
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import ParameterGrid, StratifiedGroupKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+try:
+    from xgboost import XGBClassifier
+    XGB_AVAILABLE = True
+except Exception:
+    XGB_AVAILABLE = False
+
+# CONFIG
+CACHE_PATH = os.path.join(current_dir, 'search_cache.json')
+N_FOLDS = 5
+ETA = 3                   # Successive halving keeps the best 1/ETA candidates each round
+MIN_SAMPLES = 1_000       # Smallest training subsample used in the first halving round
+RANDOM_STATE = 42
+
+
+def build_estimator(name, params, n_jobs=1):
+    """Estimator for a model family and a JSON-serializable parameter dict."""
+    if name == 'lr':
+        return Pipeline([
+            ('scaler', StandardScaler()),
+            ('clf', LogisticRegression(C=1.0, penalty='l2', solver='lbfgs', max_iter=1000, random_state=RANDOM_STATE))
+        ])
+    if name == 'rf':
+        return RandomForestClassifier(random_state=RANDOM_STATE, n_jobs=n_jobs, **params)
+    if name == 'xgb':
+        return XGBClassifier(eval_metric='logloss', random_state=RANDOM_STATE, n_jobs=n_jobs, **params)
+    if name == 'ensemble':
+        members = [('lr', build_estimator('lr', {}))]
+        members += [(k, build_estimator(k, params[k], n_jobs)) for k in ('rf', 'xgb') if k in params]
+        return VotingClassifier(estimators=members, voting='soft', weights=params.get('weights'))
+    raise ValueError(f"Unknown model family '{name}'")
+
+
+def make_folds(y, groups, n_splits=N_FOLDS, seed=RANDOM_STATE):
+    """(train_idx, test_idx) pairs computed once and shared by every model family.
+
+    Rows are grouped by season so no season's snapshots land on both sides of a split (a
+    team's neighbouring snapshots are near-duplicates and would leak its label). Folds are
+    stratified across seasons and capped at the number of seasons available.
+    """
+    n_groups = len(np.unique(groups))
+    if n_groups < 2:
+        raise ValueError(f"Season-grouped CV needs at least 2 seasons, got {n_groups}")
+    sgkf = StratifiedGroupKFold(n_splits=min(n_splits, n_groups), shuffle=True, random_state=seed)
+    return [(train, test) for train, test in sgkf.split(np.zeros(len(y)), y, groups)]
+
+
+def data_fingerprint(X, y, folds):
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(X).tobytes())
+    h.update(np.ascontiguousarray(y).tobytes())
+    for _, test in folds:
+        h.update(test.tobytes())
+    return h.hexdigest()[:16]
+
+
+class FoldCache:
+    """Per-fold scores keyed by (family, params, fold, training size), persisted between runs.
+
+    Entries are only valid for the data/folds they were computed on, so the whole cache is
+    dropped when the fingerprint changes (e.g. after an ETL run adds snapshots). With path=None
+    the cache lives in memory only.
+    """
+
+    def __init__(self, fingerprint, path=CACHE_PATH):
+        self.fingerprint = fingerprint
+        self.path = path
+        self.results = {}
+        self.hits = 0
+        if path is None:
+            return
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data.get('fingerprint') == fingerprint:
+                self.results = data['results']
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def key(name, params, fold, n_samples):
+        return json.dumps([name, params, fold, n_samples], sort_keys=True)
+
+    def put(self, key, result):
+        self.results[key] = result
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'fingerprint': self.fingerprint, 'results': self.results}, f)
+        os.replace(tmp, self.path)
+
+
+def _fit_fold(name, params, X, y, train_idx, test_idx):
+    start = time.perf_counter()
+    model = build_estimator(name, params)
+    model.fit(X[train_idx], y[train_idx])
+    prob = model.predict_proba(X[test_idx])[:, 1]
+    y_test = y[test_idx]
+    return {
+        'accuracy': float(accuracy_score(y_test, prob > 0.5)),
+        'roc_auc': float(roc_auc_score(y_test, prob)) if len(np.unique(y_test)) > 1 else 0.0,
+        'fit_seconds': time.perf_counter() - start,
+    }
+
+
+def _subsample(train_idx, n_samples, fold):
+    """Deterministic subset of a fold's training rows (the halving 'resource')."""
+    if n_samples is None or n_samples >= len(train_idx):
+        return train_idx
+    rng = np.random.default_rng(RANDOM_STATE + fold)
+    return np.sort(rng.permutation(train_idx)[:n_samples])
+
+
+def evaluate(candidates, X, y, folds, cache, n_samples=None, n_jobs=-1, deadline=None):
+    """Mean CV scores for (name, params) candidates; only uncached folds are fitted (in parallel).
+
+    Candidates are fitted in worker-sized batches. Once the deadline (a time.perf_counter()
+    value) passes, no new batch starts and unscored candidates are left out of the result.
+    Returns (scores, number of new fits).
+    """
+    pending = []
+    for name, params in candidates:
+        missing = [i for i in range(len(folds)) if cache.key(name, params, i, n_samples) not in cache.results]
+        cache.hits += len(folds) - len(missing)
+        if missing:
+            pending.append((name, params, missing))
+
+    workers = (os.cpu_count() or 1) if n_jobs == -1 else n_jobs
+    batch = max(1, workers // len(folds))
+    fits = 0
+    # joblib memory-maps X/y once for the workers instead of copying them per task
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for start in range(0, len(pending), batch):
+            if fits and deadline is not None and time.perf_counter() > deadline:
+                break
+            keys, jobs = [], []
+            for name, params, missing in pending[start:start + batch]:
+                for i in missing:
+                    train, test = folds[i]
+                    keys.append(cache.key(name, params, i, n_samples))
+                    jobs.append(delayed(_fit_fold)(name, params, X, y, _subsample(train, n_samples, i), test))
+            for key, result in zip(keys, parallel(jobs)):
+                cache.put(key, result)
+            fits += len(jobs)
+    if fits:
+        cache.save()
+
+    scores = []
+    for name, params in candidates:
+        fold_results = [cache.results.get(cache.key(name, params, i, n_samples)) for i in range(len(folds))]
+        if None in fold_results:
+            continue
+        scores.append({
+            'name': name,
+            'params': params,
+            'accuracy': float(np.mean([r['accuracy'] for r in fold_results])),
+            'roc_auc': float(np.mean([r['roc_auc'] for r in fold_results])),
+            'n_samples': n_samples,
+        })
+    return scores, fits
+
+
+def successive_halving(name, param_grid, X, y, folds, cache, budget=None, n_jobs=-1):
+    """Evaluates every grid point on a small subsample, then keeps the top 1/ETA on ETA x more data.
+
+    Stops when the wall-clock budget (seconds) runs out; the best candidate of the last round
+    (among those scored before the deadline) wins.
+    """
+    start = time.perf_counter()
+    deadline = start + budget if budget else None
+    candidates = [(name, p) for p in ParameterGrid(param_grid)]
+    n_full = min(len(train) for train, _ in folds)
+    n_rounds = max(1, math.ceil(math.log(len(candidates), ETA)))
+    best, fits = None, 0
+    for r in range(n_rounds):
+        n_samples = max(MIN_SAMPLES, int(n_full / ETA ** (n_rounds - 1 - r)))
+        n_samples = None if n_samples >= n_full or r == n_rounds - 1 else n_samples
+        scores, n_fits = evaluate(candidates, X, y, folds, cache, n_samples, n_jobs, deadline)
+        fits += n_fits
+        if not scores:
+            break
+        scores.sort(key=lambda s: -s['accuracy'])
+        best = scores[0]
+        print(f"  {name} round {r + 1}/{n_rounds}: {len(scores)}/{len(candidates)} candidates on "
+              f"{n_samples or n_full} rows, best acc {best['accuracy']:.4f}")
+        if deadline is not None and time.perf_counter() > deadline:
+            print(f"  {name}: budget of {budget:.0f}s used, stopping after round {r + 1}")
+            break
+        candidates = [(s['name'], s['params']) for s in scores[:max(1, math.ceil(len(scores) / ETA))]]
+
+    if best['n_samples'] is not None:
+        # Make the winner's score comparable with the other families (full training folds)
+        scores, n_fits = evaluate([(best['name'], best['params'])], X, y, folds, cache, None, n_jobs)
+        best, fits = scores[0], fits + n_fits
+    return dict(best, fits=fits, seconds=time.perf_counter() - start)
+
+
+def random_search(name, param_grid, X, y, folds, cache, budget=None, n_candidates=None, n_jobs=-1, seed=RANDOM_STATE):
+    """Full-data CV over grid points in random order until the budget or n_candidates runs out.
+
+    With no budget and no n_candidates this is an exhaustive (but cached) grid search.
+    """
+    start = time.perf_counter()
+    grid = list(ParameterGrid(param_grid))
+    order = np.random.default_rng(seed).permutation(len(grid))[:n_candidates]
+    deadline = start + budget if budget else None
+    scores, fits = evaluate([(name, grid[j]) for j in order], X, y, folds, cache, None, n_jobs, deadline)
+    if len(scores) < len(order):
+        print(f"  {name}: budget of {budget:.0f}s used after {len(scores)}/{len(order)} candidates")
+    best = max(scores, key=lambda s: s['accuracy'])
+    return dict(best, fits=fits, seconds=time.perf_counter() - start)
+
+
+def search(name, param_grid, X, y, folds, cache, method='halving', budget=None, n_candidates=None, n_jobs=-1):
+    if method == 'halving':
+        return successive_halving(name, param_grid, X, y, folds, cache, budget=budget, n_jobs=n_jobs)
+    if method == 'random':
+        return random_search(name, param_grid, X, y, folds, cache, budget=budget, n_candidates=n_candidates, n_jobs=n_jobs)
+    if method == 'grid':
+        return random_search(name, param_grid, X, y, folds, cache, n_jobs=n_jobs)
+    raise ValueError(f"Unknown search method '{method}'")
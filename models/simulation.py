@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+# CONFIG
+DEFAULT_SIMS = 100_000
+CHUNK_SIMS = 1_000           # Simulations per batch; small enough for the batch to stay cache-resident
+OT_RATE = 0.23               # Share of NHL games decided in OT/shootout (loser still earns a point)
+HOME_ADVANTAGE = 0.15        # Home-ice edge on the logit scale (~54% for evenly matched teams)
+MODEL_RATING_SCALE = 0.2     # Maps logit(playoff prob) to a per-game logit strength
+POINTS_RATING_SCALE = 1.0    # Maps logit(points %) to a per-game logit strength
+DIVISION_SPOTS = 3           # Top 3 in each division qualify...
+WILD_CARDS = 2               # ...plus the next 2 best teams in each conference
+
+# Each game contributes points * RW_BASE + regulation_win, so one matrix product yields a
+# score that already sorts by points and then regulation wins (the first NHL tiebreaker).
+RW_BASE = 128.0
+
+
+def _logit(p):
+    return np.log(p / (1.0 - p))
+
+
+def team_ratings(points, games_played, model_probs=None):
+    """Per-game logit strength for each team, seeded from the model when its probabilities are available."""
+    if model_probs is not None:
+        p = np.clip(np.asarray(model_probs, dtype=np.float64), 0.02, 0.98)
+        return _logit(p) * MODEL_RATING_SCALE
+    gp = np.asarray(games_played, dtype=np.float64)
+    pct = np.divide(np.asarray(points, dtype=np.float64), 2 * gp, out=np.full(len(gp), 0.5), where=gp > 0)
+    return _logit(np.clip(pct, 0.2, 0.8)) * POINTS_RATING_SCALE
+
+
+def home_win_probs(ratings, home_idx, away_idx):
+    return 1.0 / (1.0 + np.exp(-(ratings[home_idx] - ratings[away_idx] + HOME_ADVANTAGE)))
+
+
+class SeasonSimulator:
+    """Batched Monte Carlo over the remaining schedule.
+
+    teams: n_teams arrays of current points, regulation-win proxy, conference and division labels.
+    games: home/away team indices for every remaining game.
+    """
+
+    def __init__(self, points, reg_wins, conferences, divisions, home_idx, away_idx, p_home):
+        n_teams = len(points)
+        self.n_teams = n_teams
+        self.base_score = (np.asarray(points, dtype=np.float64) * RW_BASE + np.asarray(reg_wins, dtype=np.float64)).astype(np.float32)
+        self.p_home = np.asarray(p_home, dtype=np.float32)
+
+        # Outcome thresholds on one uniform draw per game:
+        #   u < t_reg          home regulation win
+        #   t_reg <= u < p     home OT win
+        #   p <= u < t_ot      away OT win
+        #   u >= t_ot          away regulation win
+        p = self.p_home
+        self.thresholds = np.concatenate([p * (1 - OT_RATE), p, p + (1 - p) * OT_RATE]).astype(np.float32)
+
+        # With L_k = (u < t_k), a game is worth RW_BASE*(L_ot + L_p) + L_reg to the home side and
+        # (2*RW_BASE + 1) - RW_BASE*(L_reg + L_p) - L_ot to the away side. Folding those coefficients
+        # into one (3 * n_games x n_teams) matrix turns a whole batch into a single matrix product.
+        n_games = len(home_idx)
+        H = np.zeros((n_games, n_teams), dtype=np.float32)
+        A = np.zeros((n_games, n_teams), dtype=np.float32)
+        H[np.arange(n_games), home_idx] = 1.0
+        A[np.arange(n_games), away_idx] = 1.0
+        self.weights = np.concatenate([H - RW_BASE * A, RW_BASE * (H - A), RW_BASE * H - A])
+        self.base_score = self.base_score + (2 * RW_BASE + 1) * A.sum(axis=0)
+
+        conferences = np.asarray(conferences)
+        divisions = np.asarray(divisions)
+        self.conference_groups = [np.flatnonzero(conferences == c) for c in np.unique(conferences)]
+        self.division_groups = [
+            [np.flatnonzero((conferences == c) & (divisions == d)) for d in np.unique(divisions[conferences == c])]
+            for c in np.unique(conferences)
+        ]
+
+    def _simulate_scores(self, rng, n_sims):
+        """Final (points * RW_BASE + regulation wins) per team, shape (n_sims, n_teams)."""
+        n_games = len(self.p_home)
+        u = rng.random((n_sims, n_games), dtype=np.float32)
+        below = np.empty((n_sims, 3 * n_games), dtype=np.float32)
+        for k in range(3):
+            np.less(u, self.thresholds[k * n_games:(k + 1) * n_games], out=below[:, k * n_games:(k + 1) * n_games], casting="unsafe")
+        return self.base_score + below @ self.weights
+
+    def _qualifiers(self, scores):
+        """Boolean (n_sims, n_teams) playoff mask plus a division-leader mask."""
+        made = np.zeros(scores.shape, dtype=bool)
+        leader = np.zeros(scores.shape, dtype=bool)
+        rows = np.arange(len(scores))[:, None]
+        for conf_idx, divisions in zip(self.conference_groups, self.division_groups):
+            for div_idx in divisions:
+                order = np.argsort(-scores[:, div_idx], axis=1)
+                top = div_idx[order[:, :DIVISION_SPOTS]]
+                made[rows, top] = True
+                leader[rows[:, 0], div_idx[order[:, 0]]] = True
+            # Wild cards: best remaining teams in the conference
+            remaining = np.where(made[:, conf_idx], -np.inf, scores[:, conf_idx])
+            wild = conf_idx[np.argsort(-remaining, axis=1)[:, :WILD_CARDS]]
+            made[rows, wild] = True
+        return made, leader
+
+    def run(self, n_sims=DEFAULT_SIMS, seed=None):
+        """Returns per-team sums (playoffs, division leader, points, points^2) over n_sims simulations."""
+        rng = np.random.default_rng(seed)
+        totals = {k: np.zeros(self.n_teams) for k in ("playoffs", "leader", "points", "points_sq")}
+        done = 0
+        while done < n_sims:
+            n = min(CHUNK_SIMS, n_sims - done)
+            scores = self._simulate_scores(rng, n)
+            points = np.floor(scores / RW_BASE)
+            # Random jitter breaks any remaining ties
+            made, leader = self._qualifiers(scores + rng.random(scores.shape, dtype=np.float32) * 0.5)
+            totals["playoffs"] += made.sum(axis=0)
+            totals["leader"] += leader.sum(axis=0)
+            totals["points"] += points.sum(axis=0)
+            totals["points_sq"] += (points.astype(np.float64) ** 2).sum(axis=0)
+            done += n
+        return totals
+
+
+def _run_shard(args):
+    sim, n_sims, seed = args
+    return sim.run(n_sims, seed)
+
+
+def simulate(teams, games, n_sims=DEFAULT_SIMS, seed=None, workers=1, model_probs=None):
+    """Simulates the rest of the season.
+
+    teams: list of dicts with abbrev, conference, division, points, wins, games_played.
+    games: list of (home_abbrev, away_abbrev) remaining regular-season games.
+    model_probs: optional {abbrev: playoff_prob} used to seed team strength.
+    Returns one dict per team with playoff_prob, division_leader_prob and projected points.
+    """
+    abbrevs = [t['abbrev'] for t in teams]
+    index = {a: i for i, a in enumerate(abbrevs)}
+    games = [(h, a) for h, a in games if h in index and a in index]
+    home_idx = np.array([index[h] for h, _ in games], dtype=np.int64)
+    away_idx = np.array([index[a] for _, a in games], dtype=np.int64)
+
+    points = np.array([t['points'] or 0 for t in teams], dtype=np.float64)
+    gp = np.array([t['games_played'] or 0 for t in teams], dtype=np.float64)
+    probs = None
+    if model_probs and all(a in model_probs for a in abbrevs):
+        probs = np.array([model_probs[a] for a in abbrevs])
+    ratings = team_ratings(points, gp, probs)
+
+    sim = SeasonSimulator(
+        points,
+        # daily_standings has no regulation-win column; total wins stand in for the tiebreaker
+        [t['wins'] or 0 for t in teams],
+        [t['conference'] for t in teams],
+        [t['division'] for t in teams],
+        home_idx, away_idx, home_win_probs(ratings, home_idx, away_idx),
+    )
+
+    if workers > 1:
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        shards = [n_sims // workers + (1 if i < n_sims % workers else 0) for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_shard, [(sim, n, s) for n, s in zip(shards, seeds)]))
+        totals = {k: sum(r[k] for r in results) for k in results[0]}
+    else:
+        totals = sim.run(n_sims, seed)
+
+    mean_points = totals["points"] / n_sims
+    std_points = np.sqrt(np.maximum(totals["points_sq"] / n_sims - mean_points ** 2, 0))
+    return [
+        {
+            "abbrev": a,
+            "playoff_prob": float(totals["playoffs"][i] / n_sims),
+            "division_leader_prob": float(totals["leader"][i] / n_sims),
+            "projected_points": round(float(mean_points[i]), 1),
+            "projected_points_std": round(float(std_points[i]), 1),
+            "remaining_games": int((home_idx == i).sum() + (away_idx == i).sum()),
+        }
+        for i, a in enumerate(abbrevs)
+    ]
+
+
+def load_fixture(path):
+    """Reads a {"teams": [...], "games": [{"home": ..., "away": ...}]} JSON fixture."""
+    with open(path) as f:
+        data = json.load(f)
+    return data["teams"], [(g["home"], g["away"]) for g in data["games"]]
+
+
+def synthetic_fixture(games_per_team=41, seed=0):
+    """32 teams split 2 conferences x 2 divisions with a random remaining schedule, for benchmarking."""
+    rng = np.random.default_rng(seed)
+    teams = []
+    for i in range(32):
+        gp = 82 - games_per_team
+        wins = int(rng.integers(gp // 4, gp * 3 // 4))
+        teams.append({
+            "abbrev": f"T{i:02d}", "conference": "East" if i < 16 else "West",
+            "division": f"D{i // 8}", "games_played": gp, "wins": wins,
+            "points": wins * 2 + int(rng.integers(0, 8)),
+        })
+    games = []
+    for _ in range(32 * games_per_team // 2):
+        h, a = rng.choice(32, 2, replace=False)
+        games.append((teams[h]["abbrev"], teams[a]["abbrev"]))
+    return teams, games
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of the rest of the NHL season.")
+    parser.add_argument("--sims", type=int, default=DEFAULT_SIMS)
+    parser.add_argument("--workers", type=int, default=1, help="Processes to shard simulations across")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--fixture", default=None, help="JSON fixture of teams + remaining games (default: synthetic half season)")
+    args = parser.parse_args()
+
+    teams, games = load_fixture(args.fixture) if args.fixture else synthetic_fixture()
+    start = time.perf_counter()
+    results = simulate(teams, games, n_sims=args.sims, seed=args.seed, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"{args.sims:,} simulations of {len(games)} games in {elapsed:.2f}s")
+    for r in sorted(results, key=lambda r: -r["playoff_prob"]):
+        print(f"  {r['abbrev']:<4} {r['playoff_prob']:6.1%}  {r['projected_points']:6.1f} pts")
@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.append(parent_dir)
+
+from database.db_utils import get_connection
+from models.features import STORED_FEATURES
+
+# pyarrow is optional: without it training reads straight from Postgres as before
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# CONFIG
+SNAPSHOT_DIR = os.path.join(current_dir, 'snapshots')
+MANIFEST_PATH = os.path.join(SNAPSHOT_DIR, 'manifest.json')
+LIVE_MAX_AGE_HOURS = 6      # Seasons in progress are re-pulled once their file is this old, even if the row count is unchanged
+MIN_GAMES_PLAYED = 10       # Filter out very early season noise
+
+# (column, arrow type); labels are null until the season has an outcome
+SNAPSHOT_COLUMNS = [
+    ('date', 'date32'),
+    ('season_id', 'int32'),
+    ('team_id', 'int32'),
+    ('games_played', 'int32'),
+    ('wins', 'int32'),
+    ('losses', 'int32'),
+    ('ot_losses', 'int32'),
+    ('points', 'int32'),
+    ('goals_for', 'int32'),
+    ('goals_against', 'int32'),
+    ('l10_points', 'int32'),
+    ('streak_code', 'string'),
+    ('streak_count', 'int32'),
+    *((name, 'float64') for name in STORED_FEATURES),     # daily_features (models/feature_store.py)
+    ('made_playoffs', 'bool_'),
+]
+SNAPSHOT_NAMES = [name for name, _ in SNAPSHOT_COLUMNS]
+
+SELECT_LIST = ", ".join("fs." + c if c in STORED_FEATURES else "ds." + c for c in SNAPSHOT_NAMES[:-1]) + ", so.made_playoffs"
+
+SEASON_QUERY = f"""
+    SELECT {SELECT_LIST}
+    FROM daily_standings ds
+    LEFT JOIN daily_features fs ON fs.date = ds.date AND fs.team_id = ds.team_id
+    LEFT JOIN season_outcomes so ON ds.season_id = so.season_id AND ds.team_id = so.team_id
+    WHERE ds.season_id = %s
+    ORDER BY ds.date, ds.team_id
+"""
+
+STATE_QUERY = "SELECT season_id, max(date), count(*) FROM daily_standings GROUP BY season_id"
+
+# Order-independent hash of each season's rows as SEASON_QUERY returns them
+SIGNATURE_QUERY = f"""
+    SELECT ds.season_id, sum(hashtext(concat_ws('|', {SELECT_LIST})))
+    FROM daily_standings ds
+    LEFT JOIN daily_features fs ON fs.date = ds.date AND fs.team_id = ds.team_id
+    LEFT JOIN season_outcomes so ON ds.season_id = so.season_id AND ds.team_id = so.team_id
+    WHERE ds.season_id = ANY(%s)
+    GROUP BY ds.season_id
+"""
+
+
+def _schema():
+    return pa.schema([(name, getattr(pa, kind)()) for name, kind in SNAPSHOT_COLUMNS])
+
+
+def season_path(season_id):
+    return os.path.join(SNAPSHOT_DIR, f"standings_{season_id}.arrow")
+
+
+def read_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return {int(k): v for k, v in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest):
+    tmp = MANIFEST_PATH + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({str(k): v for k, v in sorted(manifest.items())}, f, indent=2)
+    os.replace(tmp, MANIFEST_PATH)
+
+
+def _fetch_season_table(cur, season_id):
+    """One season's standings + labels as an Arrow table with a fixed schema."""
+    cur.execute(SEASON_QUERY, (season_id,))
+    rows = cur.fetchall()
+    schema = _schema()
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    return pa.Table.from_arrays([pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema)
+
+
+def _write_table(table, path):
+    # Uncompressed Arrow IPC so reads can memory-map the buffers instead of decoding them
+    tmp = path + '.tmp'
+    with pa.OSFile(tmp, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def _db_state(cur):
+    """{season_id: (max_date, rows)} straight off daily_standings; one cheap grouped query."""
+    cur.execute(STATE_QUERY)
+    return {season_id: (str(max_date), rows) for season_id, max_date, rows in cur.fetchall()}
+
+
+def _signatures(cur, seasons):
+    """{season_id: content hash} over exactly the rows and columns a season's file holds."""
+    cur.execute(SIGNATURE_QUERY, (list(seasons),))
+    return {season_id: int(signature or 0) for season_id, signature in cur.fetchall()}
+
+
+def _stale(manifest, state, completed, signatures=None):
+    """Seasons whose file no longer matches the database, in season order.
+
+    A season is rewritten when it is new, its file or columns are missing, its max date, row
+    count or completion changed, or (with signatures) its content hash differs from the one it
+    was written with. A season in progress is also re-pulled once its file is LIVE_MAX_AGE_HOURS
+    old, which catches same-day stat corrections without hashing on every run.
+    """
+    stale = []
+    for season_id, (max_date, rows) in sorted(state.items()):
+        entry = manifest.get(season_id)
+        if (not entry or not os.path.exists(season_path(season_id))
+                or entry.get('columns') != SNAPSHOT_NAMES
+                or entry['max_date'] != max_date or entry['rows'] != rows
+                or entry['complete'] != (season_id in completed)):
+            stale.append(season_id)
+        elif signatures is not None:
+            if entry.get('signature') != signatures.get(season_id):
+                stale.append(season_id)
+        elif not entry['complete'] and (time.time() - entry['built_at']) / 3600 >= LIVE_MAX_AGE_HOURS:
+            stale.append(season_id)
+    return stale
+
+
+def sync_snapshots(refresh=False, rebuild=False):
+    """Brings the store up to date with the database.
+
+    Every call compares the manifest against one grouped query over daily_standings (season
+    set, max date, row count), so new, extended or removed seasons are picked up without a
+    refresh. refresh=True also hashes each season's rows and rewrites any whose content changed,
+    completed seasons included (e.g. after a replay). rebuild=True rewrites everything.
+    Returns the manifest.
+    """
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    manifest = read_manifest()
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        state = _db_state(cur)
+        cur.execute("SELECT DISTINCT season_id FROM season_outcomes")
+        completed = {r[0] for r in cur.fetchall()}
+        signatures = _signatures(cur, state) if refresh or rebuild else None
+
+        changed = False
+        for season_id in set(manifest) - set(state):
+            # Seasons deleted from the database leave the store too
+            manifest.pop(season_id)
+            if os.path.exists(season_path(season_id)):
+                os.remove(season_path(season_id))
+            print(f"Snapshot {season_id}: removed (no longer in daily_standings)")
+            changed = True
+
+        stale = sorted(state) if rebuild else _stale(manifest, state, completed, signatures)
+        if stale and signatures is None:
+            signatures = _signatures(cur, stale)
+        for season_id in stale:
+            table = _fetch_season_table(cur, season_id)
+            _write_table(table, season_path(season_id))
+            dates = table.column('date')
+            manifest[season_id] = {
+                'rows': table.num_rows,
+                'max_date': str(pc.max(dates)) if table.num_rows else None,
+                'complete': season_id in completed,
+                'built_at': time.time(),
+                'columns': SNAPSHOT_NAMES,
+                'signature': signatures.get(season_id),
+            }
+            status = "complete" if season_id in completed else "in progress"
+            print(f"Snapshot {season_id}: {table.num_rows} rows ({status})")
+            changed = True
+    finally:
+        conn.close()
+
+    if changed:
+        _write_manifest(manifest)
+    return manifest
+
+
+def load_table(seasons=None, refresh=False, rebuild=False):
+    """Memory-mapped Arrow table of the stored standings (zero-copy over the files on disk).
+
+    Checks the store against Postgres with one grouped query and only re-pulls the seasons that
+    changed. If the database is unreachable, the existing files are served as-is.
+    """
+    manifest = read_manifest()
+    try:
+        manifest = sync_snapshots(refresh=refresh, rebuild=rebuild)
+    except Exception as e:
+        if not manifest:
+            raise
+        print(f"Could not refresh snapshots ({e}); using the stored files.")
+
+    wanted = sorted(manifest if seasons is None else set(seasons) & set(manifest))
+    tables = [pa.ipc.open_file(pa.memory_map(season_path(s), 'r')).read_all() for s in wanted]
+    if not tables:
+        return _schema().empty_table()
+    return pa.concat_tables(tables)
+
+
+def load_training_frame(min_games=MIN_GAMES_PLAYED, seasons=None, refresh=False, rebuild=False):
+    """Labelled standings rows for training/backtesting as a DataFrame (same shape as the old SQL query)."""
+    table = load_table(seasons=seasons, refresh=refresh, rebuild=rebuild)
+    mask = pc.and_(
+        pc.greater(table.column('games_played'), min_games),
+        pc.is_valid(table.column('made_playoffs')),
+    )
+    return table.filter(mask).to_pandas()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build/refresh the local Arrow snapshot store used for training.")
+    parser.add_argument("--refresh", action="store_true", help="Hash every season and re-pull any whose rows changed, completed ones included")
+    parser.add_argument("--rebuild", action="store_true", help="Rewrite every season, including completed ones")
+    args = parser.parse_args()
+
+    if not PYARROW_AVAILABLE:
+        print("pyarrow is not installed (pip install pyarrow).")
+        sys.exit(1)
+
+    manifest = sync_snapshots(refresh=args.refresh, rebuild=args.rebuild)
+    start = time.perf_counter()
+    df = load_training_frame()
+    elapsed = time.perf_counter() - start
+    print(f"{len(manifest)} seasons stored in {SNAPSHOT_DIR}")
+    print(f"Loaded {len(df)} training rows in {elapsed * 1000:.1f} ms")
@@ -1,15 +1,9 @@
 import pandas as pd
-import numpy as np
-from sklearn.model_selection import train_test_split, GridSearchCV, StratifiedKFold
-from sklearn.preprocessing import StandardScaler
-from sklearn.pipeline import Pipeline
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier, VotingClassifier
-from sklearn.metrics import accuracy_score, roc_auc_score
-import joblib
+import argparse
 import warnings
 import sys
 import os
+import time
 
 # Try importing XGBoost safely
 try:
@@ -26,15 +20,32 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
-from database.db_utils import get_connection
+from database.db_utils import get_connection, notify_standings_updated
+from models.features import FEATURES, feature_matrix
+from models.predictions import refresh_predictions
+from models.incremental import DRIFT_TOLERANCE, changed_seasons, data_summary, drift_check, warm_start
+from models.registry import current_version, load, read_manifest, publish as publish_model
+from models.snapshots import PYARROW_AVAILABLE, load_training_frame
+from models.search import CACHE_PATH, FoldCache, build_estimator, data_fingerprint, evaluate, make_folds, search
 
 warnings.filterwarnings('ignore')
 
-def get_training_data():
+DEFAULT_BUDGET = 300  # Seconds of hyperparameter search per training run
+
+def get_training_data(refresh=False):
+    """
+    Labelled standings rows. Read from the local Arrow snapshot store (models/snapshots.py)
+    when pyarrow is installed, so completed seasons never go back to Postgres.
+    """
+    if PYARROW_AVAILABLE:
+        return load_training_frame(refresh=refresh)
+
     conn = get_connection()
     # Fetch new columns l10_points and streak info
     query = """
         SELECT 
+            ds.season_id,
+            ds.date,
             ds.games_played,
             ds.wins,
             ds.points,
@@ -43,9 +54,13 @@ def get_training_data():
             ds.l10_points,
             ds.streak_code,
             ds.streak_count,
+            fs.gd_trend,
+            fs.form_delta,
+            fs.pace_vs_cutline,
             so.made_playoffs
         FROM daily_standings ds
         JOIN season_outcomes so ON ds.season_id = so.season_id AND ds.team_id = so.team_id
+        LEFT JOIN daily_features fs ON fs.date = ds.date AND fs.team_id = ds.team_id
         WHERE ds.games_played > 10  -- Filter out very early season noise
     """
     try:
@@ -54,116 +69,90 @@ def get_training_data():
         conn.close()
     return df
 
-def train_and_compare():
+def train_and_compare(refresh_data=False, method='halving', budget=DEFAULT_BUDGET, n_candidates=None,
+                      df=None, publish=True):
+    """
+    Tunes, compares and saves the best model. Passing df skips the data load; publish=False is a
+    dry run (benchmarks) that writes nothing to disk or the database and returns the fitted winner.
+    """
     print("--- 1. Fetching Data ---")
-    df = get_training_data()
+    if df is None:
+        df = get_training_data(refresh=refresh_data)
     
     if df.empty:
         print("No training data found. Run 'python -m database.reset_db' then 'python -m etl.update_history'.")
         return
 
-    # Feature Engineering
-    df['win_pct'] = df['wins'] / df['games_played']
-    df['goal_diff'] = df['goals_for'] - df['goals_against']
-    df['points_win_interaction'] = df['points'] * df['win_pct']
-    
-    # Normalize L10 Points (Max is 20 points in 10 games)
-    df['l10_pct'] = df['l10_points'] / 20.0
-
-    # Calculate Numeric Streak
-    # W = Positive, L/OT = Negative
-    def calculate_streak(row):
-        code = row['streak_code']
-        count = row['streak_count']
-        if code == 'W': return count
-        if code in ['L', 'OT']: return -count
-        return 0
-    
-    df['streak_numeric'] = df.apply(calculate_streak, axis=1)
-
-    # Updated Feature List
-    features = ['games_played', 'points', 'win_pct', 'goal_diff', 'points_win_interaction', 'l10_pct', 'streak_numeric']
-    
-    X = df[features].copy()
-    X.fillna(0, inplace=True)
-    X.replace([np.inf, -np.inf], 0, inplace=True)
+    # Feature Engineering (shared with the API, see models/features.py)
+    X_df = feature_matrix(df)
+    X = X_df.to_numpy()
     
-    y = df['made_playoffs'].astype(int)
+    y = df['made_playoffs'].astype(int).to_numpy()
 
     print(f"Data Loaded: {len(df)} records.")
 
-    # Train/Test Split
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    # One set of season-grouped CV folds shared by every model family; per-fold scores are cached on disk
+    folds = make_folds(y, df['season_id'].to_numpy())
+    cache = FoldCache(data_fingerprint(X, y, folds), path=CACHE_PATH if publish else None)
 
-    print("\n--- 2. Tuning & Training Models ---")
-    
-    # Logistic Regression
-    pipe_lr = Pipeline([
-        ('scaler', StandardScaler()),
-        ('clf', LogisticRegression(C=1.0, penalty='l2', solver='lbfgs', max_iter=1000, random_state=42))
-    ])
+    print(f"\n--- 2. Tuning & Training Models ({method} search) ---")
     
     # Random Forest (Expanded Grid)
-    rf = RandomForestClassifier(random_state=42)
     param_grid_rf = {
         'n_estimators': [100, 200, 300],
         'max_depth': [None, 10, 15, 20],
         'min_samples_leaf': [1, 2, 4],
         'min_samples_split': [2, 5]
     }
-    grid_rf = GridSearchCV(rf, param_grid_rf, cv=5, scoring='accuracy', n_jobs=-1)
-    grid_rf.fit(X_train, y_train)
-    best_rf = grid_rf.best_estimator_
-
-    models = {
-        "Logistic Regression": pipe_lr,
-        "Random Forest (Tuned)": best_rf,
-    }
-    estimators_list = [('lr', pipe_lr), ('rf', best_rf)]
+    families = [('rf', param_grid_rf)]
 
     # XGBoost (Expanded Grid)
     if XGB_AVAILABLE:
-        xgb = XGBClassifier(use_label_encoder=False, eval_metric='logloss', random_state=42)
         param_grid_xgb = {
             'n_estimators': [100, 200, 300],
             'learning_rate': [0.01, 0.05, 0.1],
             'max_depth': [3, 4, 5, 6],
             'subsample': [0.8, 1.0]
         }
-        grid_xgb = GridSearchCV(xgb, param_grid_xgb, cv=5, scoring='accuracy', n_jobs=-1)
-        grid_xgb.fit(X_train, y_train)
-        best_xgb = grid_xgb.best_estimator_
-        models["XGBoost (Tuned)"] = best_xgb
-        estimators_list.append(('xgb', best_xgb))
+        families.append(('xgb', param_grid_xgb))
+
+    # The wall-clock budget is split evenly between the searched families
+    family_budget = budget / len(families) if budget else None
+    best = {}
+    for family, grid in families:
+        best[family] = search(family, grid, X, y, folds, cache, method=method,
+                              budget=family_budget, n_candidates=n_candidates)
+        print(f"  {family}: best {best[family]['params']} after {best[family]['fits']} new fits "
+              f"in {best[family]['seconds']:.1f}s")
+
+    # Logistic Regression and the ensembles are scored on the same folds
+    ensemble_params = {family: best[family]['params'] for family in best}
+    candidates = {
+        "Logistic Regression": ('lr', {}),
+        "Random Forest (Tuned)": ('rf', best['rf']['params']),
+    }
+    if XGB_AVAILABLE:
+        candidates["XGBoost (Tuned)"] = ('xgb', best['xgb']['params'])
 
     # Ensemble with dynamic weights based on best accuracy
     # We will simply try a balanced weight and a tree-heavy weight
-    ensemble_balanced = VotingClassifier(estimators=estimators_list, voting='soft')
-    models["Ensemble (Balanced)"] = ensemble_balanced
+    candidates["Ensemble (Balanced)"] = ('ensemble', ensemble_params)
     
     # If XGB is available, try a version that trusts it more
     if XGB_AVAILABLE:
-        weights_xgb = [1, 1, 2] # Favor XGBoost
-        ensemble_xgb_heavy = VotingClassifier(estimators=estimators_list, voting='soft', weights=weights_xgb)
-        models["Ensemble (XGB-Heavy)"] = ensemble_xgb_heavy
+        candidates["Ensemble (XGB-Heavy)"] = ('ensemble', dict(ensemble_params, weights=[1, 1, 2])) # Favor XGBoost
 
+    scores, _ = evaluate(list(candidates.values()), X, y, folds, cache)
+    print(f"  Fold results reused from cache: {cache.hits}")
 
-    print(f"\n{'Model':<25} | {'Accuracy':<10} | {'ROC AUC':<10}")
+    print(f"\n{'Model':<25} | {'CV Acc':<10} | {'ROC AUC':<10}")
     print("-" * 50)
 
     best_model_name = None
     best_score = -1
 
-    for name, model in models.items():
-        model.fit(X_train, y_train)
-        y_pred = model.predict(X_test)
-        
-        acc = accuracy_score(y_test, y_pred)
-        try:
-            y_prob = model.predict_proba(X_test)[:, 1]
-            roc = roc_auc_score(y_test, y_prob)
-        except:
-            roc = 0.0
+    for name, result in zip(candidates, scores):
+        acc, roc = result['accuracy'], result['roc_auc']
 
         print(f"{name:<25} | {acc:.4f}     | {roc:.4f}")
         
@@ -176,11 +165,101 @@ def train_and_compare():
     print("-" * 50)
     print(f"Winner: {best_model_name} (Accuracy: {best_score:.2%})")
 
-    final_model = models[best_model_name]
-    final_model.fit(X, y)
-    save_path = os.path.join(parent_dir, 'models', 'playoff_predictor.pkl')
-    joblib.dump(final_model, save_path)
-    print(f"Saved {best_model_name} to {save_path}")
+    # Only the winner is refit, once, on all the data
+    final_model = build_estimator(*candidates[best_model_name], n_jobs=-1)
+    final_model.fit(X_df, y)
+    if not publish:
+        return final_model
+    # New registry version (pickle + parity-checked NumPy export + manifest); running APIs hot-swap to it
+    family, params = candidates[best_model_name]
+    publish_model(final_model, best_model_name, metrics=dict(zip(candidates, scores))[best_model_name],
+                  params={"family": family, **params}, data=data_summary(df))
+
+    # Materialize predictions for every stored snapshot under the new model version
+    conn = get_connection()
+    try:
+        refresh_predictions(conn)
+        # Running APIs swapped to the new version before these rows existed: have them re-read it
+        notify_standings_updated(conn.cursor(), "predictions")
+        conn.commit()
+    finally:
+        conn.close()
+
+def retrain_incremental(refresh_data=True, method='halving', budget=DEFAULT_BUDGET, tolerance=DRIFT_TOLERANCE):
+    """
+    Post-ETL refresh of the current model. Only seasons whose labelled rows changed since the
+    model was trained (per its manifest) count as new. The model is first scored on those rows:
+    if its accuracy has drifted below the CV accuracy it was selected with, the full search
+    runs; otherwise it is warm-started on the updated data with its searched params and
+    published as a child version. Nothing changed means nothing to do.
+    """
+    start = time.perf_counter()
+    version = current_version()
+    manifest = read_manifest(version) if version else None
+    if not manifest or not manifest.get("data") or "family" not in manifest.get("params", {}):
+        print("No registered model with a training data record; running the full search.")
+        return train_and_compare(refresh_data=refresh_data, method=method, budget=budget)
+    if [f["name"] for f in manifest.get("features", [])] != FEATURES:
+        print(f"Model {version} was trained on another feature schema; running the full search.")
+        return train_and_compare(refresh_data=refresh_data, method=method, budget=budget)
+
+    print("--- 1. Fetching Data ---")
+    df = get_training_data(refresh=refresh_data)
+    if df.empty:
+        print("No training data found.")
+        return
+    changed = changed_seasons(df, manifest["data"])
+    if not changed:
+        print(f"Model {version} already covers all {len(df)} labelled rows; nothing to do.")
+        return
+
+    X_df = feature_matrix(df)
+    y = df['made_playoffs'].astype(int).to_numpy()
+    unseen = df['season_id'].isin(changed).to_numpy()
+    print(f"Data Loaded: {len(df)} records, {unseen.sum()} in changed seasons {changed}.")
+
+    print(f"\n--- 2. Drift check ({manifest['name']}, version {version}) ---")
+    model, _ = load(version, mmap=False, compiled=False)
+    drift = drift_check(model, X_df[unseen], y[unseen], manifest["metrics"]["accuracy"], tolerance)
+    print(f"  Accuracy on unseen rows {drift['accuracy']:.4f} vs CV {drift['baseline_accuracy']:.4f} "
+          f"(tolerance {tolerance:.2f}), log loss {drift['log_loss']:.4f}")
+    if drift["drifted"]:
+        print("  Drift detected: running the full search.")
+        return train_and_compare(df=df, method=method, budget=budget)
+
+    print("\n--- 3. Warm start ---")
+    params = {k: v for k, v in manifest["params"].items() if k not in ("family", "warm_starts")}
+    family = manifest["params"]["family"]
+    model, warm = warm_start(model, family, params, X_df, y)
+    warm_starts = manifest["params"].get("warm_starts", 0) + 1 if warm else 0
+    # CV scores stay those of the last full search: they are the drift baseline for the next refresh
+    publish_model(model, manifest["name"], metrics=dict(manifest["metrics"], drift=drift),
+                  params={"family": family, **params, "warm_starts": warm_starts}, data=data_summary(df),
+                  parent=version)
+    print(f"Model updated in {time.perf_counter() - start:.1f}s")
+
+    conn = get_connection()
+    try:
+        refresh_predictions(conn)
+        # Running APIs swapped to the new version before these rows existed: have them re-read it
+        notify_standings_updated(conn.cursor(), "predictions")
+        conn.commit()
+    finally:
+        conn.close()
 
 if __name__ == "__main__":
-    train_and_compare()
+    parser = argparse.ArgumentParser(description="Train and compare playoff models, then save the best one.")
+    parser.add_argument("--refresh-data", action="store_true", help="Re-pull every season whose rows changed into the snapshot store first")
+    parser.add_argument("--search", choices=["halving", "random", "grid"], default="halving",
+                        help="Hyperparameter search strategy (grid = exhaustive, still cached)")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="Wall-clock seconds for the search (0 = no limit)")
+    parser.add_argument("--candidates", type=int, default=None, help="Max configurations per family for --search random")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Warm-start the current model on new labelled data; full search only if it has drifted")
+    parser.add_argument("--drift-tolerance", type=float, default=DRIFT_TOLERANCE,
+                        help="Accuracy drop on new data (vs. CV accuracy) that triggers a full search")
+    args = parser.parse_args()
+    if args.incremental:
+        retrain_incremental(refresh_data=True, method=args.search, budget=args.budget, tolerance=args.drift_tolerance)
+        sys.exit(0)
+    train_and_compare(refresh_data=args.refresh_data, method=args.search, budget=args.budget, n_candidates=args.candidates)